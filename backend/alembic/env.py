@@ -13,7 +13,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
 from app.database import Base
-from app.models import Neighborhood, Score, ScoreHistory, CrimeIncident, BuildingPermit, DemographicsProfile, NewsArticle
+from app.models import Neighborhood, Score, ScoreHistory, ScoreProjection, CrimeIncident, BuildingPermit, DemographicsProfile, NewsArticle
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,147 @@
+"""Baseline schema: neighborhoods, scores and the collected source tables
+
+Revision ID: 0a7c3e5b9d21
+Revises: 
+Create Date: 2026-10-19 14:00:00.000000
+
+The tables as they were before the first migration, so an empty database
+is built by the same revisions that upgraded existing ones. Databases
+created before migrations existed already have these tables; every
+statement skips what is there.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+from geoalchemy2 import Geometry
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a7c3e5b9d21'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SCORE_TABLES = ("scores", "score_history")
+
+
+def _score_columns():
+    return (
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("neighborhood_id", sa.Integer(), sa.ForeignKey("neighborhoods.id"), nullable=False),
+        sa.Column("crime_score", sa.Float(), nullable=False),
+        sa.Column("infrastructure_score", sa.Float(), nullable=False),
+        sa.Column("demographic_score", sa.Float(), nullable=False),
+        sa.Column("sentiment_score", sa.Float(), nullable=False),
+        sa.Column("profitability_score", sa.Float(), nullable=False),
+        sa.Column("calculated_at", sa.DateTime(), nullable=False),
+    )
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS postgis")
+
+    op.create_table(
+        "neighborhoods",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("geometry", Geometry("MULTIPOLYGON", srid=4326, spatial_index=False), nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+        if_not_exists=True,
+    )
+    op.create_index("ix_neighborhoods_id", "neighborhoods", ["id"], if_not_exists=True)
+    op.create_index("ix_neighborhoods_name", "neighborhoods", ["name"], unique=True, if_not_exists=True)
+    op.create_index(
+        "idx_neighborhoods_geometry", "neighborhoods", ["geometry"],
+        postgresql_using="gist", if_not_exists=True
+    )
+
+    for table in SCORE_TABLES:
+        op.create_table(table, *_score_columns(), if_not_exists=True)
+        op.create_index(f"ix_{table}_id", table, ["id"], if_not_exists=True)
+
+    op.create_table(
+        "crime_incidents",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("incident_id", sa.String()),
+        sa.Column("date", sa.DateTime(), nullable=False),
+        sa.Column("location", sa.String()),
+        sa.Column("offense_type", sa.String()),
+        sa.Column("severity", sa.String()),
+        sa.Column("latitude", sa.Float()),
+        sa.Column("longitude", sa.Float()),
+        sa.Column("neighborhood_id", sa.Integer(), sa.ForeignKey("neighborhoods.id")),
+        sa.Column("raw_data", JSONB()),
+        sa.Column("created_at", sa.DateTime()),
+        if_not_exists=True,
+    )
+    op.create_index("ix_crime_incidents_id", "crime_incidents", ["id"], if_not_exists=True)
+    op.create_index(
+        "ix_crime_incidents_incident_id", "crime_incidents", ["incident_id"],
+        unique=True, if_not_exists=True
+    )
+
+    op.create_table(
+        "building_permits",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("permit_id", sa.String()),
+        sa.Column("permit_type", sa.String()),
+        sa.Column("location", sa.String()),
+        sa.Column("date", sa.DateTime()),
+        sa.Column("status", sa.String()),
+        sa.Column("value", sa.Float()),
+        sa.Column("project_type", sa.String()),
+        sa.Column("latitude", sa.Float()),
+        sa.Column("longitude", sa.Float()),
+        sa.Column("neighborhood_id", sa.Integer(), sa.ForeignKey("neighborhoods.id")),
+        sa.Column("raw_data", JSONB()),
+        sa.Column("created_at", sa.DateTime()),
+        if_not_exists=True,
+    )
+    op.create_index("ix_building_permits_id", "building_permits", ["id"], if_not_exists=True)
+    op.create_index(
+        "ix_building_permits_permit_id", "building_permits", ["permit_id"],
+        unique=True, if_not_exists=True
+    )
+
+    op.create_table(
+        "demographics_profiles",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("neighborhood_id", sa.Integer(), sa.ForeignKey("neighborhoods.id"), unique=True),
+        sa.Column("income_median", sa.Float()),
+        sa.Column("age_median", sa.Float()),
+        sa.Column("household_size_avg", sa.Float()),
+        sa.Column("population", sa.Integer()),
+        sa.Column("raw_data", JSONB()),
+        sa.Column("updated_at", sa.DateTime()),
+        if_not_exists=True,
+    )
+    op.create_index("ix_demographics_profiles_id", "demographics_profiles", ["id"], if_not_exists=True)
+
+    op.create_table(
+        "news_articles",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("article_id", sa.String()),
+        sa.Column("title", sa.String()),
+        sa.Column("content", sa.Text()),
+        sa.Column("published_at", sa.DateTime()),
+        sa.Column("source", sa.String()),
+        sa.Column("url", sa.String()),
+        sa.Column("sentiment_score", sa.Float()),
+        sa.Column("neighborhood_id", sa.Integer(), sa.ForeignKey("neighborhoods.id"), nullable=True),
+        sa.Column("raw_data", JSONB()),
+        sa.Column("created_at", sa.DateTime()),
+        if_not_exists=True,
+    )
+    op.create_index("ix_news_articles_id", "news_articles", ["id"], if_not_exists=True)
+    op.create_index(
+        "ix_news_articles_article_id", "news_articles", ["article_id"],
+        unique=True, if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    for table in ("news_articles", "demographics_profiles", "building_permits",
+                  "crime_incidents", *reversed(SCORE_TABLES), "neighborhoods"):
+        op.drop_table(table)
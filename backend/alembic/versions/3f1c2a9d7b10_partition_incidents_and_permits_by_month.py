@@ -0,0 +1,111 @@
+"""Partition crime_incidents and building_permits by month
+
+Revision ID: 3f1c2a9d7b10
+Revises: 0a7c3e5b9d21
+Create Date: 2026-10-19 15:00:00.000000
+
+Converts both tables to declarative range partitions on `date`, one per month
+from the oldest row to MONTHS_AHEAD months from now, plus a DEFAULT
+partition. Adds a BRIN index on `date` and a B-tree index on
+(neighborhood_id, date). The primary key becomes (id, date) and the natural
+key unique constraint gains `date`, since PostgreSQL requires unique
+constraints to include the partition key. Permits without a date get their
+created_at so `date` can be NOT NULL.
+
+Later months are created by scripts/create_partitions.py.
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from data_pipeline.partitions import MONTHS_AHEAD, add_months, month_start, partition_name
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c2a9d7b10'
+down_revision: Union[str, None] = '0a7c3e5b9d21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table -> natural key column
+TABLES = {
+    "crime_incidents": "incident_id",
+    "building_permits": "permit_id",
+}
+
+
+def _is_partitioned(conn, table: str) -> bool:
+    return conn.execute(sa.text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"
+    ), {"table": table}).scalar()
+
+
+def _partition_table(conn, table: str, key: str):
+    if _is_partitioned(conn, table):
+        return
+
+    old = f"{table}_unpartitioned"
+    op.execute(f"ALTER TABLE {table} RENAME TO {old}")
+    if table == "building_permits":
+        op.execute(f"UPDATE {old} SET date = COALESCE(created_at, now()) WHERE date IS NULL")
+
+    op.execute(f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS) PARTITION BY RANGE (date)")
+    op.execute(f"ALTER TABLE {table} ALTER COLUMN date SET NOT NULL")
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+    op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+    oldest = conn.execute(sa.text(f"SELECT min(date) FROM {old}")).scalar()
+    last = add_months(month_start(date.today()), MONTHS_AHEAD)
+    month = month_start(oldest) if oldest else month_start(date.today())
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE {partition_name(table, month)} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+        )
+        month = add_months(month, 1)
+
+    op.execute(f"INSERT INTO {table} SELECT * FROM {old}")
+    op.execute(f"DROP TABLE {old}")
+
+    # Constraints and indexes after the bulk copy, so they are built once
+    op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id, date)")
+    op.execute(f"ALTER TABLE {table} ADD CONSTRAINT uq_{table}_{key}_date UNIQUE ({key}, date)")
+    op.execute(f"ALTER TABLE {table} ADD FOREIGN KEY (neighborhood_id) REFERENCES neighborhoods (id)")
+    op.execute(f"CREATE INDEX ix_{table}_id ON {table} (id)")
+    op.execute(f"CREATE INDEX ix_{table}_{key} ON {table} ({key})")
+    op.execute(f"CREATE INDEX ix_{table}_neighborhood_id_date ON {table} (neighborhood_id, date)")
+    op.execute(f"CREATE INDEX ix_{table}_date_brin ON {table} USING brin (date)")
+
+
+def _unpartition_table(conn, table: str, key: str):
+    if not _is_partitioned(conn, table):
+        return
+
+    old = f"{table}_partitioned"
+    op.execute(f"ALTER TABLE {table} RENAME TO {old}")
+    op.execute(f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS)")
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+    if table == "building_permits":
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN date DROP NOT NULL")
+    op.execute(f"INSERT INTO {table} SELECT * FROM {old}")
+    op.execute(f"DROP TABLE {old} CASCADE")
+
+    op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id)")
+    op.execute(f"ALTER TABLE {table} ADD UNIQUE ({key})")
+    op.execute(f"ALTER TABLE {table} ADD FOREIGN KEY (neighborhood_id) REFERENCES neighborhoods (id)")
+    op.execute(f"CREATE INDEX ix_{table}_id ON {table} (id)")
+    op.execute(f"CREATE INDEX ix_{table}_{key} ON {table} ({key})")
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    for table, key in TABLES.items():
+        _partition_table(conn, table, key)
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    for table, key in TABLES.items():
+        _unpartition_table(conn, table, key)
@@ -0,0 +1,53 @@
+"""Add score_history_rollups and index score_history by neighborhood and time
+
+Revision ID: 8b2e4d6f1a37
+Revises: 3f1c2a9d7b10
+Create Date: 2026-10-19 16:00:00.000000
+
+Older score history is compacted into weekly and monthly rollups by
+data_pipeline/retention.py; existing history is rolled up on the next
+refresh or by scripts/compact_history.py.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e4d6f1a37'
+down_revision: Union[str, None] = '3f1c2a9d7b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "score_history_rollups",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("neighborhood_id", sa.Integer(), sa.ForeignKey("neighborhoods.id"), nullable=False),
+        sa.Column("resolution", sa.String(), nullable=False),
+        sa.Column("period_start", sa.DateTime(), nullable=False),
+        sa.Column("sample_count", sa.Integer(), nullable=False),
+        sa.Column("calculated_at", sa.DateTime(), nullable=False),
+        sa.Column("crime_score", sa.Float(), nullable=False),
+        sa.Column("infrastructure_score", sa.Float(), nullable=False),
+        sa.Column("demographic_score", sa.Float(), nullable=False),
+        sa.Column("sentiment_score", sa.Float(), nullable=False),
+        sa.Column("profitability_score", sa.Float(), nullable=False),
+        sa.Column("profitability_min", sa.Float(), nullable=False),
+        sa.Column("profitability_max", sa.Float(), nullable=False),
+        sa.UniqueConstraint("neighborhood_id", "resolution", "period_start",
+                            name="uq_score_history_rollups_period"),
+        if_not_exists=True,
+    )
+    op.create_index("ix_score_history_rollups_id", "score_history_rollups", ["id"], if_not_exists=True)
+    op.create_index(
+        "ix_score_history_neighborhood_id_calculated_at", "score_history",
+        ["neighborhood_id", "calculated_at"], if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_score_history_neighborhood_id_calculated_at", table_name="score_history")
+    op.drop_table("score_history_rollups")
@@ -0,0 +1,46 @@
+"""Add neighborhood_monthly_stats
+
+Revision ID: c4d7e2a9f815
+Revises: 8b2e4d6f1a37
+Create Date: 2026-10-19 20:00:00.000000
+
+The collectors maintain the table as they insert rows; fill it for data
+already stored with scripts/rebuild_monthly_stats.py after upgrading.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d7e2a9f815'
+down_revision: Union[str, None] = '8b2e4d6f1a37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNT_COLUMNS = (
+    "crime_violent", "crime_property", "crime_other",
+    "permits_residential", "permits_commercial", "permits_minor", "article_count",
+)
+SUM_COLUMNS = (
+    "permit_value_residential", "permit_value_commercial", "permit_value_minor", "sentiment_sum",
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "neighborhood_monthly_stats",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("neighborhood_id", sa.Integer(), sa.ForeignKey("neighborhoods.id"), nullable=False),
+        sa.Column("month", sa.DateTime(), nullable=False),
+        *(sa.Column(name, sa.Integer(), nullable=False, server_default="0") for name in COUNT_COLUMNS),
+        *(sa.Column(name, sa.Float(), nullable=False, server_default="0") for name in SUM_COLUMNS),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.UniqueConstraint("neighborhood_id", "month", name="uq_neighborhood_monthly_stats_month"),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("neighborhood_monthly_stats")
@@ -0,0 +1,90 @@
+"""Add score_projections, geojson_layers, refresh_runs, refresh_schedules and stage_cache
+
+Revision ID: e5a1b3c7d942
+Revises: c4d7e2a9f815
+Create Date: 2026-10-19 21:00:00.000000
+
+These tables predate the migrations and were only created from the models;
+databases that already have them are left as they are.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a1b3c7d942'
+down_revision: Union[str, None] = 'c4d7e2a9f815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "score_projections",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("neighborhood_id", sa.Integer(), sa.ForeignKey("neighborhoods.id"),
+                  unique=True, nullable=False),
+        sa.Column("current_score", sa.Float(), nullable=False),
+        sa.Column("projection_1yr", sa.Float(), nullable=False),
+        sa.Column("projection_3yr", sa.Float(), nullable=False),
+        sa.Column("projection_5yr", sa.Float(), nullable=False),
+        sa.Column("trend", sa.String(), nullable=False),
+        sa.Column("calculated_at", sa.DateTime(), nullable=False),
+        if_not_exists=True,
+    )
+    op.create_index("ix_score_projections_id", "score_projections", ["id"], if_not_exists=True)
+
+    op.create_table(
+        "geojson_layers",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("level", sa.String(), nullable=False),
+        sa.Column("tolerance", sa.Float(), nullable=False),
+        sa.Column("body", sa.LargeBinary(), nullable=False),
+        sa.Column("body_gzip", sa.LargeBinary(), nullable=False),
+        sa.Column("body_br", sa.LargeBinary()),
+        sa.Column("etag", sa.String(), nullable=False),
+        sa.Column("built_at", sa.DateTime(), nullable=False),
+        if_not_exists=True,
+    )
+    op.create_index("ix_geojson_layers_id", "geojson_layers", ["id"], if_not_exists=True)
+    op.create_index("ix_geojson_layers_level", "geojson_layers", ["level"], unique=True, if_not_exists=True)
+
+    op.create_table(
+        "refresh_runs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("trigger", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=False),
+        sa.Column("finished_at", sa.DateTime()),
+        sa.Column("error", sa.Text()),
+        sa.Column("stats", JSONB()),
+        if_not_exists=True,
+    )
+    op.create_index("ix_refresh_runs_id", "refresh_runs", ["id"], if_not_exists=True)
+    op.create_index("ix_refresh_runs_status", "refresh_runs", ["status"], if_not_exists=True)
+
+    op.create_table(
+        "refresh_schedules",
+        sa.Column("source", sa.String(), primary_key=True),
+        sa.Column("next_run_at", sa.DateTime(), nullable=False),
+        sa.Column("last_run_at", sa.DateTime()),
+        sa.Column("last_rows", sa.Integer()),
+        if_not_exists=True,
+    )
+
+    op.create_table(
+        "stage_cache",
+        sa.Column("stage", sa.String(), primary_key=True),
+        sa.Column("fingerprint", sa.String(), nullable=False),
+        sa.Column("outputs", JSONB()),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    for table in ("stage_cache", "refresh_schedules", "refresh_runs", "geojson_layers", "score_projections"):
+        op.drop_table(table)
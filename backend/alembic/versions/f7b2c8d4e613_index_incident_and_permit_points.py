@@ -0,0 +1,34 @@
+"""Index crime_incidents and building_permits points for tile lookups
+
+Revision ID: f7b2c8d4e613
+Revises: e5a1b3c7d942
+Create Date: 2026-10-19 22:00:00.000000
+
+GiST index on the point built from longitude/latitude, the expression the
+crime and permit tile layers filter on with `&& ST_MakeEnvelope(...)`.
+Created on the partitioned parents, so every monthly partition gets one.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7b2c8d4e613'
+down_revision: Union[str, None] = 'e5a1b3c7d942'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("crime_incidents", "building_permits")
+
+POINT_EXPRESSION = "ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)"
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_point_gist ON {table} USING gist ({POINT_EXPRESSION})")
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_point_gist")
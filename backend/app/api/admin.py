@@ -1,8 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from ..database import get_db
-from ..schemas import RefreshStatus
-from datetime import datetime
+from fastapi import APIRouter, HTTPException
+from ..refresh_jobs import submit_refresh_job, get_refresh_job
+from ..schemas import RefreshJobStatus
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,25 +8,21 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-@router.post("/admin/refresh", response_model=RefreshStatus)
-async def trigger_refresh(db: Session = Depends(get_db)):
-    """Trigger data refresh pipeline (for cron job)"""
-    try:
-        # Import here to avoid circular imports
-        from ...data_pipeline.refresh import run_refresh_pipeline
-        
-        logger.info("Refresh endpoint triggered")
-        run_refresh_pipeline(db)
-        
-        return RefreshStatus(
-            status="success",
-            message="Data refresh completed successfully",
-            timestamp=datetime.now()
-        )
-    except Exception as e:
-        logger.error(f"Error in refresh: {e}")
-        raise HTTPException(
-            status_code=500,
-            detail=f"Refresh failed: {str(e)}"
-        )
+@router.post("/admin/refresh", response_model=RefreshJobStatus, status_code=202)
+async def trigger_refresh(profile: bool = False):
+    """Queue a data refresh and return its job id immediately (for cron job)
 
+    With ?profile=true the run is profiled and `profile_report` points at the
+    report once the job finishes.
+    """
+    logger.info("Refresh endpoint triggered")
+    return submit_refresh_job(profile=profile)
+
+
+@router.get("/admin/refresh/{job_id}", response_model=RefreshJobStatus)
+async def get_refresh_status(job_id: str):
+    """Get status, per-stage progress, row counts and timings of a refresh job"""
+    job = get_refresh_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Refresh job not found")
+    return job
@@ -0,0 +1,78 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_db
+from ..schemas import LocateResponse
+from ..spatial_index import get_neighborhood_index
+import numpy as np
+import json
+
+router = APIRouter()
+
+BINARY_MEDIA_TYPE = "application/octet-stream"
+
+# Upper bound on points per request, about 16 MB of binary input
+MAX_POINTS = 1_000_000
+
+
+def parse_points(body: bytes, content_type: str) -> np.ndarray:
+    """Decode a request body into an (n, 2) array of (lat, lon) pairs"""
+    if content_type.startswith(BINARY_MEDIA_TYPE):
+        if len(body) % 16:
+            raise HTTPException(status_code=400, detail="Binary body must be little-endian float64 (lat, lon) pairs")
+        return np.frombuffer(body, dtype="<f8").reshape(-1, 2)
+
+    try:
+        points = np.asarray(json.loads(body)["points"], dtype=np.float64)
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail='JSON body must be {"points": [[lat, lon], ...]}')
+    if points.size == 0:
+        return points.reshape(0, 2)
+    if points.ndim != 2 or points.shape[1] != 2:
+        raise HTTPException(status_code=400, detail='JSON body must be {"points": [[lat, lon], ...]}')
+    return points
+
+
+@router.post("/locate", response_model=LocateResponse)
+async def locate_points(request: Request, db: AsyncSession = Depends(get_db)):
+    """Resolve a batch of coordinates to neighborhoods and their current scores
+
+    Accepts JSON ``{"points": [[lat, lon], ...]}`` or an
+    ``application/octet-stream`` body of little-endian float64 (lat, lon)
+    pairs. Binary requests get a binary response: int64 neighborhood ids
+    (-1 when outside every neighborhood) followed by float64 scores (NaN
+    when unknown).
+    """
+    content_type = request.headers.get("content-type", "")
+    points = parse_points(await request.body(), content_type)
+    if len(points) > MAX_POINTS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_POINTS} points per request")
+
+    index = await get_neighborhood_index(db)
+    positions = index.locate(points[:, 0], points[:, 1])
+    found = positions >= 0
+
+    if found.any():
+        neighborhood_ids = np.where(found, index.neighborhood_ids[positions], -1)
+        scores = np.where(found, index.scores[positions], np.nan)
+    else:
+        neighborhood_ids = np.full(len(points), -1, dtype=np.int64)
+        scores = np.full(len(points), np.nan)
+
+    if content_type.startswith(BINARY_MEDIA_TYPE):
+        body = neighborhood_ids.astype("<i8").tobytes() + scores.astype("<f8").tobytes()
+        return Response(content=body, media_type=BINARY_MEDIA_TYPE,
+                        headers={"X-Score-Version": index.version})
+
+    # Build the JSON directly; running 100k-element lists through
+    # jsonable_encoder would dominate the request time
+    id_list = neighborhood_ids.astype(object)
+    id_list[~found] = None
+    score_list = scores.astype(object)
+    score_list[np.isnan(scores)] = None
+    return JSONResponse({
+        "count": len(points),
+        "version": index.version,
+        "neighborhood_ids": id_list.tolist(),
+        "profitability_scores": score_list.tolist(),
+    })
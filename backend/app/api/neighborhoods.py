@@ -1,56 +1,218 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from ..database import get_db
-from ..models import Neighborhood, Score
-from ..schemas import Neighborhood as NeighborhoodSchema, NeighborhoodWithScores
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, case
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from ..database import get_db, AsyncSessionLocal
+from ..encoding import negotiate_encoding, encoded_etag, etag_matches
+from ..exports import (
+    export_rows,
+    parse_cursor,
+    EXPORT_MEDIA_TYPES,
+    INCIDENT_EXPORT_COLUMNS,
+    PERMIT_EXPORT_COLUMNS
+)
+from ..models import (
+    Neighborhood,
+    Score,
+    GeoJSONLayer,
+    CrimeIncident,
+    BuildingPermit,
+    NeighborhoodMonthlyStats
+)
+from ..responses import FastJSONResponse, row_dicts
+from ..schemas import Neighborhood as NeighborhoodSchema, NeighborhoodWithScores, MonthlyStats
+from .scores import latest_scores_query
 
 router = APIRouter()
 
 
-@router.get("/neighborhoods", response_model=List[NeighborhoodWithScores])
-async def get_neighborhoods(db: Session = Depends(get_db)):
-    """Get all 35 Buffalo neighborhoods with their current scores"""
-    neighborhoods = db.query(Neighborhood).all()
-    result = []
-    for neighborhood in neighborhoods:
-        # Get latest score
-        score = db.query(Score).filter(
-            Score.neighborhood_id == neighborhood.id
-        ).order_by(Score.calculated_at.desc()).first()
-        
-        neighborhood_dict = {
-            "id": neighborhood.id,
-            "name": neighborhood.name,
-            "created_at": neighborhood.created_at,
-            "scores": score
+SCORE_FIELDS = ("id", "neighborhood_id", "crime_score", "infrastructure_score", "demographic_score",
+                "sentiment_score", "profitability_score", "calculated_at")
+
+
+@router.get("/neighborhoods", response_model=List[NeighborhoodWithScores], response_class=FastJSONResponse)
+async def get_neighborhoods(db: AsyncSession = Depends(get_db)):
+    """Get all 35 Buffalo neighborhoods with their current scores
+
+    One query joins each neighborhood to its latest score, and the rows are
+    serialized straight from tuples with orjson.
+    """
+    latest = latest_scores_query().subquery()
+    rows = (await db.execute(
+        select(Neighborhood.id, Neighborhood.name, Neighborhood.created_at,
+               *(latest.c[field] for field in SCORE_FIELDS))
+        .outerjoin(latest, latest.c.neighborhood_id == Neighborhood.id)
+        .order_by(Neighborhood.id)
+    )).all()
+    return FastJSONResponse([
+        {
+            "id": row[0],
+            "name": row[1],
+            "created_at": row[2],
+            "scores": dict(zip(SCORE_FIELDS, row[3:])) if row[3] is not None else None,
         }
-        result.append(neighborhood_dict)
-    return result
+        for row in rows
+    ])
+
+
+@router.get("/neighborhoods.geojson")
+async def get_neighborhoods_geojson(
+    request: Request,
+    level: str = Query("medium", pattern="^(full|medium|low)$", description="Simplification level"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get neighborhood geometries with current scores, precomputed at refresh time"""
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"), ("br", "gzip"))
+    body_column = {"br": GeoJSONLayer.body_br, "gzip": GeoJSONLayer.body_gzip}.get(encoding, GeoJSONLayer.body)
+
+    row = (await db.execute(
+        select(GeoJSONLayer.etag, body_column).where(GeoJSONLayer.level == level)
+    )).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="GeoJSON layer has not been built yet, run a data refresh")
+
+    etag, body = row
+    if body is None:
+        # brotli was unavailable when the layer was built, fall back to gzip
+        encoding = "gzip"
+        body = (await db.execute(
+            select(GeoJSONLayer.body_gzip).where(GeoJSONLayer.level == level)
+        )).scalar_one()
+
+    etag = encoded_etag(etag, encoding)
+    headers = {
+        "ETag": etag,
+        "Vary": "Accept-Encoding",
+        "Cache-Control": "public, max-age=300",
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+
+    return Response(content=body, media_type="application/geo+json", headers=headers)
 
 
 @router.get("/neighborhoods/{neighborhood_id}", response_model=NeighborhoodSchema)
-async def get_neighborhood(neighborhood_id: int, db: Session = Depends(get_db)):
+async def get_neighborhood(neighborhood_id: int, db: AsyncSession = Depends(get_db)):
     """Get a single neighborhood by ID"""
-    neighborhood = db.query(Neighborhood).filter(Neighborhood.id == neighborhood_id).first()
+    neighborhood = await db.get(Neighborhood, neighborhood_id)
     if not neighborhood:
         raise HTTPException(status_code=404, detail="Neighborhood not found")
     return neighborhood
 
 
 @router.get("/neighborhoods/{neighborhood_id}/scores")
-async def get_neighborhood_scores(neighborhood_id: int, db: Session = Depends(get_db)):
+async def get_neighborhood_scores(neighborhood_id: int, db: AsyncSession = Depends(get_db)):
     """Get current scores for a neighborhood"""
-    neighborhood = db.query(Neighborhood).filter(Neighborhood.id == neighborhood_id).first()
+    neighborhood = await db.get(Neighborhood, neighborhood_id)
     if not neighborhood:
         raise HTTPException(status_code=404, detail="Neighborhood not found")
     
-    score = db.query(Score).filter(
-        Score.neighborhood_id == neighborhood_id
-    ).order_by(Score.calculated_at.desc()).first()
+    score = (await db.execute(
+        select(Score)
+        .where(Score.neighborhood_id == neighborhood_id)
+        .order_by(Score.calculated_at.desc())
+        .limit(1)
+    )).scalars().first()
     
     if not score:
         raise HTTPException(status_code=404, detail="No scores found for this neighborhood")
     
     return score
 
+
+async def export_response(model, columns: list, name: str, neighborhood_id: int, start: Optional[datetime],
+                          end: Optional[datetime], fmt: str, after: Optional[str]) -> StreamingResponse:
+    cursor = None
+    if after:
+        try:
+            cursor = parse_cursor(after)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="after must be a 'date,id' cursor, e.g. 2024-05-01T13:45:00,81234")
+
+    # A short-lived session: the export opens its own per page
+    async with AsyncSessionLocal() as db:
+        found = (await db.execute(
+            select(Neighborhood.id).where(Neighborhood.id == neighborhood_id)
+        )).scalar()
+    if found is None:
+        raise HTTPException(status_code=404, detail="Neighborhood not found")
+
+    return StreamingResponse(
+        export_rows(model, columns, neighborhood_id, fmt, start, end, cursor),
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="neighborhood-{neighborhood_id}-{name}.{fmt}"'}
+    )
+
+
+@router.get("/neighborhoods/{neighborhood_id}/incidents")
+async def export_neighborhood_incidents(
+    neighborhood_id: int,
+    start: Optional[datetime] = Query(None, description="Earliest incident date (inclusive)"),
+    end: Optional[datetime] = Query(None, description="Latest incident date (exclusive)"),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    after: Optional[str] = Query(None, description="Resume after this 'date,id' of a previous export")
+):
+    """Stream a neighborhood's crime incidents in (date, id) order as NDJSON or CSV"""
+    return await export_response(CrimeIncident, INCIDENT_EXPORT_COLUMNS, "incidents",
+                                 neighborhood_id, start, end, format, after)
+
+
+@router.get("/neighborhoods/{neighborhood_id}/permits")
+async def export_neighborhood_permits(
+    neighborhood_id: int,
+    start: Optional[datetime] = Query(None, description="Earliest issue date (inclusive)"),
+    end: Optional[datetime] = Query(None, description="Latest issue date (exclusive)"),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    after: Optional[str] = Query(None, description="Resume after this 'date,id' of a previous export")
+):
+    """Stream a neighborhood's building permits in (date, id) order as NDJSON or CSV"""
+    return await export_response(BuildingPermit, PERMIT_EXPORT_COLUMNS, "permits",
+                                 neighborhood_id, start, end, format, after)
+
+
+MONTHLY_STAT_COLUMNS = [
+    NeighborhoodMonthlyStats.month,
+    NeighborhoodMonthlyStats.crime_violent,
+    NeighborhoodMonthlyStats.crime_property,
+    NeighborhoodMonthlyStats.crime_other,
+    NeighborhoodMonthlyStats.permits_residential,
+    NeighborhoodMonthlyStats.permits_commercial,
+    NeighborhoodMonthlyStats.permits_minor,
+    NeighborhoodMonthlyStats.permit_value_residential,
+    NeighborhoodMonthlyStats.permit_value_commercial,
+    NeighborhoodMonthlyStats.permit_value_minor,
+    NeighborhoodMonthlyStats.article_count,
+    case(
+        (NeighborhoodMonthlyStats.article_count > 0,
+         NeighborhoodMonthlyStats.sentiment_sum / NeighborhoodMonthlyStats.article_count),
+        else_=None
+    ).label("average_sentiment"),
+]
+
+
+@router.get("/neighborhoods/{neighborhood_id}/timeseries", response_model=List[MonthlyStats],
+            response_class=FastJSONResponse)
+async def get_neighborhood_timeseries(
+    neighborhood_id: int,
+    start: Optional[datetime] = Query(None, description="Include months from the one containing this date"),
+    end: Optional[datetime] = Query(None, description="Include months starting before this date"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Monthly crime counts by severity, permit counts and values by project type and
+    average article sentiment, read from the precomputed neighborhood_monthly_stats
+    """
+    found = (await db.execute(select(Neighborhood.id).where(Neighborhood.id == neighborhood_id))).scalar()
+    if found is None:
+        raise HTTPException(status_code=404, detail="Neighborhood not found")
+
+    query = select(*MONTHLY_STAT_COLUMNS).where(NeighborhoodMonthlyStats.neighborhood_id == neighborhood_id)
+    if start is not None:
+        query = query.where(NeighborhoodMonthlyStats.month >= datetime(start.year, start.month, 1))
+    if end is not None:
+        query = query.where(NeighborhoodMonthlyStats.month < end)
+    rows = (await db.execute(query.order_by(NeighborhoodMonthlyStats.month))).all()
+    return FastJSONResponse(row_dicts([column.key for column in MONTHLY_STAT_COLUMNS], rows))
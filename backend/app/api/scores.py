@@ -1,116 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from ..database import get_db
-from ..models import Neighborhood, Score, ScoreHistory
-from ..schemas import Score as ScoreSchema, ScoreBreakdown, ScoreProjection
-from sklearn.linear_model import LinearRegression
-import numpy as np
-from datetime import datetime, timedelta
+from ..models import Neighborhood, Score, ScoreProjection
+from ..responses import FastJSONResponse, row_dicts
+from ..score_events import score_event_stream
+from ..schemas import Score as ScoreSchema, ScoreBreakdown, ScoreProjection as ScoreProjectionSchema
 
 router = APIRouter()
 
+PROJECTION_HORIZONS = (1, 3, 5)
 
-@router.get("/scores", response_model=List[ScoreSchema])
-async def get_all_scores(db: Session = Depends(get_db)):
-    """Get all neighborhood scores (latest for each)"""
-    neighborhoods = db.query(Neighborhood).all()
-    scores = []
-    for neighborhood in neighborhoods:
-        score = db.query(Score).filter(
-            Score.neighborhood_id == neighborhood.id
-        ).order_by(Score.calculated_at.desc()).first()
-        if score:
-            scores.append(score)
-    return scores
-
-
-@router.get("/scores/{neighborhood_id}", response_model=ScoreProjection)
-async def get_score_projection(
-    neighborhood_id: int,
-    years: int = Query(1, ge=1, le=5),
-    db: Session = Depends(get_db)
-):
-    """Get score with time projection (1yr, 3yr, or 5yr)"""
-    neighborhood = db.query(Neighborhood).filter(Neighborhood.id == neighborhood_id).first()
-    if not neighborhood:
-        raise HTTPException(status_code=404, detail="Neighborhood not found")
-    
-    # Get current score
-    current_score = db.query(Score).filter(
-        Score.neighborhood_id == neighborhood_id
-    ).order_by(Score.calculated_at.desc()).first()
-    
-    if not current_score:
-        raise HTTPException(status_code=404, detail="No scores found for this neighborhood")
-    
-    # Get historical scores for trend analysis
-    history = db.query(ScoreHistory).filter(
-        ScoreHistory.neighborhood_id == neighborhood_id
-    ).order_by(ScoreHistory.calculated_at.asc()).all()
-    
-    # Calculate projections using linear regression if we have enough history
-    if len(history) >= 3:
-        # Use historical data for projection
-        dates = [(h.calculated_at - history[0].calculated_at).days for h in history]
-        scores = [h.profitability_score for h in history]
-        
-        X = np.array(dates).reshape(-1, 1)
-        y = np.array(scores)
-        
-        model = LinearRegression()
-        model.fit(X, y)
-        
-        # Project forward
-        days_ahead = {1: 365, 3: 1095, 5: 1825}
-        days = days_ahead.get(years, 365)
-        projection = model.predict([[days]])[0]
-        projection = max(0, min(100, projection))  # Clamp to [0, 100]
-        
-        # Determine trend
-        if len(scores) >= 2:
-            recent_trend = scores[-1] - scores[-2]
-            if recent_trend > 0.5:
-                trend = "up"
-            elif recent_trend < -0.5:
-                trend = "down"
-            else:
-                trend = "stable"
-        else:
-            trend = "stable"
-    else:
-        # Not enough history, use current score with small variation
-        projection = current_score.profitability_score
-        trend = "stable"
-    
-    return ScoreProjection(
-        neighborhood_id=neighborhood_id,
-        neighborhood_name=neighborhood.name,
-        current_score=current_score.profitability_score,
-        projection_1yr=projection if years == 1 else current_score.profitability_score,
-        projection_3yr=projection if years == 3 else current_score.profitability_score,
-        projection_5yr=projection if years == 5 else current_score.profitability_score,
-        trend=trend
+
+def parse_int_list(value: Optional[str], name: str) -> Optional[List[int]]:
+    """Parse a comma-separated query parameter such as ids=1,2,3"""
+    if value is None or not value.strip():
+        return None
+    try:
+        return [int(item) for item in value.split(",") if item.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name} must be a comma-separated list of integers")
+
+
+def latest_scores_query(neighborhood_ids: Optional[List[int]] = None):
+    """Select the latest Score row per neighborhood (PostgreSQL DISTINCT ON)"""
+    query = select(Score).distinct(Score.neighborhood_id).order_by(
+        Score.neighborhood_id, Score.calculated_at.desc()
     )
+    if neighborhood_ids is not None:
+        query = query.where(Score.neighborhood_id.in_(neighborhood_ids))
+    return query
 
 
-@router.get("/scores/breakdown/{neighborhood_id}", response_model=ScoreBreakdown)
-async def get_score_breakdown(neighborhood_id: int, db: Session = Depends(get_db)):
-    """Get detailed subscore breakdown for a neighborhood"""
-    neighborhood = db.query(Neighborhood).filter(Neighborhood.id == neighborhood_id).first()
-    if not neighborhood:
-        raise HTTPException(status_code=404, detail="Neighborhood not found")
-    
-    score = db.query(Score).filter(
-        Score.neighborhood_id == neighborhood_id
-    ).order_by(Score.calculated_at.desc()).first()
-    
-    if not score:
-        raise HTTPException(status_code=404, detail="No scores found for this neighborhood")
-    
+def breakdown_from_score(score: Score, neighborhood_name: str) -> ScoreBreakdown:
     return ScoreBreakdown(
-        neighborhood_id=neighborhood_id,
-        neighborhood_name=neighborhood.name,
+        neighborhood_id=score.neighborhood_id,
+        neighborhood_name=neighborhood_name,
         crime_score=score.crime_score,
         infrastructure_score=score.infrastructure_score,
         demographic_score=score.demographic_score,
@@ -119,3 +46,112 @@ async def get_score_breakdown(neighborhood_id: int, db: Session = Depends(get_db
         calculated_at=score.calculated_at
     )
 
+
+def projection_from_row(projection: ScoreProjection, neighborhood_name: str,
+                        years: List[int] = PROJECTION_HORIZONS) -> ScoreProjectionSchema:
+    return ScoreProjectionSchema(
+        neighborhood_id=projection.neighborhood_id,
+        neighborhood_name=neighborhood_name,
+        current_score=projection.current_score,
+        projection_1yr=projection.projection_1yr if 1 in years else None,
+        projection_3yr=projection.projection_3yr if 3 in years else None,
+        projection_5yr=projection.projection_5yr if 5 in years else None,
+        trend=projection.trend
+    )
+
+
+@router.get("/scores", response_model=List[ScoreSchema], response_class=FastJSONResponse)
+async def get_all_scores(db: AsyncSession = Depends(get_db)):
+    """Get all neighborhood scores (latest for each), serialized straight from row tuples"""
+    latest = latest_scores_query().subquery()
+    columns = [column.name for column in latest.c]
+    rows = (await db.execute(select(latest).order_by(latest.c.neighborhood_id))).all()
+    return FastJSONResponse(row_dicts(columns, rows))
+
+
+@router.get("/scores/stream")
+async def stream_score_events(request: Request, last_event_id: Optional[str] = Header(None)):
+    """Server-sent events announcing each committed score refresh
+
+    Every event carries the new score version and the ids of the
+    neighborhoods whose scores changed (null: reload all). Events come from
+    PostgreSQL LISTEN/NOTIFY, so no client polls the database.
+    """
+    return StreamingResponse(
+        score_event_stream(request, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/scores/breakdown", response_model=List[ScoreBreakdown])
+async def get_score_breakdowns(
+    ids: Optional[str] = Query(None, description="Comma-separated neighborhood ids; all neighborhoods if omitted"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get subscore breakdowns for many neighborhoods in one request"""
+    neighborhood_ids = parse_int_list(ids, "ids")
+    latest = latest_scores_query(neighborhood_ids).subquery()
+    rows = (await db.execute(
+        select(Neighborhood.name, latest)
+        .join(latest, latest.c.neighborhood_id == Neighborhood.id)
+        .order_by(Neighborhood.id)
+    )).all()
+    return [breakdown_from_score(row, row.name) for row in rows]
+
+
+@router.get("/projections", response_model=List[ScoreProjectionSchema])
+async def get_score_projections(
+    ids: Optional[str] = Query(None, description="Comma-separated neighborhood ids; all neighborhoods if omitted"),
+    years: Optional[str] = Query(None, description="Comma-separated horizons out of 1,3,5; all if omitted"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get precomputed projections for many neighborhoods in one request"""
+    neighborhood_ids = parse_int_list(ids, "ids")
+    horizons = parse_int_list(years, "years") or PROJECTION_HORIZONS
+    if any(h not in PROJECTION_HORIZONS for h in horizons):
+        raise HTTPException(status_code=400, detail="years must be drawn from 1, 3 and 5")
+
+    query = (
+        select(Neighborhood.name, ScoreProjection)
+        .join(ScoreProjection, ScoreProjection.neighborhood_id == Neighborhood.id)
+        .order_by(Neighborhood.id)
+    )
+    if neighborhood_ids is not None:
+        query = query.where(Neighborhood.id.in_(neighborhood_ids))
+
+    rows = (await db.execute(query)).all()
+    return [projection_from_row(projection, name, horizons) for name, projection in rows]
+
+
+@router.get("/scores/{neighborhood_id}", response_model=ScoreProjectionSchema)
+async def get_score_projection(neighborhood_id: int, db: AsyncSession = Depends(get_db)):
+    """Get current score with precomputed 1yr, 3yr and 5yr projections"""
+    row = (await db.execute(
+        select(Neighborhood.name, ScoreProjection)
+        .outerjoin(ScoreProjection, ScoreProjection.neighborhood_id == Neighborhood.id)
+        .where(Neighborhood.id == neighborhood_id)
+    )).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Neighborhood not found")
+
+    name, projection = row
+    if not projection:
+        raise HTTPException(status_code=404, detail="No scores found for this neighborhood")
+
+    return projection_from_row(projection, name)
+
+
+@router.get("/scores/breakdown/{neighborhood_id}", response_model=ScoreBreakdown)
+async def get_score_breakdown(neighborhood_id: int, db: AsyncSession = Depends(get_db)):
+    """Get detailed subscore breakdown for a neighborhood"""
+    neighborhood = await db.get(Neighborhood, neighborhood_id)
+    if not neighborhood:
+        raise HTTPException(status_code=404, detail="Neighborhood not found")
+
+    score = (await db.execute(latest_scores_query([neighborhood_id]))).scalars().first()
+
+    if not score:
+        raise HTTPException(status_code=404, detail="No scores found for this neighborhood")
+
+    return breakdown_from_score(score, neighborhood.name)
@@ -0,0 +1,191 @@
+from fastapi import APIRouter, Depends, HTTPException, Path as PathParam, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from pathlib import Path
+from typing import Optional
+from ..database import get_db
+from ..versions import get_data_version
+import math
+import os
+import shutil
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+TILE_CACHE_DIR = Path(os.getenv(
+    "TILE_CACHE_DIR",
+    str(Path(__file__).resolve().parents[3] / "data" / "tile_cache")
+))
+
+MVT_MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
+
+# Web Mercator world width in meters
+WORLD_SIZE = 40075016.68557849
+
+# Points are aggregated into CLUSTER_GRID x CLUSTER_GRID cells per tile
+CLUSTER_GRID = 64
+
+NEIGHBORHOOD_LAYER_SQL = text("""
+WITH bounds AS (
+    SELECT ST_TileEnvelope(:z, :x, :y) AS geom
+),
+latest AS (
+    SELECT DISTINCT ON (neighborhood_id)
+        neighborhood_id, profitability_score, crime_score, infrastructure_score,
+        demographic_score, sentiment_score
+    FROM scores
+    ORDER BY neighborhood_id, calculated_at DESC
+),
+features AS (
+    SELECT
+        n.id, n.name, latest.profitability_score, latest.crime_score,
+        latest.infrastructure_score, latest.demographic_score, latest.sentiment_score,
+        ST_AsMVTGeom(ST_Transform(n.geometry, 3857), bounds.geom, 4096, 64, true) AS geom
+    FROM neighborhoods n
+    JOIN bounds ON ST_Intersects(n.geometry, ST_Transform(bounds.geom, 4326))
+    LEFT JOIN latest ON latest.neighborhood_id = n.id
+)
+SELECT ST_AsMVT(features.*, 'neighborhoods', 4096, 'geom') FROM features
+""")
+
+CRIME_LAYER_SQL = text("""
+WITH bounds AS (
+    SELECT ST_TileEnvelope(:z, :x, :y) AS geom
+),
+cells AS (
+    SELECT
+        ST_SnapToGrid(ST_Transform(ST_SetSRID(ST_MakePoint(longitude, latitude), 4326), 3857), :cell) AS point,
+        count(*) AS incidents,
+        count(*) FILTER (WHERE severity = 'violent') AS violent,
+        count(*) FILTER (WHERE severity = 'property') AS property
+    FROM crime_incidents
+    WHERE ST_SetSRID(ST_MakePoint(longitude, latitude), 4326) && ST_MakeEnvelope(:west, :south, :east, :north, 4326)
+    GROUP BY 1
+),
+features AS (
+    SELECT incidents, violent, property,
+        ST_AsMVTGeom(cells.point, bounds.geom, 4096, 0, false) AS geom
+    FROM cells, bounds
+)
+SELECT ST_AsMVT(features.*, 'crime', 4096, 'geom') FROM features WHERE geom IS NOT NULL
+""")
+
+PERMIT_LAYER_SQL = text("""
+WITH bounds AS (
+    SELECT ST_TileEnvelope(:z, :x, :y) AS geom
+),
+cells AS (
+    SELECT
+        ST_SnapToGrid(ST_Transform(ST_SetSRID(ST_MakePoint(longitude, latitude), 4326), 3857), :cell) AS point,
+        count(*) AS permits,
+        count(*) FILTER (WHERE project_type = 'commercial') AS commercial,
+        count(*) FILTER (WHERE project_type = 'residential') AS residential,
+        coalesce(sum(value), 0) AS total_value
+    FROM building_permits
+    WHERE ST_SetSRID(ST_MakePoint(longitude, latitude), 4326) && ST_MakeEnvelope(:west, :south, :east, :north, 4326)
+    GROUP BY 1
+),
+features AS (
+    SELECT permits, commercial, residential, total_value,
+        ST_AsMVTGeom(cells.point, bounds.geom, 4096, 0, false) AS geom
+    FROM cells, bounds
+)
+SELECT ST_AsMVT(features.*, 'permits', 4096, 'geom') FROM features WHERE geom IS NOT NULL
+""")
+
+LAYER_QUERIES = {
+    "neighborhoods": NEIGHBORHOOD_LAYER_SQL,
+    "crime": CRIME_LAYER_SQL,
+    "permits": PERMIT_LAYER_SQL,
+}
+
+
+def tile_bounds(z: int, x: int, y: int) -> dict:
+    """Longitude/latitude bounds of an XYZ tile"""
+    n = 2 ** z
+
+    def latitude(tile_y):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * tile_y / n))))
+
+    return {
+        "west": x / n * 360.0 - 180.0,
+        "east": (x + 1) / n * 360.0 - 180.0,
+        "north": latitude(y),
+        "south": latitude(y + 1),
+    }
+
+
+def read_cached_tile(path: Path) -> Optional[bytes]:
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+def write_cached_tile(path: Path, version_dir: Path, tile: bytes):
+    """Write a tile atomically, pruning caches left over from older refreshes
+
+    Only versions older than the one being written are removed, so a worker
+    that still reads an older data version cannot delete a newer cache.
+    """
+    if not version_dir.exists():
+        version = int(version_dir.name)
+        for stale in TILE_CACHE_DIR.glob("*"):
+            if stale.is_dir() and stale.name.isdigit() and int(stale.name) < version:
+                shutil.rmtree(stale, ignore_errors=True)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.write_bytes(tile)
+    os.replace(tmp_path, path)
+
+
+def tile_response(tile: bytes, version: str) -> Response:
+    headers = {"ETag": f'"{version}"', "Cache-Control": "public, max-age=300"}
+    if not tile:
+        return Response(status_code=204, headers=headers)
+    return Response(content=tile, media_type=MVT_MEDIA_TYPE, headers=headers)
+
+
+@router.get("/tiles/{z}/{x}/{y}.mvt")
+async def get_tile(
+    z: int = PathParam(..., ge=0, le=22),
+    x: int = PathParam(..., ge=0),
+    y: int = PathParam(..., ge=0),
+    layers: str = Query("neighborhoods", description="Comma-separated layers: neighborhoods, crime, permits"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a Mapbox Vector Tile of neighborhoods and clustered incidents/permits"""
+    if x >= 2 ** z or y >= 2 ** z:
+        raise HTTPException(status_code=400, detail="Tile coordinates out of range for zoom level")
+
+    requested = list(dict.fromkeys(layer.strip() for layer in layers.split(",") if layer.strip()))
+    unknown = [layer for layer in requested if layer not in LAYER_QUERIES]
+    if not requested or unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"layers must be drawn from {', '.join(LAYER_QUERIES)}"
+        )
+
+    version = await get_data_version(db)
+    version_dir = TILE_CACHE_DIR / version
+    path = version_dir / "-".join(sorted(requested)) / str(z) / str(x) / f"{y}.mvt"
+
+    tile = await run_in_threadpool(read_cached_tile, path)
+    if tile is not None:
+        return tile_response(tile, version)
+
+    params = {"z": z, "x": x, "y": y, "cell": WORLD_SIZE / 2 ** z / CLUSTER_GRID, **tile_bounds(z, x, y)}
+    parts = []
+    for layer in requested:
+        # MVT layers are independent protobuf messages, so tiles concatenate
+        part = (await db.execute(LAYER_QUERIES[layer], params)).scalar()
+        if part:
+            parts.append(bytes(part))
+    tile = b"".join(parts)
+
+    await run_in_threadpool(write_cached_tile, path, version_dir, tile)
+    return tile_response(tile, version)
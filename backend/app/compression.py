@@ -0,0 +1,161 @@
+import gzip
+import zlib
+from typing import Optional
+
+from .encoding import negotiate_encoding, encoded_etag
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+# Responses smaller than this are sent as they are; compressing them costs
+# more CPU than the bytes saved on the wire
+COMPRESSION_MINIMUM_SIZE = 1024
+
+# Low levels: these responses are built per request, unlike the GeoJSON
+# layers which are compressed once at refresh time with maximum effort
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+COMPRESSIBLE_TYPES = ("application/json", "application/geo+json", "application/x-ndjson", "text/")
+
+# Server-sent events must reach the client as soon as they are written
+UNBUFFERED_TYPES = ("text/event-stream",)
+
+
+class _Gzip:
+    def __init__(self):
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _Brotli:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+def compress_body(body: bytes, encoding: str) -> bytes:
+    """Compress a complete body with the given content-coding"""
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def supported_encodings() -> tuple:
+    return ("br", "gzip") if brotli else ("gzip",)
+
+
+class CompressionMiddleware:
+    """Compress JSON and text responses with brotli or gzip
+
+    The coding is negotiated from Accept-Encoding (brotli preferred).
+    Responses that already carry a Content-Encoding (e.g. the precompressed
+    GeoJSON layers and tiles), non-text types, event streams and bodies
+    under `minimum_size` pass through untouched. Streamed bodies are
+    compressed chunk by chunk.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MINIMUM_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        encoding = negotiate_encoding(
+            headers.get(b"accept-encoding", b"").decode("latin-1"), supported_encodings()
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await self.app(scope, receive, _CompressingSender(send, encoding, self.minimum_size))
+
+
+class _CompressingSender:
+    def __init__(self, send, encoding: str, minimum_size: int):
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start: Optional[dict] = None
+        self.compressor = None
+        self.passthrough = False
+
+    async def __call__(self, message: dict):
+        if message["type"] == "http.response.start":
+            self.start = message
+            self.passthrough = not self._compressible(message)
+            if self.passthrough:
+                await self.send(message)
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            if not more_body:
+                # The whole body in one message: compress only if it is worth it
+                if len(body) < self.minimum_size:
+                    await self.send(self.start)
+                    await self.send(message)
+                    return
+                body = compress_body(body, self.encoding)
+                await self.send(self._compressed_start(len(body)))
+                await self.send({"type": "http.response.body", "body": body})
+                return
+            self.compressor = _Brotli() if self.encoding == "br" else _Gzip()
+            await self.send(self._compressed_start(None))
+
+        chunk = self.compressor.compress(body)
+        if not more_body:
+            chunk += self.compressor.finish()
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    def _compressible(self, start: dict) -> bool:
+        headers = {name.lower(): value for name, value in start.get("headers", [])}
+        if b"content-encoding" in headers:
+            return False
+        content_type = headers.get(b"content-type", b"").decode("latin-1").lower()
+        if content_type.startswith(UNBUFFERED_TYPES):
+            return False
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    def _compressed_start(self, length: Optional[int]) -> dict:
+        headers = [
+            (name, value) for name, value in self.start.get("headers", [])
+            if name.lower() not in (b"content-length", b"vary", b"etag")
+        ]
+        for name, value in self.start.get("headers", []):
+            if name.lower() == b"etag":
+                # The compressed bytes are a different representation
+                etag = value.decode("latin-1")
+                if not etag.startswith("W/"):
+                    etag = encoded_etag(etag, self.encoding)
+                headers.append((name, etag.encode("latin-1")))
+        vary = [value for name, value in self.start.get("headers", []) if name.lower() == b"vary"]
+        vary_values = [v.strip() for value in vary for v in value.split(b",") if v.strip()]
+        if b"accept-encoding" not in [v.lower() for v in vary_values]:
+            vary_values.append(b"Accept-Encoding")
+        headers.append((b"vary", b", ".join(vary_values)))
+        headers.append((b"content-encoding", self.encoding.encode()))
+        if length is not None:
+            headers.append((b"content-length", str(length).encode()))
+        return {**self.start, "headers": headers}
@@ -49,3 +49,39 @@ def load_weights_config(config_path: str = None) -> WeightsConfig:
     weights.validate_sum()
     return weights
 
+
+
+class ScheduleConfig(BaseModel):
+    crime_hours: float = 24
+    infrastructure_hours: float = 24
+    demographics_hours: float = 8760
+    sentiment_hours: float = 168
+    poll_interval_seconds: int = 300
+
+    @validator('crime_hours', 'infrastructure_hours', 'demographics_hours', 'sentiment_hours',
+               'poll_interval_seconds')
+    def validate_positive(cls, v):
+        if v <= 0:
+            raise ValueError("Schedule intervals must be positive")
+        return v
+
+    def cadence_hours(self, source: str) -> float:
+        return getattr(self, f"{source}_hours")
+
+
+def load_schedule_config(config_path: str = None) -> ScheduleConfig:
+    """Load per-source refresh cadences from YAML file or use defaults"""
+    if config_path is None:
+        config_path = os.path.join(
+            Path(__file__).parent.parent,
+            "config",
+            "schedule.yaml"
+        )
+
+    if os.path.exists(config_path):
+        with open(config_path, 'r') as f:
+            config_data = yaml.safe_load(f) or {}
+            return ScheduleConfig(**config_data)
+
+    # Use defaults if config file doesn't exist
+    return ScheduleConfig()
@@ -0,0 +1,54 @@
+from typing import Iterable, Optional
+
+
+def negotiate_encoding(accept_encoding: Optional[str], supported: Iterable[str]) -> Optional[str]:
+    """Pick the first supported content-coding the client accepts
+
+    `supported` is in order of preference, e.g. ("br", "gzip"). Returns None
+    when the response should be sent uncompressed.
+    """
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        try:
+            quality = float(params.strip().partition("=")[2]) if params.strip().startswith("q=") else 1.0
+        except ValueError:
+            quality = 1.0
+        if quality > 0:
+            accepted.add(token)
+
+    for encoding in supported:
+        if encoding in accepted or "*" in accepted:
+            return encoding
+    return None
+
+
+def encoded_etag(etag: str, encoding: Optional[str]) -> str:
+    """Strong ETag of one encoding of a representation
+
+    Each content-coding is a different byte sequence, so it gets its own
+    tag, e.g. "abc" -> "abc-br".
+    """
+    if not encoding:
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches `etag`
+
+    The header is a comma-separated list of tags or `*`; If-None-Match uses
+    weak comparison, so W/ prefixes are ignored.
+    """
+    for tag in (if_none_match or "").split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
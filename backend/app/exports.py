@@ -0,0 +1,86 @@
+import io
+import csv
+from datetime import datetime
+from typing import AsyncIterator, Optional, Tuple
+
+from sqlalchemy import select, tuple_
+
+from .database import AsyncSessionLocal
+from .models import CrimeIncident, BuildingPermit
+from .responses import dumps
+
+# Rows per keyset page; each page runs in its own short transaction
+EXPORT_PAGE_SIZE = 5000
+
+# Rows encoded and sent per chunk
+EXPORT_CHUNK_SIZE = 500
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# Typed columns only; raw_data payloads are not exported
+INCIDENT_EXPORT_COLUMNS = [
+    CrimeIncident.id, CrimeIncident.incident_id, CrimeIncident.date, CrimeIncident.offense_type,
+    CrimeIncident.severity, CrimeIncident.location, CrimeIncident.latitude, CrimeIncident.longitude,
+]
+PERMIT_EXPORT_COLUMNS = [
+    BuildingPermit.id, BuildingPermit.permit_id, BuildingPermit.date, BuildingPermit.permit_type,
+    BuildingPermit.project_type, BuildingPermit.status, BuildingPermit.value, BuildingPermit.location,
+    BuildingPermit.latitude, BuildingPermit.longitude,
+]
+
+
+def parse_cursor(after: str) -> Tuple[datetime, int]:
+    """Parse a `date,id` keyset cursor, e.g. 2024-05-01T13:45:00,81234"""
+    date, _, row_id = after.rpartition(",")
+    return datetime.fromisoformat(date), int(row_id)
+
+
+def _encode_ndjson(names: list, rows) -> bytes:
+    return b"".join(dumps(dict(zip(names, row))) + b"\n" for row in rows)
+
+
+def _encode_csv(names: list, rows) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows(
+        [value.isoformat() if isinstance(value, datetime) else value for value in row] for row in rows
+    )
+    return buffer.getvalue().encode()
+
+
+async def export_rows(model, columns: list, neighborhood_id: int, fmt: str,
+                      start: Optional[datetime] = None, end: Optional[datetime] = None,
+                      after: Optional[Tuple[datetime, int]] = None,
+                      page_size: int = EXPORT_PAGE_SIZE) -> AsyncIterator[bytes]:
+    """Stream a neighborhood's rows in (date, id) order as NDJSON or CSV chunks
+
+    Pages are fetched by keyset on (date, id) rather than OFFSET, so every
+    page is an index range scan over the date partitions in range. Each page
+    is read in full and its session closed before any of it is sent, so a
+    slow client holds at most one page in memory and never pins a pooled
+    connection or an open transaction. `after` resumes past a previous
+    export's last (date, id).
+    """
+    names = [column.key for column in columns]
+    encode = _encode_csv if fmt == "csv" else _encode_ndjson
+    if fmt == "csv":
+        yield encode(names, [names])
+
+    date_index, id_index = names.index("date"), names.index("id")
+    query = select(*columns).where(model.neighborhood_id == neighborhood_id)
+    if start is not None:
+        query = query.where(model.date >= start)
+    if end is not None:
+        query = query.where(model.date < end)
+    query = query.order_by(model.date, model.id)
+
+    cursor = after
+    while True:
+        page = query if cursor is None else query.where(tuple_(model.date, model.id) > tuple_(*cursor))
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(page.limit(page_size))).all()
+        for offset in range(0, len(rows), EXPORT_CHUNK_SIZE):
+            yield encode(names, rows[offset:offset + EXPORT_CHUNK_SIZE])
+        if len(rows) < page_size:
+            return
+        cursor = (rows[-1][date_index], rows[-1][id_index])
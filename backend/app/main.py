@@ -1,12 +1,36 @@
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from .database import engine, Base
-from .api import neighborhoods, scores, admin
+from .database import AsyncSessionLocal, CREATE_SCHEMA_ON_STARTUP, create_schema
+from .api import neighborhoods, scores, admin, tiles, locate
+from .spatial_index import get_neighborhood_index
+from .metrics import REQUEST_LATENCY, render_metrics
+from .compression import CompressionMiddleware
+from .score_events import broadcaster
+import logging
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Housefly API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Nothing touches the database at import time, so workers boot fast and
+    # the app can be imported (e.g. for OpenAPI generation) without one
+    if CREATE_SCHEMA_ON_STARTUP:
+        await create_schema()
+
+    # Warm the point-lookup index so the first /api/locate call is fast;
+    # it is rebuilt on demand whenever a refresh writes new scores
+    try:
+        async with AsyncSessionLocal() as db:
+            await get_neighborhood_index(db)
+    except Exception as e:
+        logger.warning(f"Could not build neighborhood index at startup: {e}")
+    yield
+    await broadcaster.close()
+
+
+app = FastAPI(title="Housefly API", version="1.0.0", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -17,9 +41,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# br/gzip for JSON and text responses above COMPRESSION_MINIMUM_SIZE; responses
+# that are already compressed (GeoJSON layers, tiles) pass through
+app.add_middleware(CompressionMiddleware)
+
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template, not raw path, to keep cardinality bounded
+        route = request.scope.get("route")
+        REQUEST_LATENCY.labels(
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=status
+        ).observe(time.perf_counter() - started)
+
+
 # Include routers
 app.include_router(neighborhoods.router, prefix="/api", tags=["neighborhoods"])
 app.include_router(scores.router, prefix="/api", tags=["scores"])
+app.include_router(tiles.router, prefix="/api", tags=["tiles"])
+app.include_router(locate.router, prefix="/api", tags=["locate"])
 app.include_router(admin.router, prefix="/api", tags=["admin"])
 
 
@@ -32,3 +81,10 @@ async def root():
 async def health():
     return {"status": "healthy"}
 
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics in text exposition format"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
@@ -0,0 +1,138 @@
+import os
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    CONTENT_TYPE_LATEST,
+    generate_latest,
+    multiprocess,
+    push_to_gateway
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Shared by the API and the data pipeline. Under multiple uvicorn workers set
+# PROMETHEUS_MULTIPROC_DIR so every worker's samples are aggregated.
+
+# Refreshes run by the scheduler, cron_refresh.sh or scripts/run_refresh.py
+# happen outside the API, so their samples never reach its /metrics; those
+# entry points push them here instead (e.g. http://localhost:9091)
+PUSHGATEWAY_URL = os.getenv("PROMETHEUS_PUSHGATEWAY")
+
+REQUEST_LATENCY = Histogram(
+    "housefly_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "housefly_db_pool_checkout_wait_seconds",
+    "Time spent waiting for a database connection from the pool",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+)
+
+COLLECTOR_FETCH_SECONDS = Histogram(
+    "housefly_collector_fetch_seconds",
+    "Latency of upstream API fetches per collector",
+    ["source"],
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
+
+COLLECTOR_FETCH_BYTES = Counter(
+    "housefly_collector_fetch_bytes_total",
+    "Bytes downloaded from upstream APIs per collector",
+    ["source"]
+)
+
+COLLECTOR_ROWS = Counter(
+    "housefly_collector_rows_total",
+    "Rows handled by collectors",
+    ["source", "result"]  # result: added, skipped
+)
+
+INGEST_STAGE_RECORDS = Counter(
+    "housefly_ingest_stage_records_total",
+    "Records passed through each stage of a collector's ingest pipeline",
+    ["source", "stage"]  # stage: fetch, transform, write
+)
+
+INGEST_STAGE_BUSY_SECONDS = Counter(
+    "housefly_ingest_stage_busy_seconds_total",
+    "Time each ingest stage spent working, excluding waits on its queues",
+    ["source", "stage"]
+)
+
+PROCESSOR_SECONDS = Histogram(
+    "housefly_processor_duration_seconds",
+    "Duration of each subscore processor",
+    ["processor", "cached"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+)
+
+REFRESH_STAGE_SECONDS = Histogram(
+    "housefly_refresh_stage_duration_seconds",
+    "Duration of each refresh pipeline stage",
+    ["stage", "status"],
+    buckets=(0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+)
+
+REFRESH_SECONDS = Histogram(
+    "housefly_refresh_duration_seconds",
+    "End-to-end refresh pipeline duration",
+    ["status"],
+    buckets=(1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0)
+)
+
+REFRESH_LAST_SUCCESS = Gauge(
+    "housefly_refresh_last_success_timestamp_seconds",
+    "Unix time of the last successful refresh",
+    multiprocess_mode="max"
+)
+
+SCORE_STREAM_CLIENTS = Gauge(
+    "housefly_score_stream_clients",
+    "Clients connected to /api/scores/stream",
+    multiprocess_mode="livesum"
+)
+
+SCORE_EVENTS = Counter(
+    "housefly_score_events_total",
+    "Score version events received over LISTEN/NOTIFY and fanned out to stream clients"
+)
+
+
+def observe_fetch(source: str, seconds: float, num_bytes: int):
+    COLLECTOR_FETCH_SECONDS.labels(source=source).observe(seconds)
+    COLLECTOR_FETCH_BYTES.labels(source=source).inc(num_bytes)
+
+
+def record_rows(source: str, added: int, skipped: int):
+    COLLECTOR_ROWS.labels(source=source, result="added").inc(added)
+    COLLECTOR_ROWS.labels(source=source, result="skipped").inc(skipped)
+
+
+def render_metrics():
+    """Return (body, content type) in Prometheus text exposition format"""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+def push_metrics(job: str):
+    """Push this process's samples to the Pushgateway, if one is configured
+
+    Each push replaces the job's previous one; a failed push is logged and
+    never fails the refresh.
+    """
+    if not PUSHGATEWAY_URL:
+        return
+    try:
+        push_to_gateway(PUSHGATEWAY_URL, job=job, registry=REGISTRY)
+    except Exception as e:
+        logger.warning(f"Could not push metrics to {PUSHGATEWAY_URL}: {e}")
@@ -1,7 +1,10 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text
+from sqlalchemy import (
+    Column, Integer, String, Float, DateTime, ForeignKey, Text, LargeBinary,
+    Index, UniqueConstraint, DDL, event, text
+)
 from sqlalchemy.dialects.postgresql import JSONB
 from geoalchemy2 import Geometry
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
 from .database import Base
 
@@ -16,6 +19,7 @@ class Neighborhood(Base):
 
     scores = relationship("Score", back_populates="neighborhood")
     score_history = relationship("ScoreHistory", back_populates="neighborhood")
+    projection = relationship("ScoreProjection", back_populates="neighborhood", uselist=False)
 
 
 class Score(Base):
@@ -35,6 +39,9 @@ class Score(Base):
 
 class ScoreHistory(Base):
     __tablename__ = "score_history"
+    __table_args__ = (
+        Index("ix_score_history_neighborhood_id_calculated_at", "neighborhood_id", "calculated_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     neighborhood_id = Column(Integer, ForeignKey("neighborhoods.id"), nullable=False)
@@ -48,40 +55,153 @@ class ScoreHistory(Base):
     neighborhood = relationship("Neighborhood", back_populates="score_history")
 
 
+class ScoreHistoryRollup(Base):
+    """Score history older than the raw retention window, one row per period
+
+    Score columns hold the mean over the period; see data_pipeline/retention.py.
+    """
+    __tablename__ = "score_history_rollups"
+    __table_args__ = (
+        UniqueConstraint("neighborhood_id", "resolution", "period_start",
+                         name="uq_score_history_rollups_period"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    neighborhood_id = Column(Integer, ForeignKey("neighborhoods.id"), nullable=False)
+    resolution = Column(String, nullable=False)  # week, month
+    period_start = Column(DateTime, nullable=False)
+    sample_count = Column(Integer, nullable=False)
+    calculated_at = Column(DateTime, nullable=False)  # mean time of the rolled-up samples
+    crime_score = Column(Float, nullable=False)
+    infrastructure_score = Column(Float, nullable=False)
+    demographic_score = Column(Float, nullable=False)
+    sentiment_score = Column(Float, nullable=False)
+    profitability_score = Column(Float, nullable=False)
+    profitability_min = Column(Float, nullable=False)
+    profitability_max = Column(Float, nullable=False)
+
+
+class ScoreProjection(Base):
+    __tablename__ = "score_projections"
+
+    id = Column(Integer, primary_key=True, index=True)
+    neighborhood_id = Column(Integer, ForeignKey("neighborhoods.id"), unique=True, nullable=False)
+    current_score = Column(Float, nullable=False)
+    projection_1yr = Column(Float, nullable=False)
+    projection_3yr = Column(Float, nullable=False)
+    projection_5yr = Column(Float, nullable=False)
+    trend = Column(String, nullable=False)  # up, down, stable
+    calculated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    neighborhood = relationship("Neighborhood", back_populates="projection")
+
+
+class GeoJSONLayer(Base):
+    __tablename__ = "geojson_layers"
+
+    id = Column(Integer, primary_key=True, index=True)
+    level = Column(String, unique=True, index=True, nullable=False)  # full, medium, low
+    tolerance = Column(Float, nullable=False)
+    body = Column(LargeBinary, nullable=False)
+    body_gzip = Column(LargeBinary, nullable=False)
+    body_br = Column(LargeBinary)  # None when brotli is not installed
+    etag = Column(String, nullable=False)
+    built_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class RefreshRun(Base):
+    __tablename__ = "refresh_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    trigger = Column(String, nullable=False)  # cron, api, scheduler, manual
+    status = Column(String, nullable=False, index=True)  # running, succeeded, failed
+    started_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    finished_at = Column(DateTime)
+    error = Column(Text)
+    stats = Column(JSONB)  # per-stage rows and durations
+
+
+class RefreshSchedule(Base):
+    __tablename__ = "refresh_schedules"
+
+    source = Column(String, primary_key=True)  # crime, infrastructure, demographics, sentiment
+    next_run_at = Column(DateTime, nullable=False)
+    last_run_at = Column(DateTime)
+    last_rows = Column(Integer)
+
+
+class StageCache(Base):
+    __tablename__ = "stage_cache"
+
+    stage = Column(String, primary_key=True)  # crime, infrastructure, demographics, sentiment, profitability
+    fingerprint = Column(String, nullable=False)
+    outputs = Column(JSONB)  # neighborhood id -> subscore
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+# Indexed point of a located incident or permit; the tile layers filter on
+# this exact expression so the GiST index applies
+POINT_EXPRESSION = "ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)"
+
+
 class CrimeIncident(Base):
     __tablename__ = "crime_incidents"
+    # Monthly range partitions on date (see data_pipeline/partitions.py);
+    # unique constraints must include the partition key
+    __table_args__ = (
+        UniqueConstraint("incident_id", "date", name="uq_crime_incidents_incident_id_date"),
+        Index("ix_crime_incidents_date_brin", "date", postgresql_using="brin"),
+        Index("ix_crime_incidents_neighborhood_id_date", "neighborhood_id", "date"),
+        Index("ix_crime_incidents_point_gist", text(POINT_EXPRESSION), postgresql_using="gist"),
+        {"postgresql_partition_by": "RANGE (date)"},
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    incident_id = Column(String, unique=True, index=True)
-    date = Column(DateTime, nullable=False)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    incident_id = Column(String, index=True)
+    date = Column(DateTime, primary_key=True)
     location = Column(String)
     offense_type = Column(String)
     severity = Column(String)  # violent, property, other
     latitude = Column(Float)
     longitude = Column(Float)
     neighborhood_id = Column(Integer, ForeignKey("neighborhoods.id"))
-    raw_data = Column(JSONB)
+    raw_data = deferred(Column(JSONB))  # full upstream record, loaded only on access
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
 class BuildingPermit(Base):
     __tablename__ = "building_permits"
+    __table_args__ = (
+        UniqueConstraint("permit_id", "date", name="uq_building_permits_permit_id_date"),
+        Index("ix_building_permits_date_brin", "date", postgresql_using="brin"),
+        Index("ix_building_permits_neighborhood_id_date", "neighborhood_id", "date"),
+        Index("ix_building_permits_point_gist", text(POINT_EXPRESSION), postgresql_using="gist"),
+        {"postgresql_partition_by": "RANGE (date)"},
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    permit_id = Column(String, unique=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    permit_id = Column(String, index=True)
     permit_type = Column(String)
     location = Column(String)
-    date = Column(DateTime)
+    date = Column(DateTime, primary_key=True)
     status = Column(String)
     value = Column(Float)
     project_type = Column(String)  # commercial, residential, minor
     latitude = Column(Float)
     longitude = Column(Float)
     neighborhood_id = Column(Integer, ForeignKey("neighborhoods.id"))
-    raw_data = Column(JSONB)
+    raw_data = deferred(Column(JSONB))
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
+# Rows outside every monthly partition land here until
+# scripts/create_partitions.py moves them into their month
+for _table in (CrimeIncident.__table__, BuildingPermit.__table__):
+    event.listen(_table, "after_create", DDL(
+        f"CREATE TABLE IF NOT EXISTS {_table.name}_default PARTITION OF {_table.name} DEFAULT"
+    ))
+
+
 class DemographicsProfile(Base):
     __tablename__ = "demographics_profiles"
 
@@ -107,6 +227,34 @@ class NewsArticle(Base):
     url = Column(String)
     sentiment_score = Column(Float)  # VADER compound score
     neighborhood_id = Column(Integer, ForeignKey("neighborhoods.id"), nullable=True)
-    raw_data = Column(JSONB)
+    raw_data = deferred(Column(JSONB))
     created_at = Column(DateTime, default=datetime.utcnow)
 
+
+
+class NeighborhoodMonthlyStats(Base):
+    """Monthly per-neighborhood counts for time series charts
+
+    Maintained incrementally by the collectors and rebuilt on demand; see
+    data_pipeline/monthly_stats.py.
+    """
+    __tablename__ = "neighborhood_monthly_stats"
+    __table_args__ = (
+        UniqueConstraint("neighborhood_id", "month", name="uq_neighborhood_monthly_stats_month"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    neighborhood_id = Column(Integer, ForeignKey("neighborhoods.id"), nullable=False)
+    month = Column(DateTime, nullable=False)  # first day of the month
+    crime_violent = Column(Integer, nullable=False, default=0)
+    crime_property = Column(Integer, nullable=False, default=0)
+    crime_other = Column(Integer, nullable=False, default=0)
+    permits_residential = Column(Integer, nullable=False, default=0)
+    permits_commercial = Column(Integer, nullable=False, default=0)
+    permits_minor = Column(Integer, nullable=False, default=0)
+    permit_value_residential = Column(Float, nullable=False, default=0)
+    permit_value_commercial = Column(Float, nullable=False, default=0)
+    permit_value_minor = Column(Float, nullable=False, default=0)
+    article_count = Column(Integer, nullable=False, default=0)
+    sentiment_sum = Column(Float, nullable=False, default=0)  # sum of VADER compounds
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
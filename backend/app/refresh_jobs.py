@@ -0,0 +1,172 @@
+import time
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional
+from .database import SessionLocal, engine
+from .models import RefreshRun
+
+logger = logging.getLogger(__name__)
+
+# Number of finished jobs kept around for status polling
+MAX_JOBS = 50
+
+# How often an attached job re-checks a refresh run owned by another process
+ATTACH_POLL_SECONDS = 5
+
+# A single worker: refresh runs never overlap within one API process
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="refresh")
+_jobs = OrderedDict()
+_jobs_lock = threading.Lock()
+
+
+class RefreshStageProgress:
+    def __init__(self, name: str):
+        self.name = name
+        self.status = "pending"  # pending, running, succeeded, failed, skipped
+        self.rows = None
+        self.started_at = None
+        self.finished_at = None
+        self.duration_seconds = None
+
+
+class RefreshJob:
+    """State of one background refresh, updated as a pipeline listener"""
+
+    def __init__(self, profile: bool = False):
+        self.job_id = uuid.uuid4().hex
+        self.run_id = None
+        self.attached = False  # True when following a run started elsewhere
+        self.status = "queued"  # queued, running, succeeded, failed
+        self.created_at = datetime.now()
+        self.started_at = None
+        self.finished_at = None
+        self.error = None
+        self.stages = []
+        self.profile = profile
+        self.profile_report = None
+
+    def _stage(self, name: str) -> RefreshStageProgress:
+        for stage in self.stages:
+            if stage.name == name:
+                return stage
+        stage = RefreshStageProgress(name)
+        self.stages.append(stage)
+        return stage
+
+    def pipeline_started(self, run_id, stage_names):
+        self.run_id = run_id
+        self.stages = [RefreshStageProgress(name) for name in stage_names]
+
+    def stage_started(self, name):
+        stage = self._stage(name)
+        stage.status = "running"
+        stage.started_at = datetime.now()
+
+    def stage_finished(self, name, rows, seconds):
+        stage = self._stage(name)
+        stage.status = "succeeded"
+        stage.rows = rows
+        stage.finished_at = datetime.now()
+        stage.duration_seconds = seconds
+
+    def stage_failed(self, name, error, seconds):
+        stage = self._stage(name)
+        stage.status = "failed"
+        stage.finished_at = datetime.now()
+        stage.duration_seconds = seconds
+
+    def stage_skipped(self, name, reason):
+        self._stage(name).status = "skipped"
+
+
+def _follow_run(job: RefreshJob, run_id: int):
+    """Wait for a refresh run owned by another process and mirror its outcome"""
+    from data_pipeline.locking import refresh_lock, RefreshAlreadyRunning
+
+    job.run_id = run_id
+    job.attached = True
+    logger.info(f"Refresh job {job.job_id} attached to in-flight run #{run_id}")
+
+    while True:
+        try:
+            # Once the lock is free the other process has finished or died
+            with refresh_lock(engine):
+                break
+        except RefreshAlreadyRunning:
+            time.sleep(ATTACH_POLL_SECONDS)
+
+    db = SessionLocal()
+    try:
+        run = db.get(RefreshRun, run_id)
+        if run is None or run.status == "running":
+            job.status = "failed"
+            job.error = f"Refresh run #{run_id} was interrupted"
+        else:
+            job.status = run.status
+            job.error = run.error
+    finally:
+        db.close()
+
+
+def _run_job(job: RefreshJob):
+    """Run the refresh pipeline for a job on the executor thread"""
+    # Imported here so the API does not load the collectors at startup
+    from data_pipeline.refresh import run_refresh_pipeline
+    from data_pipeline.locking import RefreshAlreadyRunning
+    from data_pipeline.profiling import RefreshProfiler
+
+    job.status = "running"
+    job.started_at = datetime.now()
+    db = SessionLocal()
+    profiler = RefreshProfiler(engine) if job.profile else None
+    try:
+        with profiler or nullcontext():
+            run_refresh_pipeline(db, listeners=[job, profiler] if profiler else [job], trigger="api")
+        job.status = "succeeded"
+    except RefreshAlreadyRunning as e:
+        if e.run_id is not None:
+            _follow_run(job, e.run_id)
+        else:
+            job.status = "failed"
+            job.error = str(e)
+    except Exception as e:
+        logger.error(f"Refresh job {job.job_id} failed: {e}")
+        job.status = "failed"
+        job.error = str(e)
+    finally:
+        if profiler and profiler.report_path:
+            job.profile_report = str(profiler.report_path)
+        job.finished_at = datetime.now()
+        db.close()
+
+
+def submit_refresh_job(profile: bool = False) -> RefreshJob:
+    """Queue a refresh on the background executor and return its job
+
+    If this process already has a refresh queued or running, that job is
+    returned instead of starting another one. With `profile` the run is
+    profiled and the report path is recorded on the job.
+    """
+    with _jobs_lock:
+        for existing in _jobs.values():
+            if existing.status in ("queued", "running"):
+                logger.info(f"Refresh already in progress, returning job {existing.job_id}")
+                return existing
+
+        job = RefreshJob(profile=profile)
+        _jobs[job.job_id] = job
+        while len(_jobs) > MAX_JOBS:
+            _jobs.popitem(last=False)
+    _executor.submit(_run_job, job)
+    logger.info(f"Queued refresh job {job.job_id}")
+    return job
+
+
+def get_refresh_job(job_id: str) -> Optional[RefreshJob]:
+    with _jobs_lock:
+        return _jobs.get(job_id)
@@ -0,0 +1,35 @@
+from typing import Any, Iterable, Sequence
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, pydantic-core's encoder is the fallback
+    orjson = None
+    from pydantic_core import to_json
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize plain Python data (dicts, lists, datetimes, numbers) to JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return to_json(content)
+
+
+def row_dicts(columns: Sequence[str], rows: Iterable[Sequence]) -> list:
+    """Pair each row tuple with the column names, in column order"""
+    return [dict(zip(columns, row)) for row in rows]
+
+
+class FastJSONResponse(Response):
+    """JSON response serialized with orjson, skipping response_model validation
+
+    Endpoints return it with content already shaped like their
+    response_model (typically built straight from result row tuples), so
+    FastAPI neither validates nor re-encodes it; the declared
+    response_model still documents the shape in OpenAPI.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
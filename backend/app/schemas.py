@@ -51,9 +51,9 @@ class ScoreProjection(BaseModel):
     neighborhood_id: int
     neighborhood_name: str
     current_score: float
-    projection_1yr: float
-    projection_3yr: float
-    projection_5yr: float
+    projection_1yr: Optional[float] = None  # None when the horizon was not requested
+    projection_3yr: Optional[float] = None
+    projection_5yr: Optional[float] = None
     trend: str  # "up", "down", "stable"
 
 
@@ -65,8 +65,52 @@ class NeighborhoodList(BaseModel):
     neighborhoods: List[NeighborhoodWithScores]
 
 
-class RefreshStatus(BaseModel):
-    status: str
-    message: str
-    timestamp: datetime
+class MonthlyStats(BaseModel):
+    month: datetime  # first day of the month
+    crime_violent: int
+    crime_property: int
+    crime_other: int
+    permits_residential: int
+    permits_commercial: int
+    permits_minor: int
+    permit_value_residential: float
+    permit_value_commercial: float
+    permit_value_minor: float
+    article_count: int
+    average_sentiment: Optional[float] = None  # None without articles that month
+
+
+class LocateResponse(BaseModel):
+    count: int
+    version: str
+    neighborhood_ids: List[Optional[int]]  # None when outside every neighborhood
+    profitability_scores: List[Optional[float]]
+
+
+class RefreshStageStatus(BaseModel):
+    name: str
+    status: str  # "pending", "running", "succeeded", "failed", "skipped"
+    rows: Optional[int] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    duration_seconds: Optional[float] = None
+
+    class Config:
+        from_attributes = True
+
+
+class RefreshJobStatus(BaseModel):
+    job_id: str
+    run_id: Optional[int] = None
+    attached: bool = False  # following a refresh started by another process
+    status: str  # "queued", "running", "succeeded", "failed"
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    stages: List[RefreshStageStatus] = []
+    profile_report: Optional[str] = None  # path of the profile report, if profiled
+
+    class Config:
+        from_attributes = True
 
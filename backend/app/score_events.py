@@ -0,0 +1,165 @@
+import json
+import asyncio
+from datetime import datetime
+from typing import Iterable, Optional
+
+import psycopg
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from .database import ASYNC_DATABASE_URL, AsyncSessionLocal
+from .metrics import SCORE_STREAM_CLIENTS, SCORE_EVENTS
+from .versions import get_score_version, format_score_version
+import logging
+
+logger = logging.getLogger(__name__)
+
+# PostgreSQL channel the score calculator notifies after committing new scores
+SCORE_CHANNEL = "housefly_scores"
+
+# NOTIFY payloads must stay under 8000 bytes; larger id lists are sent as null
+MAX_NOTIFY_PAYLOAD = 7900
+
+# Events buffered per client; a client this far behind only needs the newest
+SUBSCRIBER_QUEUE_SIZE = 8
+
+# Comment lines keep idle connections open through proxies
+SSE_HEARTBEAT_SECONDS = 15
+
+# Browser reconnect delay sent in the stream's `retry` field
+SSE_RETRY_MS = 5000
+
+LISTEN_RECONNECT_MIN_SECONDS = 1
+LISTEN_RECONNECT_MAX_SECONDS = 60
+
+# libpq connection string for the dedicated LISTEN connection
+LISTEN_CONNINFO = make_url(ASYNC_DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+def notify_scores_changed(db: Session, calculated_at: datetime, neighborhood_ids: Iterable[int]):
+    """Queue a score event on the pipeline's transaction
+
+    PostgreSQL delivers it to every listening API worker when the
+    transaction commits, and drops it if it rolls back.
+    """
+    version = format_score_version(calculated_at)
+    payload = json.dumps({"version": version, "neighborhood_ids": sorted(neighborhood_ids)})
+    if len(payload) > MAX_NOTIFY_PAYLOAD:
+        payload = json.dumps({"version": version, "neighborhood_ids": None})
+    db.execute(select(func.pg_notify(SCORE_CHANNEL, payload)))
+
+
+def format_event(event: dict) -> str:
+    """One SSE `scores` message; its id is the version, for Last-Event-ID on reconnect"""
+    return f"id: {event['version']}\nevent: scores\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
+
+
+class ScoreEventBroadcaster:
+    """Fans score events from one LISTEN connection out to this worker's stream clients
+
+    The listener starts with the first subscriber and reconnects with
+    backoff. Notifications sent while it was disconnected are lost, so
+    after reconnecting it compares the stored score version with the last
+    one it saw and, if they differ, publishes an event without ids telling
+    clients to reload everything.
+    """
+
+    def __init__(self, conninfo: str):
+        self.conninfo = conninfo
+        self.version: Optional[str] = None
+        self._subscribers = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        SCORE_STREAM_CLIENTS.inc()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        if queue in self._subscribers:
+            self._subscribers.discard(queue)
+            SCORE_STREAM_CLIENTS.dec()
+
+    def publish(self, event: dict):
+        self.version = event["version"]
+        SCORE_EVENTS.inc()
+        for queue in list(self._subscribers):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    async def _resync(self):
+        async with AsyncSessionLocal() as db:
+            version = await get_score_version(db)
+        if self.version is not None and version != self.version:
+            self.publish({"version": version, "neighborhood_ids": None})
+        self.version = version
+
+    async def _listen(self):
+        delay = LISTEN_RECONNECT_MIN_SECONDS
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(self.conninfo, autocommit=True) as conn:
+                    await conn.execute(f"LISTEN {SCORE_CHANNEL}")
+                    logger.info(f"Listening for score events on {SCORE_CHANNEL}")
+                    delay = LISTEN_RECONNECT_MIN_SECONDS
+                    await self._resync()
+                    async for notify in conn.notifies():
+                        try:
+                            self.publish(json.loads(notify.payload))
+                        except (ValueError, KeyError) as e:
+                            logger.warning(f"Ignoring malformed score event {notify.payload!r}: {e}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Score event listener disconnected: {e}; reconnecting in {delay}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, LISTEN_RECONNECT_MAX_SECONDS)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+
+broadcaster = ScoreEventBroadcaster(LISTEN_CONNINFO)
+
+
+async def score_event_stream(request, last_event_id: Optional[str]):
+    """Server-sent events for one client until it disconnects
+
+    Subscribes before reading the current version, so a refresh committed
+    in between is queued rather than lost, and unsubscribes however the
+    stream ends.
+    """
+    queue = broadcaster.subscribe()
+    try:
+        # A short-lived session: no pooled connection is held while the stream is open
+        async with AsyncSessionLocal() as db:
+            version = await get_score_version(db)
+        yield f"retry: {SSE_RETRY_MS}\n"
+        # An id without data sets the client's Last-Event-ID without firing an event
+        yield f"id: {version}\n\n"
+        if last_event_id and last_event_id != version:
+            # Reconnected after missing a refresh: ids are unknown, reload everything
+            yield format_event({"version": version, "neighborhood_ids": None})
+
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=SSE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    return
+                yield ": ping\n\n"
+                continue
+            yield format_event(event)
+    finally:
+        broadcaster.unsubscribe(queue)
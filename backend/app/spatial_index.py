@@ -0,0 +1,74 @@
+import asyncio
+import logging
+from typing import Optional
+
+import numpy as np
+import shapely
+from shapely.strtree import STRtree
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import Neighborhood, Score
+from .versions import get_score_version
+
+logger = logging.getLogger(__name__)
+
+
+class NeighborhoodIndex:
+    """In-memory STRtree over neighborhood polygons with their current scores"""
+
+    def __init__(self, neighborhood_ids: np.ndarray, geometries: np.ndarray,
+                 scores: np.ndarray, version: str):
+        self.neighborhood_ids = neighborhood_ids
+        self.geometries = geometries
+        self.scores = scores
+        self.version = version
+        self.tree = STRtree(geometries)
+
+    def locate(self, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+        """Return the position of the containing neighborhood for each point, or -1"""
+        points = shapely.points(longitudes, latitudes)  # shapely uses (lon, lat)
+        point_idx, geometry_idx = self.tree.query(points, predicate="within")
+
+        # Points on a shared border can match twice; keep the first match
+        positions = np.full(len(points), -1, dtype=np.int64)
+        positions[point_idx[::-1]] = geometry_idx[::-1]
+        return positions
+
+
+_index: Optional[NeighborhoodIndex] = None
+_index_lock = asyncio.Lock()
+
+
+async def build_neighborhood_index(db: AsyncSession, version: str) -> NeighborhoodIndex:
+    """Load neighborhood geometries and latest scores into a new index"""
+    latest = select(Score.neighborhood_id, Score.profitability_score).distinct(
+        Score.neighborhood_id
+    ).order_by(Score.neighborhood_id, Score.calculated_at.desc()).subquery()
+
+    rows = (await db.execute(
+        select(Neighborhood.id, func.ST_AsBinary(Neighborhood.geometry), latest.c.profitability_score)
+        .outerjoin(latest, latest.c.neighborhood_id == Neighborhood.id)
+        .order_by(Neighborhood.id)
+    )).all()
+
+    neighborhood_ids = np.array([row[0] for row in rows], dtype=np.int64)
+    geometries = shapely.from_wkb([bytes(row[1]) for row in rows])
+    scores = np.array([row[2] if row[2] is not None else np.nan for row in rows], dtype=np.float64)
+
+    logger.info(f"Built neighborhood spatial index with {len(rows)} polygons (version {version})")
+    return NeighborhoodIndex(neighborhood_ids, geometries, scores, version)
+
+
+async def get_neighborhood_index(db: AsyncSession) -> NeighborhoodIndex:
+    """Return the shared index, rebuilding it when a refresh has produced new scores"""
+    global _index
+
+    version = await get_score_version(db)
+    if _index is not None and _index.version == version:
+        return _index
+
+    async with _index_lock:
+        if _index is None or _index.version != version:
+            _index = await build_neighborhood_index(db, version)
+    return _index
@@ -0,0 +1,33 @@
+from datetime import datetime
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .models import Score, RefreshRun
+
+
+async def get_score_version(db: AsyncSession) -> str:
+    """Identify the current refresh by the timestamp of the newest score
+
+    Caches that depend on refreshed data (tiles, spatial indexes) key on this
+    value and are invalidated when it changes.
+    """
+    latest = (await db.execute(select(func.max(Score.calculated_at)))).scalar()
+    return format_score_version(latest)
+
+
+async def get_data_version(db: AsyncSession) -> str:
+    """Identify the stored source data by the latest finished refresh run
+
+    Scores are only rewritten when a value changes, so a refresh that adds
+    incidents or permits can leave the score version as it was. Caches of
+    the source rows themselves (crime and permit tiles) key on this value,
+    which changes with every run. Failed runs count too: collectors commit
+    batch by batch, so they may have stored rows.
+    """
+    latest = (await db.execute(
+        select(func.max(RefreshRun.id)).where(RefreshRun.status != "running")
+    )).scalar()
+    return str(latest or 0)
+
+
+def format_score_version(calculated_at: datetime) -> str:
+    return calculated_at.strftime("%Y%m%d%H%M%S") if calculated_at else "0"
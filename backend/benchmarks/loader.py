@@ -0,0 +1,161 @@
+from datetime import datetime
+from itertools import islice
+
+import numpy as np
+from geoalchemy2.shape import from_shape
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.models import Neighborhood, CrimeIncident, BuildingPermit, DemographicsProfile, NewsArticle
+from app.spatial_index import NeighborhoodIndex
+from data_pipeline.normalizers import get_severity, get_project_type
+from . import synthetic
+import logging
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 10000
+
+
+def prepare_database(engine):
+    """Create PostGIS and all tables in the benchmark database"""
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS postgis"))
+    Base.metadata.create_all(bind=engine)
+
+
+def reset_database(db: Session, tables=None):
+    """Empty the given tables (default: all of them) and restart their ids"""
+    names = ", ".join(table.name for table in (tables or Base.metadata.sorted_tables))
+    db.execute(text(f"TRUNCATE {names} RESTART IDENTITY CASCADE"))
+    db.commit()
+
+
+def _batches(records, size: int = BATCH_SIZE):
+    records = iter(records)
+    while batch := list(islice(records, size)):
+        yield batch
+
+
+def _locate(index: NeighborhoodIndex, batch: list) -> list:
+    lats = np.array([float(record["latitude"]) for record in batch])
+    lons = np.array([float(record["longitude"]) for record in batch])
+    positions = index.locate(lats, lons)
+    return [int(index.neighborhood_ids[p]) if p >= 0 else None for p in positions]
+
+
+def load_neighborhoods(db: Session, neighborhoods: list) -> NeighborhoodIndex:
+    """Insert (name, geometry) pairs and return a spatial index over them"""
+    ids = db.execute(
+        insert(Neighborhood).returning(Neighborhood.id),
+        [{"name": name, "geometry": from_shape(geometry, srid=4326)} for name, geometry in neighborhoods]
+    ).scalars().all()
+    db.commit()
+    geometries = np.array([geometry for _, geometry in neighborhoods], dtype=object)
+    return NeighborhoodIndex(
+        np.array(ids, dtype=np.int64), geometries, np.full(len(ids), np.nan), "synthetic"
+    )
+
+
+def load_incidents(db: Session, records, index: NeighborhoodIndex) -> int:
+    """Bulk insert API-shaped crime records, bypassing the collector"""
+    count = 0
+    for batch in _batches(records):
+        owners = _locate(index, batch)
+        db.execute(insert(CrimeIncident), [
+            {
+                "incident_id": record["incident_number"],
+                "date": datetime.fromisoformat(record["incident_datetime"]),
+                "location": record["address"],
+                "offense_type": record["offense_type"],
+                "severity": get_severity(record["offense_type"]),
+                "latitude": float(record["latitude"]),
+                "longitude": float(record["longitude"]),
+                "neighborhood_id": owner,
+                "raw_data": record,
+            }
+            for record, owner in zip(batch, owners)
+        ])
+        db.commit()
+        count += len(batch)
+    return count
+
+
+def load_permits(db: Session, records, index: NeighborhoodIndex) -> int:
+    """Bulk insert API-shaped permit records, bypassing the collector"""
+    count = 0
+    for batch in _batches(records):
+        owners = _locate(index, batch)
+        rows = []
+        for record, owner in zip(batch, owners):
+            value = float(record["estimated_cost"])
+            rows.append({
+                "permit_id": record["permit_number"],
+                "permit_type": record["permit_type"],
+                "location": record["address"],
+                "date": datetime.fromisoformat(record["issue_date"]),
+                "status": record["status"],
+                "value": value,
+                "project_type": get_project_type(record["permit_type"], value),
+                "latitude": float(record["latitude"]),
+                "longitude": float(record["longitude"]),
+                "neighborhood_id": owner,
+                "raw_data": record,
+            })
+        db.execute(insert(BuildingPermit), rows)
+        db.commit()
+        count += len(batch)
+    return count
+
+
+def load_articles(db: Session, records) -> int:
+    """Bulk insert GNews-shaped articles, bypassing the collector"""
+    count = 0
+    for batch in _batches(records):
+        db.execute(insert(NewsArticle), [
+            {
+                "article_id": record["url"],
+                "title": record["title"],
+                "content": record["description"],
+                "published_at": datetime.fromisoformat(record["publishedAt"].replace("Z", "+00:00")),
+                "source": record["source"]["name"],
+                "url": record["url"],
+                "raw_data": record,
+            }
+            for record in batch
+        ])
+        db.commit()
+        count += len(batch)
+    return count
+
+
+def load_demographics(db: Session, index: NeighborhoodIndex, seed: int = 4) -> int:
+    profiles = synthetic.generate_demographics(len(index.neighborhood_ids), seed=seed)
+    db.execute(insert(DemographicsProfile), [
+        {"neighborhood_id": int(neighborhood_id), **profile}
+        for neighborhood_id, profile in zip(index.neighborhood_ids, profiles)
+    ])
+    db.commit()
+    return len(profiles)
+
+
+def seed_database(db: Session, neighborhoods: int = 35, incidents: int = 100000,
+                  permits: int = 25000, articles: int = 5000, seed: int = 0) -> dict:
+    """Replace all data with a deterministic synthetic city
+
+    Identical arguments produce identical rows (apart from dates, which are
+    relative to now), so timings compare across commits.
+    """
+    reset_database(db)
+    polygons = synthetic.generate_neighborhoods(neighborhoods, seed=seed)
+    index = load_neighborhoods(db, polygons)
+    counts = {
+        "neighborhoods": len(polygons),
+        "incidents": load_incidents(db, synthetic.generate_incidents(incidents, polygons, seed=seed + 1), index),
+        "permits": load_permits(db, synthetic.generate_permits(permits, polygons, seed=seed + 2), index),
+        "articles": load_articles(db, synthetic.generate_articles(articles, polygons, seed=seed + 3)),
+        "demographics": load_demographics(db, index, seed=seed + 4),
+    }
+    logger.info(f"Seeded synthetic data: {counts}")
+    return counts
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Load test for the read API with latency budgets.
+Usage: python -m benchmarks.loadtest [--url URL] [--users 50] [--duration 60] [--warmup 5]
+                                     [--budgets config/load_budgets.yaml]
+                                     [--save results.json] [--baseline results.json]
+
+Each virtual user replays the map page: it loads neighborhoods, scores and
+the medium GeoJSON layer in parallel, then opens a few neighborhood popups
+(breakdown and projection in parallel). Reports throughput and p50/p95/p99
+latency per endpoint and exits non-zero when a budget in the budgets file is
+exceeded or, with --baseline, when p95 or throughput regressed by more than
+`max_regression`.
+
+Run it against an API backed by a database seeded with `python -m benchmarks.seed`
+so results compare across commits.
+"""
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import logging
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+import numpy as np
+import yaml
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logger = logging.getLogger(__name__)
+logging.getLogger("httpx").setLevel(logging.WARNING)  # one line per request otherwise
+
+DEFAULT_BUDGETS = Path(__file__).parent.parent / "config" / "load_budgets.yaml"
+
+# Mean number of popups opened per map page view
+MEAN_POPUPS = 3
+
+
+class LoadRecorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.recording = False
+
+    async def get(self, client: httpx.AsyncClient, name: str, path: str):
+        started = time.perf_counter()
+        try:
+            response = await client.get(path)
+            failed = response.status_code >= 400
+        except httpx.HTTPError:
+            response, failed = None, True
+        if self.recording:
+            self.latencies[name].append(time.perf_counter() - started)
+            if failed:
+                self.errors[name] += 1
+        return response
+
+
+async def map_page_session(client: httpx.AsyncClient, recorder: LoadRecorder, neighborhood_ids: list, rng):
+    """One map page view followed by a few popups"""
+    await asyncio.gather(
+        recorder.get(client, "neighborhoods", "/api/neighborhoods"),
+        recorder.get(client, "scores", "/api/scores"),
+        recorder.get(client, "geojson", "/api/neighborhoods.geojson?level=medium"),
+    )
+    for _ in range(int(rng.expovariate(1 / MEAN_POPUPS))):
+        neighborhood_id = rng.choice(neighborhood_ids)
+        await asyncio.gather(
+            recorder.get(client, "breakdown", f"/api/scores/breakdown/{neighborhood_id}"),
+            recorder.get(client, "projection", f"/api/scores/{neighborhood_id}"),
+        )
+
+
+async def run_load(url: str, users: int, duration: float, warmup: float, seed: int) -> dict:
+    recorder = LoadRecorder()
+    limits = httpx.Limits(max_connections=users * 3, max_keepalive_connections=users * 3)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60.0) as client:
+        response = await client.get("/api/neighborhoods")
+        response.raise_for_status()
+        neighborhood_ids = [row["id"] for row in response.json()]
+        if not neighborhood_ids:
+            raise RuntimeError("No neighborhoods in the database, seed it with `python -m benchmarks.seed`")
+
+        deadline = time.perf_counter() + warmup + duration
+
+        async def user(index: int):
+            rng = random.Random(seed + index)
+            while time.perf_counter() < deadline:
+                await map_page_session(client, recorder, neighborhood_ids, rng)
+
+        async def start_recording():
+            await asyncio.sleep(warmup)
+            recorder.recording = True
+            return time.perf_counter()
+
+        tasks = [asyncio.create_task(user(i)) for i in range(users)]
+        recording_started = await start_recording()
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - recording_started
+
+    return summarize(recorder, elapsed, url, users)
+
+
+def _stats(latencies: list, errors: int, elapsed: float) -> dict:
+    values = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99]) if len(values) else (0.0, 0.0, 0.0)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "error_rate": errors / len(values) if len(values) else 0.0,
+        "requests_per_second": len(values) / elapsed if elapsed else 0.0,
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+    }
+
+
+def summarize(recorder: LoadRecorder, elapsed: float, url: str, users: int) -> dict:
+    every = [latency for values in recorder.latencies.values() for latency in values]
+    return {
+        "url": url,
+        "users": users,
+        "elapsed_seconds": elapsed,
+        "overall": _stats(every, sum(recorder.errors.values()), elapsed),
+        "endpoints": {
+            name: _stats(values, recorder.errors[name], elapsed)
+            for name, values in sorted(recorder.latencies.items())
+        },
+    }
+
+
+def check_budgets(results: dict, budgets: dict, baseline: dict = None) -> list:
+    """Return a description of every budget the results exceed"""
+    failures = []
+
+    def check(label: str, stats: dict, limits: dict):
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            if metric in limits and stats[metric] > limits[metric]:
+                failures.append(f"{label} {metric} {stats[metric]:.1f} > {limits[metric]}")
+        if "max_error_rate" in limits and stats["error_rate"] > limits["max_error_rate"]:
+            failures.append(f"{label} error rate {stats['error_rate']:.3f} > {limits['max_error_rate']}")
+        if "min_requests_per_second" in limits and stats["requests_per_second"] < limits["min_requests_per_second"]:
+            failures.append(
+                f"{label} throughput {stats['requests_per_second']:.1f} req/s < {limits['min_requests_per_second']}"
+            )
+
+    check("overall", results["overall"], budgets.get("overall", {}))
+    for name, limits in (budgets.get("endpoints") or {}).items():
+        if name in results["endpoints"]:
+            check(name, results["endpoints"][name], limits)
+
+    if baseline:
+        tolerance = 1 + budgets.get("max_regression", 0.2)
+        pairs = [("overall", results["overall"], baseline["overall"])] + [
+            (name, stats, baseline["endpoints"][name])
+            for name, stats in results["endpoints"].items() if name in baseline.get("endpoints", {})
+        ]
+        for label, after, before in pairs:
+            if before["p95_ms"] and after["p95_ms"] > before["p95_ms"] * tolerance:
+                failures.append(f"{label} p95 regressed {before['p95_ms']:.1f} -> {after['p95_ms']:.1f} ms")
+        before_rps = baseline["overall"]["requests_per_second"]
+        after_rps = results["overall"]["requests_per_second"]
+        if before_rps and after_rps * tolerance < before_rps:
+            failures.append(f"throughput regressed {before_rps:.1f} -> {after_rps:.1f} req/s")
+    return failures
+
+
+def print_results(results: dict):
+    logger.info(f"{results['users']} users for {results['elapsed_seconds']:.1f}s against {results['url']}")
+    logger.info(f"{'endpoint':<16}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    rows = list(results["endpoints"].items()) + [("overall", results["overall"])]
+    for name, stats in rows:
+        logger.info(
+            f"{name:<16}{stats['requests']:>10}{stats['errors']:>8}{stats['requests_per_second']:>10.1f}"
+            f"{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the read API against latency budgets")
+    parser.add_argument("--url", default="http://localhost:8000", help="Base URL of a running Housefly API")
+    parser.add_argument("--users", type=int, default=50, help="Number of concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=60, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="Unmeasured seconds before recording")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the traffic mix")
+    parser.add_argument("--budgets", default=DEFAULT_BUDGETS, help="YAML file with latency budgets")
+    parser.add_argument("--save", help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare against results previously written with --save")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_load(args.url, args.users, args.duration, args.warmup, args.seed))
+    print_results(results)
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(results, indent=2))
+
+    budgets = yaml.safe_load(Path(args.budgets).read_text()) or {}
+    baseline = json.loads(Path(args.baseline).read_text()) if args.baseline else None
+    failures = check_budgets(results, budgets, baseline)
+    for failure in failures:
+        logger.error(f"Budget exceeded: {failure}")
+    if failures:
+        sys.exit(1)
+    logger.info("All budgets met")
+
+
+if __name__ == "__main__":
+    main()
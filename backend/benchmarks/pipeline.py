@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmarks for the data pipeline against synthetic data.
+Usage: python -m benchmarks.pipeline [--sizes 1000,10000,100000] [--ingest-sizes 250,500,1000]
+                                     [--neighborhoods 35] [--save curves.json] [--baseline curves.json]
+                                     [--max-exponent 1.3]
+
+Runs against BENCHMARK_DATABASE_URL (a throwaway PostGIS database: every
+table in it is truncated). For each input size it times each
+process_all_*_scores function and calculate_profitability_scores on a fresh
+synthetic city, and each collector's ingest path with the upstream API
+replaced by a synthetic payload. Prints a table, fits a log-log scaling
+exponent per benchmark (1.0 = linear, 2.0 = quadratic) and optionally
+compares against a saved baseline.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+from contextlib import ExitStack
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.models import CrimeIncident, BuildingPermit, NewsArticle, StageCache
+from data_pipeline.collectors import crime_collector, infrastructure_collector, sentiment_collector
+from data_pipeline.processors import (
+    crime_processor,
+    infrastructure_processor,
+    demographics_processor,
+    sentiment_processor
+)
+from data_pipeline.calculator import calculate_profitability_scores
+from benchmarks import loader, synthetic
+
+logging.basicConfig(level=logging.WARNING, format='%(message)s')
+logger = logging.getLogger("benchmarks.pipeline")
+logger.setLevel(logging.INFO)
+
+# Secondary inputs scale with the number of crime incidents
+PERMITS_PER_INCIDENT = 0.25
+ARTICLES_PER_INCIDENT = 0.05
+
+PROCESSOR_BENCHMARKS = [
+    ("process_all_crime_scores", crime_processor.process_all_crime_scores),
+    ("process_all_infrastructure_scores", infrastructure_processor.process_all_infrastructure_scores),
+    ("process_all_demographic_scores", demographics_processor.process_all_demographic_scores),
+    ("process_all_sentiment_scores", sentiment_processor.process_all_sentiment_scores),
+    ("calculate_profitability_scores", lambda db: calculate_profitability_scores(db, force=True)),
+]
+
+
+class SyntheticResponse:
+    """Stands in for requests.Response, serving a synthetic API payload"""
+
+    status_code = 200
+
+    def __init__(self, payload):
+        self.content = json.dumps(payload).encode("utf-8")
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        pass
+
+
+def collector_benchmarks(polygons: list, size: int) -> list:
+    """(name, table, module, payload, call) for each collector's ingest path"""
+    return [
+        ("collect_crime_data", CrimeIncident, crime_collector,
+         list(synthetic.generate_incidents(size, polygons)),
+         lambda db: crime_collector.collect_crime_data(db, limit=size)),
+        ("collect_infrastructure_data", BuildingPermit, infrastructure_collector,
+         list(synthetic.generate_permits(size, polygons)),
+         lambda db: infrastructure_collector.collect_infrastructure_data(db, limit=size)),
+        ("collect_sentiment_data", NewsArticle, sentiment_collector,
+         {"articles": list(synthetic.generate_articles(size, polygons))},
+         lambda db: sentiment_collector.collect_sentiment_data(db)),
+    ]
+
+
+def timed(call, db: Session, repeat: int) -> float:
+    """Best of `repeat` runs, in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call(db)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run_processor_benchmarks(engine, sizes: list, neighborhoods: int, repeat: int) -> dict:
+    curves = {name: [] for name, _ in PROCESSOR_BENCHMARKS}
+    for size in sizes:
+        with Session(engine) as db:
+            counts = loader.seed_database(
+                db, neighborhoods=neighborhoods, incidents=size,
+                permits=int(size * PERMITS_PER_INCIDENT), articles=int(size * ARTICLES_PER_INCIDENT)
+            )
+            logger.info(f"Seeded {counts}")
+            for name, call in PROCESSOR_BENCHMARKS:
+                db.query(StageCache).delete()
+                db.commit()
+                seconds = timed(call, db, repeat)
+                curves[name].append([size, seconds])
+                logger.info(f"  {name:<36} n={size:<9} {seconds:9.3f}s")
+    return curves
+
+
+def run_collector_benchmarks(engine, sizes: list, neighborhoods: int) -> dict:
+    curves = {}
+    polygons = synthetic.generate_neighborhoods(neighborhoods)
+    with Session(engine) as db:
+        loader.reset_database(db)
+        loader.load_neighborhoods(db, polygons)
+        for size in sizes:
+            for name, model, module, payload, call in collector_benchmarks(polygons, size):
+                loader.reset_database(db, [model.__table__])
+                with ExitStack() as stack:
+                    stack.enter_context(mock.patch.object(
+                        module.requests, "get", return_value=SyntheticResponse(payload)
+                    ))
+                    stack.enter_context(mock.patch.dict(os.environ, {"GNEWS_API_KEY": "synthetic"}))
+                    seconds = timed(call, db, 1)
+                curves.setdefault(name, []).append([size, seconds])
+                logger.info(f"  {name:<36} n={size:<9} {seconds:9.3f}s")
+    return curves
+
+
+def scaling_exponent(points: list) -> float:
+    """Slope of log(seconds) against log(size)"""
+    sizes, seconds = np.array(points, dtype=float).T
+    if len(sizes) < 2:
+        return float("nan")
+    return float(np.polyfit(np.log(sizes), np.log(np.maximum(seconds, 1e-6)), 1)[0])
+
+
+def report(curves: dict, baseline: dict = None) -> dict:
+    exponents = {}
+    logger.info(f"\n{'benchmark':<36}{'exponent':>10}  seconds by size")
+    for name, points in curves.items():
+        exponents[name] = scaling_exponent(points)
+        timings = "  ".join(f"{int(size)}:{seconds:.3f}" for size, seconds in points)
+        logger.info(f"{name:<36}{exponents[name]:>10.2f}  {timings}")
+        if baseline and name in baseline.get("curves", {}):
+            before = {size: seconds for size, seconds in baseline["curves"][name]}
+            ratios = "  ".join(
+                f"{int(size)}:{seconds / before[size]:.2f}x"
+                for size, seconds in points if before.get(size)
+            )
+            logger.info(f"{'':<36}{'vs base':>10}  {ratios}")
+    return exponents
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pipeline scaling on synthetic data")
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="Crime incident counts for the processor benchmarks")
+    parser.add_argument("--ingest-sizes", default="250,500,1000",
+                        help="Record counts for the collector ingest benchmarks")
+    parser.add_argument("--neighborhoods", type=int, default=35, help="Number of synthetic neighborhoods")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per processor benchmark (best is kept)")
+    parser.add_argument("--skip-collectors", action="store_true", help="Only benchmark the processors")
+    parser.add_argument("--save", help="Write the curves as JSON to this file")
+    parser.add_argument("--baseline", help="Compare against curves previously written with --save")
+    parser.add_argument("--max-exponent", type=float,
+                        help="Exit non-zero if any benchmark scales worse than this exponent")
+    args = parser.parse_args()
+
+    url = os.getenv("BENCHMARK_DATABASE_URL")
+    if not url:
+        logger.error("Set BENCHMARK_DATABASE_URL to a throwaway PostGIS database (all tables are truncated)")
+        sys.exit(2)
+
+    engine = create_engine(url)
+    loader.prepare_database(engine)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    curves = run_processor_benchmarks(engine, sizes, args.neighborhoods, args.repeat)
+    if not args.skip_collectors:
+        ingest_sizes = [int(size) for size in args.ingest_sizes.split(",")]
+        curves.update(run_collector_benchmarks(engine, ingest_sizes, args.neighborhoods))
+
+    baseline = json.loads(Path(args.baseline).read_text()) if args.baseline else None
+    exponents = report(curves, baseline)
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(
+            {"neighborhoods": args.neighborhoods, "curves": curves, "exponents": exponents}, indent=2
+        ))
+        logger.info(f"\nSaved curves to {args.save}")
+
+    if args.max_exponent is not None:
+        worst = {name: value for name, value in exponents.items() if value > args.max_exponent}
+        if worst:
+            logger.error(f"\nScaling regression (exponent > {args.max_exponent}): {worst}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
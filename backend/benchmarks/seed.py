@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Seed a database with the synthetic city used by the load test.
+Usage: python -m benchmarks.seed [--neighborhoods 35] [--incidents 100000] [--seed 0]
+
+Runs against BENCHMARK_DATABASE_URL (every table in it is truncated), then
+computes scores, projections and GeoJSON layers so the read API has the same
+data on every run. Start the API on the same database afterwards:
+
+    DATABASE_URL=$BENCHMARK_DATABASE_URL uvicorn app.main:app
+"""
+import os
+import sys
+import argparse
+import logging
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from data_pipeline.calculator import calculate_profitability_scores
+from data_pipeline.projections import calculate_score_projections
+from data_pipeline.geojson_builder import build_neighborhood_layers
+from benchmarks import loader
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a benchmark database with synthetic data")
+    parser.add_argument("--neighborhoods", type=int, default=35)
+    parser.add_argument("--incidents", type=int, default=100000)
+    parser.add_argument("--permits", type=int, default=25000)
+    parser.add_argument("--articles", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    url = os.getenv("BENCHMARK_DATABASE_URL")
+    if not url:
+        logger.error("Set BENCHMARK_DATABASE_URL to a throwaway PostGIS database (all tables are truncated)")
+        sys.exit(2)
+
+    engine = create_engine(url)
+    loader.prepare_database(engine)
+    with Session(engine) as db:
+        loader.seed_database(
+            db, neighborhoods=args.neighborhoods, incidents=args.incidents,
+            permits=args.permits, articles=args.articles, seed=args.seed
+        )
+        calculate_profitability_scores(db, force=True)
+        calculate_score_projections(db)
+        build_neighborhood_layers(db)
+    logger.info("Benchmark database seeded")
+
+
+if __name__ == "__main__":
+    main()
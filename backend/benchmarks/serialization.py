@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Serialization and compression cost of the list endpoints, per row.
+Usage: python -m benchmarks.serialization [--rows 10000] [--repeat 5]
+
+Builds a synthetic /api/neighborhoods payload (neighborhoods with their
+latest scores) as result row tuples and times turning it into response
+bytes three ways: the response_model path FastAPI takes by default
+(validation, jsonable conversion, stdlib json), Pydantic's
+TypeAdapter.dump_json after validation, and FastJSONResponse straight
+from the tuples. Then times br and gzip at the middleware's settings on
+the resulting body. No database or server is needed.
+"""
+import json
+import time
+import argparse
+import logging
+from datetime import datetime, timedelta
+from typing import List
+
+import numpy as np
+from pydantic import TypeAdapter
+
+from app.compression import compress_body, supported_encodings
+from app.responses import FastJSONResponse
+from app.schemas import NeighborhoodWithScores
+from app.api.neighborhoods import SCORE_FIELDS
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logger = logging.getLogger(__name__)
+
+
+def synthetic_rows(n: int, seed: int = 0) -> list:
+    """Row tuples shaped like the /api/neighborhoods query result"""
+    rng = np.random.default_rng(seed)
+    created = datetime(2024, 1, 1)
+    calculated = created + timedelta(days=200)
+    subscores = rng.random((n, 4))
+    profitability = rng.random(n) * 100
+    return [
+        (i + 1, f"Synthetic Heights {i + 1:05d}", created,
+         i + 1, i + 1, *map(float, subscores[i]), float(profitability[i]),
+         calculated + timedelta(seconds=i))
+        for i in range(n)
+    ]
+
+
+def as_payload(rows: list) -> list:
+    return [
+        {"id": row[0], "name": row[1], "created_at": row[2], "scores": dict(zip(SCORE_FIELDS, row[3:]))}
+        for row in rows
+    ]
+
+
+def response_model_path(rows: list, adapter: TypeAdapter) -> bytes:
+    """What FastAPI does with a returned list and response_model"""
+    validated = adapter.validate_python(as_payload(rows))
+    return json.dumps(adapter.dump_python(validated, mode="json"), ensure_ascii=False,
+                      allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def type_adapter_path(rows: list, adapter: TypeAdapter) -> bytes:
+    return adapter.dump_json(adapter.validate_python(as_payload(rows)))
+
+
+def fast_path(rows: list, adapter: TypeAdapter) -> bytes:
+    return FastJSONResponse(as_payload(rows)).body
+
+
+def best_time(function, *args, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark list endpoint serialization and compression")
+    parser.add_argument("--rows", type=int, default=10000, help="Synthetic neighborhoods in the payload")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (best is kept)")
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.rows)
+    adapter = TypeAdapter(List[NeighborhoodWithScores])
+
+    logger.info(f"{args.rows} rows, best of {args.repeat}\n")
+    logger.info(f"{'serializer':<16} {'total ms':>9} {'us/row':>8} {'bytes':>10}")
+    body = None
+    for name, function in (("response_model", response_model_path),
+                           ("TypeAdapter", type_adapter_path),
+                           ("orjson rows", fast_path)):
+        seconds, body = best_time(function, rows, adapter, repeat=args.repeat)
+        logger.info(f"{name:<16} {seconds * 1000:9.1f} {seconds * 1e6 / args.rows:8.2f} {len(body):10d}")
+
+    logger.info(f"\n{'encoding':<16} {'total ms':>9} {'us/row':>8} {'bytes':>10} {'ratio':>6}")
+    for encoding in supported_encodings():
+        seconds, compressed = best_time(compress_body, body, encoding, repeat=args.repeat)
+        logger.info(
+            f"{encoding:<16} {seconds * 1000:9.1f} {seconds * 1e6 / args.rows:8.2f} "
+            f"{len(compressed):10d} {len(body) / len(compressed):6.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
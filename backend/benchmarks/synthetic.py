@@ -0,0 +1,189 @@
+import math
+from datetime import datetime, timedelta
+
+import numpy as np
+from shapely.geometry import MultiPolygon, box
+
+# Roughly the City of Buffalo (lon/lat)
+BUFFALO_BOUNDS = (-78.92, 42.83, -78.79, 42.97)
+
+# Share of generated points that fall outside every neighborhood
+OUTSIDE_FRACTION = 0.02
+
+# Upstream-style offense and permit types with their relative frequencies
+OFFENSE_TYPES = [
+    ("Larceny/Theft", 0.34), ("Assault", 0.18), ("Burglary", 0.12), ("Theft of Vehicle", 0.09),
+    ("Robbery", 0.06), ("Vandalism", 0.08), ("Weapons Violation", 0.03), ("Homicide", 0.005),
+    ("Disorderly Conduct", 0.055), ("Trespassing", 0.05),
+]
+PERMIT_TYPES = [
+    ("Residential Alteration", 0.35), ("Electrical", 0.2), ("Plumbing", 0.15),
+    ("Commercial Alteration", 0.1), ("New Dwelling", 0.05), ("Demolition", 0.05),
+    ("Retail Fit-Out", 0.04), ("Office Renovation", 0.03), ("Roofing", 0.03),
+]
+PERMIT_STATUSES = ["Issued", "Closed", "In Review", "Expired"]
+POSITIVE_WORDS = ["celebrates", "new park opens in", "growth in", "award for", "revival of"]
+NEGATIVE_WORDS = ["shooting in", "fire damages", "crime rises in", "closure hits", "protest in"]
+
+
+def neighborhood_name(i: int, width: int) -> str:
+    # Fixed-width numbering so no name is a substring of another
+    return f"Synthetic Heights {i:0{width}d}"
+
+
+def generate_neighborhoods(n: int, seed: int = 0) -> list:
+    """Split the city bounds into n grid cells with jittered edges
+
+    Returns (name, MultiPolygon) pairs. Cells are rectangles so points
+    sampled inside a cell always belong to exactly that neighborhood.
+    """
+    rng = np.random.default_rng(seed)
+    min_lon, min_lat, max_lon, max_lat = BUFFALO_BOUNDS
+    cols = math.ceil(math.sqrt(n))
+    rows = math.ceil(n / cols)
+    lon_edges = np.linspace(min_lon, max_lon, cols + 1)
+    lat_edges = np.linspace(min_lat, max_lat, rows + 1)
+    # Jitter interior edges so neighborhoods differ in size
+    lon_edges[1:-1] += rng.uniform(-0.3, 0.3, cols - 1) * (lon_edges[1] - lon_edges[0])
+    lat_edges[1:-1] += rng.uniform(-0.3, 0.3, rows - 1) * (lat_edges[1] - lat_edges[0])
+
+    width = len(str(n))
+    neighborhoods = []
+    for i in range(n):
+        row, col = divmod(i, cols)
+        cell = box(lon_edges[col], lat_edges[row], lon_edges[col + 1], lat_edges[row + 1])
+        neighborhoods.append((neighborhood_name(i + 1, width), MultiPolygon([cell])))
+    return neighborhoods
+
+
+def _hotspot_weights(n: int, rng) -> np.ndarray:
+    """Heavy-tailed activity per neighborhood, a few hotspots and a long tail"""
+    weights = rng.pareto(1.5, n) + 0.1
+    return weights / weights.sum()
+
+
+def sample_points(n: int, bounds: np.ndarray, weights: np.ndarray, rng):
+    """Sample (lats, lons) clustered by neighborhood, a few outside the city"""
+    cells = rng.choice(len(bounds), size=n, p=weights)
+    # Stay off the shared edges so each point has a single owner
+    u = rng.uniform(0.01, 0.99, (n, 2))
+    lons = bounds[cells, 0] + u[:, 0] * (bounds[cells, 2] - bounds[cells, 0])
+    lats = bounds[cells, 1] + u[:, 1] * (bounds[cells, 3] - bounds[cells, 1])
+
+    outside = rng.random(n) < OUTSIDE_FRACTION
+    min_lon, min_lat, _, max_lat = BUFFALO_BOUNDS
+    lons[outside] = rng.uniform(min_lon - 0.2, min_lon - 0.05, outside.sum())
+    lats[outside] = rng.uniform(min_lat, max_lat, outside.sum())
+    return lats, lons
+
+
+def sample_dates(n: int, rng, now: datetime = None, scale_days: float = 365.0,
+                 max_days: int = 5 * 365) -> list:
+    """Dates skewed towards the present, exponentially thinning into the past"""
+    now = now or datetime.now()
+    seconds = np.minimum(rng.exponential(scale_days, n), max_days) * 86400
+    return [now - timedelta(seconds=float(s)) for s in seconds]
+
+
+def _choice(options: list, n: int, rng) -> np.ndarray:
+    labels = [label for label, _ in options]
+    weights = np.array([weight for _, weight in options])
+    return np.array(labels)[rng.choice(len(labels), size=n, p=weights / weights.sum())]
+
+
+def generate_incidents(n: int, neighborhoods: list, seed: int = 1, now: datetime = None,
+                       chunk_size: int = 50000):
+    """Yield crime incidents shaped like the Buffalo Open Data API response"""
+    rng = np.random.default_rng(seed)
+    bounds = np.array([geometry.bounds for _, geometry in neighborhoods])
+    weights = _hotspot_weights(len(neighborhoods), rng)
+    for start in range(0, n, chunk_size):
+        size = min(chunk_size, n - start)
+        lats, lons = sample_points(size, bounds, weights, rng)
+        offenses = _choice(OFFENSE_TYPES, size, rng)
+        dates = sample_dates(size, rng, now)
+        for i in range(size):
+            yield {
+                "incident_number": f"SYN-C{start + i:09d}",
+                "incident_datetime": dates[i].isoformat(timespec="seconds"),
+                "offense_type": str(offenses[i]),
+                "address": f"{100 + (start + i) % 9900} Synthetic St",
+                "latitude": f"{lats[i]:.6f}",
+                "longitude": f"{lons[i]:.6f}",
+            }
+
+
+def generate_permits(n: int, neighborhoods: list, seed: int = 2, now: datetime = None,
+                     chunk_size: int = 50000):
+    """Yield building permits shaped like the Buffalo Open Data API response"""
+    rng = np.random.default_rng(seed)
+    bounds = np.array([geometry.bounds for _, geometry in neighborhoods])
+    weights = _hotspot_weights(len(neighborhoods), rng)
+    for start in range(0, n, chunk_size):
+        size = min(chunk_size, n - start)
+        lats, lons = sample_points(size, bounds, weights, rng)
+        types = _choice(PERMIT_TYPES, size, rng)
+        # Permit values are roughly log-normal: many small jobs, few large projects
+        values = rng.lognormal(mean=9.5, sigma=1.4, size=size)
+        statuses = rng.choice(PERMIT_STATUSES, size=size)
+        dates = sample_dates(size, rng, now, scale_days=540.0)
+        for i in range(size):
+            yield {
+                "permit_number": f"SYN-P{start + i:09d}",
+                "issue_date": dates[i].isoformat(timespec="seconds"),
+                "permit_type": str(types[i]),
+                "status": str(statuses[i]),
+                "estimated_cost": f"{values[i]:.2f}",
+                "address": f"{100 + (start + i) % 9900} Synthetic Ave",
+                "latitude": f"{lats[i]:.6f}",
+                "longitude": f"{lons[i]:.6f}",
+            }
+
+
+def generate_articles(n: int, neighborhoods: list, seed: int = 3, now: datetime = None,
+                      mention_rate: float = 0.6, chunk_size: int = 50000):
+    """Yield news articles shaped like the GNews API response
+
+    About `mention_rate` of the articles name one neighborhood, with a
+    positive or negative headline.
+    """
+    rng = np.random.default_rng(seed)
+    names = [name for name, _ in neighborhoods]
+    weights = _hotspot_weights(len(names), rng)
+    for start in range(0, n, chunk_size):
+        size = min(chunk_size, n - start)
+        mentions = rng.random(size) < mention_rate
+        targets = rng.choice(len(names), size=size, p=weights)
+        positive = rng.random(size) < 0.5
+        phrases = rng.integers(0, len(POSITIVE_WORDS), size)
+        dates = sample_dates(size, rng, now, scale_days=120.0, max_days=365)
+        for i in range(size):
+            words = POSITIVE_WORDS if positive[i] else NEGATIVE_WORDS
+            subject = names[targets[i]] if mentions[i] else "Buffalo"
+            title = f"{words[phrases[i]].capitalize()} {subject}"
+            yield {
+                "title": title,
+                "description": f"{title}. Residents and officials respond.",
+                "url": f"https://news.example.com/synthetic/{start + i}",
+                "publishedAt": dates[i].strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "source": {"name": "Synthetic News"},
+            }
+
+
+def generate_demographics(n: int, seed: int = 4) -> list:
+    """n demographics profiles, as column dicts"""
+    rng = np.random.default_rng(seed)
+    incomes = rng.lognormal(mean=10.6, sigma=0.4, size=n)
+    ages = rng.normal(36, 5, n).clip(20, 65)
+    households = rng.normal(2.4, 0.3, n).clip(1.2, 4.5)
+    populations = rng.integers(1500, 25000, n)
+    return [
+        {
+            "income_median": float(incomes[i]),
+            "age_median": float(ages[i]),
+            "household_size_avg": float(households[i]),
+            "population": int(populations[i]),
+            "raw_data": {"source": "synthetic"},
+        }
+        for i in range(n)
+    ]
@@ -1,8 +1,11 @@
 #!/bin/bash
-# Daily cron job script for Housefly data refresh
-# Add to crontab with: 0 2 * * * /path/to/housefly/backend/cron_refresh.sh
+# Cron job script for Housefly data refresh
+# Each data source refreshes on its own cadence (config/schedule.yaml), so this
+# can run often; runs where nothing is due are near no-ops.
+# Add to crontab with: 0 * * * * /path/to/housefly/backend/cron_refresh.sh
+# Set PROMETHEUS_PUSHGATEWAY in the crontab to export refresh metrics (see README).
 
 cd "$(dirname "$0")"
 source venv/bin/activate 2>/dev/null || true
-python scripts/run_refresh.py >> logs/cron_refresh.log 2>&1
-
+python scripts/create_partitions.py >> logs/cron_refresh.log 2>&1
+python scripts/run_scheduler.py --once >> logs/cron_refresh.log 2>&1
@@ -0,0 +1,241 @@
+import numpy as np
+from datetime import date, datetime, timedelta
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+from app.models import (
+    Neighborhood, CrimeIncident, BuildingPermit, NewsArticle, ScoreHistory, ScoreHistoryRollup
+)
+from app.config import load_weights_config
+from .processors import crime_processor, infrastructure_processor, demographics_processor
+from .processors.sentiment_processor import (
+    SENTIMENT_WINDOW_DAYS,
+    get_analyzer,
+    match_article_to_neighborhood
+)
+from .projections import calculate_score_projections
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class HistoryExists(Exception):
+    """Raised when the backfill range already has score history"""
+
+
+def _day_numbers(dates, origin: np.datetime64) -> np.ndarray:
+    return (np.array(dates, dtype="datetime64[D]") - origin).astype(np.int64)
+
+
+def _decayed_sums(owners: np.ndarray, days: np.ndarray, weights: np.ndarray,
+                  shape: tuple, as_of: np.ndarray, decay: float):
+    """Time-decayed weight sums and counts of records dated before each as-of day
+
+    The decay is separable, exp(-c * (T - d)) = exp(-c * T) * exp(c * d), so a
+    single cumulative sum over (neighborhood x day) bins gives the sum for
+    every as-of day T at once. Returns (sums, counts), each neighborhoods x
+    as-of days.
+    """
+    neighborhoods, horizon = shape
+    rate = decay / 365.0
+    keep = (days >= 0) & (days < horizon)
+    bins = owners[keep] * horizon + days[keep]
+    grid = np.bincount(
+        bins, weights=weights[keep] * np.exp(rate * days[keep]), minlength=neighborhoods * horizon
+    ).reshape(shape)
+    counts = np.bincount(bins, minlength=neighborhoods * horizon).reshape(shape)
+
+    # Records strictly before T are the cumulative sum up to day T - 1
+    before = np.concatenate([np.zeros((neighborhoods, 1)), np.cumsum(grid, axis=1)], axis=1)
+    count_before = np.concatenate(
+        [np.zeros((neighborhoods, 1), dtype=np.int64), np.cumsum(counts, axis=1)], axis=1
+    )
+    return before[:, as_of] * np.exp(-rate * as_of), count_before[:, as_of]
+
+
+def _owner_positions(neighborhood_ids: np.ndarray, owners: list) -> np.ndarray:
+    return np.searchsorted(neighborhood_ids, np.array(owners, dtype=np.int64))
+
+
+def backfill_crime_scores(db: Session, neighborhood_ids: np.ndarray, origin, horizon: int,
+                          as_of: np.ndarray) -> np.ndarray:
+    """Crime subscores (neighborhoods x as-of days), as calculate_crime_score would have given"""
+    rows = db.query(CrimeIncident.neighborhood_id, CrimeIncident.date, CrimeIncident.severity).filter(
+        CrimeIncident.neighborhood_id.isnot(None)
+    ).all()
+    if not rows:
+        return np.ones((len(neighborhood_ids), len(as_of)))
+
+    owners, dates, severities = zip(*rows)
+    weights = np.array([crime_processor.SEVERITY_WEIGHTS.get(s, 1.0) for s in severities])
+    sums, _ = _decayed_sums(
+        _owner_positions(neighborhood_ids, owners), _day_numbers(dates, origin), weights,
+        (len(neighborhood_ids), horizon), as_of, crime_processor.TIME_DECAY_FACTOR
+    )
+
+    worst = sums.max(axis=0)
+    scores = 1.0 - np.divide(sums, worst, out=np.zeros_like(sums), where=worst > 0)
+    return np.clip(scores, 0.0, 1.0)
+
+
+def backfill_infrastructure_scores(db: Session, neighborhood_ids: np.ndarray, origin, horizon: int,
+                                   as_of: np.ndarray) -> np.ndarray:
+    """Infrastructure subscores (neighborhoods x as-of days)
+
+    Permits without a date cannot be placed in time and are left out.
+    """
+    rows = db.query(BuildingPermit.neighborhood_id, BuildingPermit.date,
+                    BuildingPermit.project_type, BuildingPermit.value).filter(
+        BuildingPermit.neighborhood_id.isnot(None),
+        BuildingPermit.date.isnot(None)
+    ).all()
+    if not rows:
+        return np.full((len(neighborhood_ids), len(as_of)), infrastructure_processor.NO_PERMITS_SCORE)
+
+    owners, dates, project_types, values = zip(*rows)
+    weights = np.array([
+        infrastructure_processor.PROJECT_TYPE_WEIGHTS.get(project_type, 1.0) * (
+            1.0 + (value or infrastructure_processor.DEFAULT_PERMIT_VALUE) / infrastructure_processor.VALUE_SCALE
+        )
+        for project_type, value in zip(project_types, values)
+    ])
+    sums, counts = _decayed_sums(
+        _owner_positions(neighborhood_ids, owners), _day_numbers(dates, origin), weights,
+        (len(neighborhood_ids), horizon), as_of, infrastructure_processor.TIME_DECAY_FACTOR
+    )
+
+    best = sums.max(axis=0)
+    scores = np.where(best > 0, np.divide(sums, best, out=np.zeros_like(sums), where=best > 0), 0.5)
+    scores = np.where(counts == 0, infrastructure_processor.NO_PERMITS_SCORE, scores)
+    return np.clip(scores, 0.0, 1.0)
+
+
+def backfill_sentiment_scores(db: Session, neighborhoods: list, origin, horizon: int,
+                              as_of: np.ndarray) -> np.ndarray:
+    """Sentiment subscores (neighborhoods x as-of days) over the trailing window"""
+    shape = (len(neighborhoods), horizon)
+    articles = db.query(
+        NewsArticle.title, NewsArticle.content, NewsArticle.published_at, NewsArticle.sentiment_score
+    ).filter(NewsArticle.published_at.isnot(None)).all()
+    if not articles:
+        return np.full((len(neighborhoods), len(as_of)), 0.5)
+
+    matches = np.array([
+        [match_article_to_neighborhood(article, neighborhood) for neighborhood in neighborhoods]
+        for article in articles
+    ])
+    article_idx, owners = np.nonzero(matches)
+    if not len(article_idx):
+        return np.full((len(neighborhoods), len(as_of)), 0.5)
+
+    analyzer = get_analyzer()
+    compound = np.array([
+        article.sentiment_score if article.sentiment_score is not None
+        else analyzer.polarity_scores(f"{article.title or ''} {article.content or ''}")["compound"]
+        for article in articles
+    ])
+    days = _day_numbers([article.published_at for article in articles], origin)[article_idx]
+    keep = (days >= 0) & (days < horizon)
+    bins = owners[keep] * horizon + days[keep]
+    sums = np.bincount(bins, weights=compound[article_idx][keep], minlength=shape[0] * shape[1]).reshape(shape)
+    counts = np.bincount(bins, minlength=shape[0] * shape[1]).reshape(shape)
+
+    # Articles in [T - window, T): difference of two cumulative sums
+    cumulative = np.concatenate([np.zeros((shape[0], 1)), np.cumsum(sums, axis=1)], axis=1)
+    cumulative_counts = np.concatenate(
+        [np.zeros((shape[0], 1), dtype=np.int64), np.cumsum(counts, axis=1)], axis=1
+    )
+    window_start = np.maximum(as_of - SENTIMENT_WINDOW_DAYS, 0)
+    window_sums = cumulative[:, as_of] - cumulative[:, window_start]
+    window_counts = cumulative_counts[:, as_of] - cumulative_counts[:, window_start]
+
+    average = np.divide(window_sums, window_counts, out=np.zeros_like(window_sums), where=window_counts > 0)
+    return np.where(window_counts > 0, np.clip((average + 1.0) / 2.0, 0.0, 1.0), 0.5)
+
+
+def backfill_score_history(db: Session, start: date, end: date, step_days: int = 7,
+                           replace: bool = False) -> int:
+    """Recompute subscores as of every `step_days` from start to end and store them as history
+
+    Each as-of date only sees records dated before it, with time decay
+    measured from that date. Crime, infrastructure and sentiment are
+    recomputed for all dates and neighborhoods at once; demographics have no
+    history and use the current profiles. Raises HistoryExists if the range
+    already has history, raw or compacted, unless `replace` is set; replacing
+    drops rollups whose period starts in the range. Projections are refitted
+    afterwards. Returns the number of history rows written.
+    """
+    if end < start:
+        raise ValueError("Backfill end date is before its start date")
+
+    range_start = datetime.combine(start, datetime.min.time())
+    range_end = datetime.combine(end + timedelta(days=1), datetime.min.time())
+    existing = db.query(ScoreHistory).filter(
+        ScoreHistory.calculated_at >= range_start, ScoreHistory.calculated_at < range_end
+    )
+    existing_rollups = db.query(ScoreHistoryRollup).filter(
+        ScoreHistoryRollup.period_start >= range_start, ScoreHistoryRollup.period_start < range_end
+    )
+    if existing.count() or existing_rollups.count():
+        if not replace:
+            raise HistoryExists(f"Score history already exists between {start} and {end}")
+        deleted = existing.delete(synchronize_session=False)
+        deleted_rollups = existing_rollups.delete(synchronize_session=False)
+        logger.info(
+            f"Deleted {deleted} existing history rows and {deleted_rollups} rollups between {start} and {end}"
+        )
+
+    neighborhoods = db.query(Neighborhood).order_by(Neighborhood.id).all()
+    if not neighborhoods:
+        logger.warning("No neighborhoods to backfill")
+        return 0
+    neighborhood_ids = np.array([neighborhood.id for neighborhood in neighborhoods], dtype=np.int64)
+
+    as_of_dates = np.arange(np.datetime64(start), np.datetime64(end) + 1, step_days)
+    earliest = min(
+        value for value in (
+            db.query(func.min(CrimeIncident.date)).scalar(),
+            db.query(func.min(BuildingPermit.date)).scalar(),
+            db.query(func.min(NewsArticle.published_at)).scalar(),
+            range_start,
+        ) if value is not None
+    )
+    origin = np.datetime64(earliest, "D")
+    as_of = (as_of_dates - origin).astype(np.int64)
+    horizon = int(as_of.max())
+
+    logger.info(f"Backfilling {len(as_of)} dates x {len(neighborhoods)} neighborhoods")
+    crime = backfill_crime_scores(db, neighborhood_ids, origin, horizon, as_of)
+    infrastructure = backfill_infrastructure_scores(db, neighborhood_ids, origin, horizon, as_of)
+    sentiment = backfill_sentiment_scores(db, neighborhoods, origin, horizon, as_of)
+    current_demographics = demographics_processor.process_all_demographic_scores(db)
+    demographics = np.array([current_demographics.get(int(i), 0.5) for i in neighborhood_ids])[:, None]
+    demographics = np.broadcast_to(demographics, crime.shape)
+
+    weights = load_weights_config()
+    profitability = 100 * (
+        weights.crime_weight * crime +
+        weights.infrastructure_weight * infrastructure +
+        weights.demographic_weight * demographics +
+        weights.sentiment_weight * sentiment
+    )
+
+    calculated_at = as_of_dates.astype("datetime64[s]").astype(datetime)
+    rows = [
+        {
+            "neighborhood_id": int(neighborhood_ids[n]),
+            "calculated_at": calculated_at[t],
+            "crime_score": float(crime[n, t]),
+            "infrastructure_score": float(infrastructure[n, t]),
+            "demographic_score": float(demographics[n, t]),
+            "sentiment_score": float(sentiment[n, t]),
+            "profitability_score": float(profitability[n, t]),
+        }
+        for t in range(len(as_of_dates))
+        for n in range(len(neighborhood_ids))
+    ]
+    db.execute(insert(ScoreHistory), rows)
+    db.commit()
+    logger.info(f"Inserted {len(rows)} backfilled history rows")
+
+    calculate_score_projections(db)
+    return len(rows)
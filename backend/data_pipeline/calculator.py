@@ -1,40 +1,96 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from app.models import Score, ScoreHistory, Neighborhood
+from app.models import Score, ScoreHistory, Neighborhood, StageCache
 from app.config import load_weights_config
+from app.score_events import notify_scores_changed
 from .processors import (
     crime_processor,
     infrastructure_processor,
     demographics_processor,
     sentiment_processor
 )
+from . import fingerprints
 from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Subscores closer than this to the stored ones count as unchanged
+SCORE_TOLERANCE = 1e-9
 
-def calculate_profitability_scores(db: Session):
-    """Calculate profitability scores for all neighborhoods"""
+SUBSCORE_STAGES = [
+    ("crime", fingerprints.crime_fingerprint, crime_processor.process_all_crime_scores),
+    ("infrastructure", fingerprints.infrastructure_fingerprint,
+     infrastructure_processor.process_all_infrastructure_scores),
+    ("demographics", fingerprints.demographics_fingerprint,
+     demographics_processor.process_all_demographic_scores),
+    ("sentiment", fingerprints.sentiment_fingerprint, sentiment_processor.process_all_sentiment_scores),
+]
+
+
+def inputs_fingerprint(db: Session) -> str:
+    """Fingerprint of everything the scores derive from: every source's stored rows and the weights"""
+    return fingerprints.combined_fingerprint(
+        {stage: fingerprint(db) for stage, fingerprint, _ in SUBSCORE_STAGES}, load_weights_config()
+    )
+
+
+def get_latest_scores(db: Session) -> dict:
+    """Latest Score row per neighborhood, keyed by neighborhood id"""
+    latest = db.execute(
+        select(Score).distinct(Score.neighborhood_id).order_by(
+            Score.neighborhood_id, Score.calculated_at.desc()
+        )
+    ).scalars().all()
+    return {score.neighborhood_id: score for score in latest}
+
+
+def score_unchanged(previous: Score, values: dict) -> bool:
+    return previous is not None and all(
+        abs(getattr(previous, column) - value) <= SCORE_TOLERANCE
+        for column, value in values.items()
+    )
+
+
+def calculate_profitability_scores(db: Session, force: bool = False) -> int:
+    """Calculate profitability scores for all neighborhoods
+
+    Each subscore stage is skipped when the fingerprint of its inputs matches
+    the previous run, reusing the stored output. New Score/ScoreHistory rows
+    are written only for neighborhoods whose scores actually changed. Returns
+    the number of neighborhoods with new scores.
+    """
     logger.info("Starting profitability score calculation")
     
     # Load weights configuration
     weights = load_weights_config()
     
-    # Process all subscores
-    logger.info("Processing crime scores...")
-    crime_scores = crime_processor.process_all_crime_scores(db)
-    
-    logger.info("Processing infrastructure scores...")
-    infrastructure_scores = infrastructure_processor.process_all_infrastructure_scores(db)
+    # Process all subscores, reusing cached outputs for unchanged inputs
+    subscores = {}
+    stage_fingerprints = {}
+    for stage, fingerprint, process in SUBSCORE_STAGES:
+        logger.info(f"Processing {stage} scores...")
+        stage_fingerprints[stage] = fingerprint(db)
+        subscores[stage] = fingerprints.run_cached_stage(
+            db, stage, stage_fingerprints[stage], process, force
+        )
     
-    logger.info("Processing demographic scores...")
-    demographic_scores = demographics_processor.process_all_demographic_scores(db)
+    final_fingerprint = fingerprints.combined_fingerprint(stage_fingerprints, weights)
+    cached = db.get(StageCache, "profitability")
+    if cached and cached.fingerprint == final_fingerprint and not force:
+        logger.info("All inputs and weights unchanged, keeping existing scores")
+        return 0
     
-    logger.info("Processing sentiment scores...")
-    sentiment_scores = sentiment_processor.process_all_sentiment_scores(db)
+    crime_scores = subscores["crime"]
+    infrastructure_scores = subscores["infrastructure"]
+    demographic_scores = subscores["demographics"]
+    sentiment_scores = subscores["sentiment"]
     
     # Calculate profitability scores
     neighborhoods = db.query(Neighborhood).all()
+    previous_scores = get_latest_scores(db)
+    calculated_at = datetime.now()
+    changed_ids = []
     
     for neighborhood in neighborhoods:
         crime_score = crime_scores.get(neighborhood.id, 0.5)
@@ -53,29 +109,24 @@ def calculate_profitability_scores(db: Session):
         # Convert to 0-100 scale
         profitability_score_100 = profitability_score * 100
         
+        values = {
+            "crime_score": crime_score,
+            "infrastructure_score": infra_score,
+            "demographic_score": demo_score,
+            "sentiment_score": sent_score,
+            "profitability_score": profitability_score_100,
+        }
+        
+        # Don't append duplicate history for unchanged neighborhoods
+        if score_unchanged(previous_scores.get(neighborhood.id), values):
+            continue
+        
         # Save to database
-        score = Score(
-            neighborhood_id=neighborhood.id,
-            crime_score=crime_score,
-            infrastructure_score=infra_score,
-            demographic_score=demo_score,
-            sentiment_score=sent_score,
-            profitability_score=profitability_score_100,
-            calculated_at=datetime.now()
-        )
-        db.add(score)
+        db.add(Score(neighborhood_id=neighborhood.id, calculated_at=calculated_at, **values))
         
         # Also save to history
-        history = ScoreHistory(
-            neighborhood_id=neighborhood.id,
-            crime_score=crime_score,
-            infrastructure_score=infra_score,
-            demographic_score=demo_score,
-            sentiment_score=sent_score,
-            profitability_score=profitability_score_100,
-            calculated_at=datetime.now()
-        )
-        db.add(history)
+        db.add(ScoreHistory(neighborhood_id=neighborhood.id, calculated_at=calculated_at, **values))
+        changed_ids.append(neighborhood.id)
         
         logger.debug(
             f"Neighborhood {neighborhood.name}: "
@@ -84,6 +135,13 @@ def calculate_profitability_scores(db: Session):
             f"demo={demo_score:.2f}, sent={sent_score:.2f})"
         )
     
+    if changed_ids:
+        # Delivered to the API's /api/scores/stream clients when this commits
+        notify_scores_changed(db, calculated_at, changed_ids)
     db.commit()
-    logger.info(f"Calculated profitability scores for {len(neighborhoods)} neighborhoods")
-
+    fingerprints.store_stage_fingerprint(db, "profitability", final_fingerprint)
+    logger.info(
+        f"Calculated profitability scores for {len(neighborhoods)} neighborhoods, "
+        f"{len(changed_ids)} changed"
+    )
+    return len(changed_ids)
@@ -1,6 +1,7 @@
 import requests
 from sqlalchemy.orm import Session
 from app.models import DemographicsProfile, Neighborhood
+from app.metrics import record_rows
 import logging
 
 logger = logging.getLogger(__name__)
@@ -36,14 +37,14 @@ def collect_demographics_data(db: Session):
                     raw_data={}
                 )
                 db.add(profile)
+                updated_count += 1
             else:
                 # Update existing
                 pass
-            
-            updated_count += 1
         
         db.commit()
-        logger.info(f"Demographics data collection complete: {updated_count} profiles processed")
+        logger.info(f"Demographics data collection complete: {updated_count} profiles added")
+        record_rows("demographics", updated_count, len(neighborhoods) - updated_count)
         logger.warning("Note: Actual demographics data collection needs to be implemented based on data source format")
         return updated_count
     
@@ -1,8 +1,13 @@
+import time
 import requests
 import os
 from datetime import datetime, timedelta
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from app.models import NewsArticle
+from app.models import NewsArticle, Neighborhood
+from app.metrics import observe_fetch, record_rows
+from ..processors.sentiment_processor import article_compound
+from ..monthly_stats import record_articles
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,7 +16,11 @@ GNEWS_API_URL = "https://gnews.io/api/v4/search"
 
 
 def collect_sentiment_data(db: Session, days_back: int = 180):
-    """Collect news articles from GNews API for sentiment analysis"""
+    """Collect news articles from GNews API for sentiment analysis
+
+    New articles are scored with VADER as they are stored and added to the
+    monthly stats of every neighborhood they mention.
+    """
     logger.info("Starting sentiment data collection")
     
     api_key = os.getenv("GNEWS_API_KEY")
@@ -34,7 +43,9 @@ def collect_sentiment_data(db: Session, days_back: int = 180):
             'to': end_date.strftime('%Y-%m-%dT%H:%M:%SZ')
         }
         
+        started = time.perf_counter()
         response = requests.get(GNEWS_API_URL, params=params, timeout=30)
+        observe_fetch("sentiment", time.perf_counter() - started, len(response.content))
         
         if response.status_code == 429:
             logger.warning("GNews API rate limit exceeded, using fallback data")
@@ -48,6 +59,7 @@ def collect_sentiment_data(db: Session, days_back: int = 180):
         
         added_count = 0
         skipped_count = 0
+        added = []
         
         for article in articles:
             try:
@@ -84,8 +96,10 @@ def collect_sentiment_data(db: Session, days_back: int = 180):
                     url=article.get('url'),
                     raw_data=article
                 )
+                news_article.sentiment_score = article_compound(news_article)
                 
                 db.add(news_article)
+                added.append(news_article)
                 added_count += 1
             
             except Exception as e:
@@ -93,8 +107,11 @@ def collect_sentiment_data(db: Session, days_back: int = 180):
                 skipped_count += 1
                 continue
         
+        neighborhoods = db.execute(select(Neighborhood.id, Neighborhood.name)).all()
+        record_articles(db, added, neighborhoods)
         db.commit()
         logger.info(f"Sentiment data collection complete: {added_count} added, {skipped_count} skipped")
+        record_rows("sentiment", added_count, skipped_count)
         return added_count
     
     except requests.exceptions.RequestException as e:
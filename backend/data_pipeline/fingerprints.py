@@ -0,0 +1,113 @@
+import json
+import time
+import hashlib
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.metrics import PROCESSOR_SECONDS
+from app.models import (
+    Neighborhood,
+    CrimeIncident,
+    BuildingPermit,
+    DemographicsProfile,
+    NewsArticle,
+    StageCache
+)
+from .processors.sentiment_processor import SENTIMENT_WINDOW_DAYS
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Bump when scoring logic changes so cached outputs are recomputed
+STAGE_CACHE_VERSION = 1
+
+
+def _digest(*parts) -> str:
+    payload = json.dumps([STAGE_CACHE_VERSION, *parts], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _neighborhoods_state(db: Session):
+    return list(db.query(func.count(Neighborhood.id), func.max(Neighborhood.id)).one())
+
+
+def crime_fingerprint(db: Session) -> str:
+    """Row count, max id and per-severity counts of crime incidents
+
+    The per-severity counts catch bulk reclassification, which changes scores
+    without adding rows. Time decay is relative, so the same inputs score the
+    same on later days once normalized against the worst neighborhood.
+    """
+    totals = db.query(func.count(CrimeIncident.id), func.max(CrimeIncident.id)).one()
+    by_severity = db.query(CrimeIncident.severity, func.count(CrimeIncident.id)).group_by(
+        CrimeIncident.severity
+    ).order_by(CrimeIncident.severity).all()
+    return _digest(_neighborhoods_state(db), list(totals), [list(row) for row in by_severity])
+
+
+def infrastructure_fingerprint(db: Session) -> str:
+    """Row count, max id, per-type counts and total value of building permits"""
+    totals = db.query(
+        func.count(BuildingPermit.id), func.max(BuildingPermit.id), func.sum(BuildingPermit.value)
+    ).one()
+    by_type = db.query(BuildingPermit.project_type, func.count(BuildingPermit.id)).group_by(
+        BuildingPermit.project_type
+    ).order_by(BuildingPermit.project_type).all()
+    return _digest(_neighborhoods_state(db), list(totals), [list(row) for row in by_type])
+
+
+def demographics_fingerprint(db: Session) -> str:
+    """Row count and latest update of neighborhood profiles"""
+    totals = db.query(
+        func.count(DemographicsProfile.id),
+        func.max(DemographicsProfile.updated_at),
+        func.sum(DemographicsProfile.income_median),
+        func.sum(DemographicsProfile.age_median),
+        func.sum(DemographicsProfile.household_size_avg)
+    ).one()
+    return _digest(_neighborhoods_state(db), list(totals))
+
+
+def sentiment_fingerprint(db: Session) -> str:
+    """Row count and max id of articles inside the sentiment window
+
+    Articles ageing out of the window change the count, so the stage reruns
+    when its input set shrinks as well as when it grows.
+    """
+    cutoff = datetime.now() - timedelta(days=SENTIMENT_WINDOW_DAYS)
+    totals = db.query(func.count(NewsArticle.id), func.max(NewsArticle.id)).filter(
+        NewsArticle.published_at >= cutoff
+    ).one()
+    names = [name for (name,) in db.query(Neighborhood.name).order_by(Neighborhood.id).all()]
+    return _digest(names, list(totals))
+
+
+def combined_fingerprint(fingerprints: dict, weights) -> str:
+    """Fingerprint of the weighted combination of all subscores"""
+    return _digest(fingerprints, weights.model_dump())
+
+
+def run_cached_stage(db: Session, stage: str, fingerprint: str, compute, force: bool = False) -> dict:
+    """Return a stage's output, recomputing it only when its fingerprint changed"""
+    started = time.perf_counter()
+    cached = db.get(StageCache, stage)
+    if cached and cached.fingerprint == fingerprint and not force:
+        logger.info(f"{stage}: inputs unchanged, reusing previous output")
+        outputs = {int(key): value for key, value in (cached.outputs or {}).items()}
+        PROCESSOR_SECONDS.labels(processor=stage, cached="true").observe(time.perf_counter() - started)
+        return outputs
+
+    outputs = compute(db)
+    store_stage_fingerprint(db, stage, fingerprint, outputs)
+    PROCESSOR_SECONDS.labels(processor=stage, cached="false").observe(time.perf_counter() - started)
+    return outputs
+
+
+def store_stage_fingerprint(db: Session, stage: str, fingerprint: str, outputs: dict = None):
+    db.merge(StageCache(
+        stage=stage,
+        fingerprint=fingerprint,
+        outputs={str(key): value for key, value in (outputs or {}).items()},
+        updated_at=datetime.now()
+    ))
+    db.commit()
@@ -0,0 +1,101 @@
+import gzip
+import json
+import hashlib
+from datetime import datetime
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+from app.models import Neighborhood, Score, GeoJSONLayer
+import logging
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always stored
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# level -> (ST_SimplifyPreserveTopology tolerance in degrees, coordinate decimals)
+SIMPLIFICATION_LEVELS = {
+    "full": (0.0, 6),      # ~0.1 m precision, unsimplified
+    "medium": (0.0001, 5),  # ~10 m tolerance, ~1 m precision
+    "low": (0.0005, 4),     # ~50 m tolerance, ~10 m precision
+}
+
+SCORE_PROPERTIES = (
+    "profitability_score",
+    "crime_score",
+    "infrastructure_score",
+    "demographic_score",
+    "sentiment_score",
+)
+
+
+def build_feature_collection(db: Session, tolerance: float, precision: int) -> bytes:
+    """Render neighborhoods joined with their latest scores as GeoJSON bytes"""
+    latest = select(Score).distinct(Score.neighborhood_id).order_by(
+        Score.neighborhood_id, Score.calculated_at.desc()
+    ).subquery()
+
+    geometry = Neighborhood.geometry
+    if tolerance > 0:
+        geometry = func.ST_SimplifyPreserveTopology(geometry, tolerance)
+
+    rows = db.execute(
+        select(
+            Neighborhood.id,
+            Neighborhood.name,
+            func.ST_AsGeoJSON(geometry, precision).label("geometry"),
+            *(latest.c[name] for name in SCORE_PROPERTIES)
+        )
+        .outerjoin(latest, latest.c.neighborhood_id == Neighborhood.id)
+        .order_by(Neighborhood.id)
+    ).all()
+
+    # ST_AsGeoJSON already returns serialized geometry, so splice it in as-is
+    features = []
+    for row in rows:
+        properties = {"id": row.id, "name": row.name}
+        for name in SCORE_PROPERTIES:
+            value = getattr(row, name)
+            properties[name] = round(value, 4) if value is not None else None
+        features.append(
+            '{"type":"Feature","id":%d,"geometry":%s,"properties":%s}'
+            % (row.id, row.geometry, json.dumps(properties, separators=(",", ":")))
+        )
+
+    return ('{"type":"FeatureCollection","features":[%s]}' % ",".join(features)).encode("utf-8")
+
+
+def build_neighborhood_layers(db: Session) -> int:
+    """Precompute and store the neighborhood GeoJSON layer at every simplification level"""
+    logger.info("Building neighborhood GeoJSON layers")
+
+    built_at = datetime.now()
+    for level, (tolerance, precision) in SIMPLIFICATION_LEVELS.items():
+        body = build_feature_collection(db, tolerance, precision)
+        body_gzip = gzip.compress(body, compresslevel=9)
+        body_br = brotli.compress(body, quality=11) if brotli else None
+
+        values = {
+            "level": level,
+            "tolerance": tolerance,
+            "body": body,
+            "body_gzip": body_gzip,
+            "body_br": body_br,
+            "etag": '"%s"' % hashlib.sha1(body).hexdigest()[:20],
+            "built_at": built_at,
+        }
+        statement = insert(GeoJSONLayer).values(**values)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[GeoJSONLayer.level],
+            set_={key: statement.excluded[key] for key in values if key != "level"}
+        ))
+
+        logger.info(
+            f"GeoJSON layer {level}: {len(body)} bytes, {len(body_gzip)} gzip"
+            + (f", {len(body_br)} brotli" if body_br else "")
+        )
+
+    db.commit()
+    return len(SIMPLIFICATION_LEVELS)
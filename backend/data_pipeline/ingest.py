@@ -0,0 +1,306 @@
+import time
+import queue
+import threading
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+import requests
+import shapely
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.models import Neighborhood
+from app.metrics import observe_fetch, INGEST_STAGE_RECORDS, INGEST_STAGE_BUSY_SECONDS
+from app.spatial_index import NeighborhoodIndex
+from .normalizers import frame_rows
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Records requested from the upstream API per page
+INGEST_PAGE_SIZE = 1000
+
+# Rows inserted per write (and per commit)
+INGEST_BATCH_SIZE = 500
+
+# Items buffered between two stages before the upstream one blocks
+INGEST_QUEUE_SIZE = 4
+
+# How often a stage blocked on a queue checks whether the pipeline stopped
+_POLL_SECONDS = 0.1
+
+
+class StageStats:
+    """Throughput counters for one ingest stage"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.records = 0
+        self.batches = 0
+        self.busy_seconds = 0.0
+        self.blocked_seconds = 0.0
+
+    @property
+    def records_per_second(self) -> float:
+        return self.records / self.busy_seconds if self.busy_seconds else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "records": self.records,
+            "batches": self.batches,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "blocked_seconds": round(self.blocked_seconds, 3),
+            "records_per_second": round(self.records_per_second, 1),
+        }
+
+
+class _Failed:
+    """Carries an exception from an upstream stage to the writer"""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+_DONE = object()
+
+
+class IngestPipeline:
+    """Fetch, transform and write stages running concurrently over bounded queues
+
+    `fetch()` yields pages of raw records and runs on its own thread, as does
+    `transform(page)`, which returns rows ready to insert. `write(rows)`
+    runs on the calling thread, so it may use the caller's Session, and
+    returns the number of rows written. Full queues block the stage feeding
+    them, so a slow database throttles fetching instead of buffering the
+    whole upstream dataset. An error in any stage stops the others and is
+    re-raised from run().
+    """
+
+    def __init__(self, source: str, fetch, transform, write,
+                 batch_size: int = INGEST_BATCH_SIZE, queue_size: int = INGEST_QUEUE_SIZE):
+        self.source = source
+        self.fetch = fetch
+        self.transform = transform
+        self.write = write
+        self.batch_size = batch_size
+        self.pages = queue.Queue(maxsize=queue_size)
+        self.batches = queue.Queue(maxsize=queue_size)
+        self.stats = {name: StageStats(name) for name in ("fetch", "transform", "write")}
+        self._stop = threading.Event()
+
+    def _put(self, stage: StageStats, target: queue.Queue, item) -> bool:
+        started = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                try:
+                    target.put(item, timeout=_POLL_SECONDS)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            stage.blocked_seconds += time.perf_counter() - started
+
+    def _get(self, stage: StageStats, source: queue.Queue):
+        started = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                try:
+                    return source.get(timeout=_POLL_SECONDS)
+                except queue.Empty:
+                    continue
+            return _DONE
+        finally:
+            stage.blocked_seconds += time.perf_counter() - started
+
+    def _count(self, stage: StageStats, records: int, seconds: float):
+        stage.records += records
+        stage.batches += 1
+        stage.busy_seconds += seconds
+        INGEST_STAGE_RECORDS.labels(source=self.source, stage=stage.name).inc(records)
+        INGEST_STAGE_BUSY_SECONDS.labels(source=self.source, stage=stage.name).inc(seconds)
+
+    def _fetch_stage(self):
+        stage = self.stats["fetch"]
+        try:
+            pages = iter(self.fetch())
+            while True:
+                started = time.perf_counter()
+                page = next(pages, _DONE)
+                if page is _DONE:
+                    break
+                self._count(stage, len(page), time.perf_counter() - started)
+                if not self._put(stage, self.pages, page):
+                    return
+            self._put(stage, self.pages, _DONE)
+        except BaseException as e:
+            self._put(stage, self.pages, _Failed(e))
+
+    def _transform_stage(self):
+        stage = self.stats["transform"]
+        try:
+            while True:
+                page = self._get(stage, self.pages)
+                if page is _DONE or isinstance(page, _Failed):
+                    self._put(stage, self.batches, page)
+                    return
+                started = time.perf_counter()
+                rows = iter(self.transform(page))
+                batches = list(iter(lambda: list(islice(rows, self.batch_size)), []))
+                self._count(stage, len(page), time.perf_counter() - started)
+                for batch in batches:
+                    if not self._put(stage, self.batches, batch):
+                        return
+        except BaseException as e:
+            self._put(stage, self.batches, _Failed(e))
+
+    def run(self) -> int:
+        """Run all stages to completion and return the number of rows written"""
+        workers = [
+            threading.Thread(target=self._fetch_stage, name=f"{self.source}-fetch", daemon=True),
+            threading.Thread(target=self._transform_stage, name=f"{self.source}-transform", daemon=True),
+        ]
+        for worker in workers:
+            worker.start()
+
+        stage = self.stats["write"]
+        written = 0
+        try:
+            while True:
+                batch = self._get(stage, self.batches)
+                if batch is _DONE:
+                    break
+                if isinstance(batch, _Failed):
+                    raise batch.error
+                started = time.perf_counter()
+                written += self.write(batch)
+                self._count(stage, len(batch), time.perf_counter() - started)
+        finally:
+            self._stop.set()
+            for worker in workers:
+                worker.join()
+
+        for name, stats in self.stats.items():
+            logger.info(
+                f"{self.source} ingest {name}: {stats.records} records in {stats.batches} batches, "
+                f"{stats.busy_seconds:.2f}s busy ({stats.records_per_second:.0f}/s), "
+                f"{stats.blocked_seconds:.2f}s waiting on queues"
+            )
+        return written
+
+
+def fetch_socrata_pages(source: str, url: str, order: str, limit: int, page_size: int = INGEST_PAGE_SIZE):
+    """Yield up to `limit` records from a Socrata endpoint, `page_size` at a time"""
+    fetched = 0
+    while fetched < limit:
+        requested = min(page_size, limit - fetched)
+        params = {'$limit': requested, '$offset': fetched, '$order': order}
+        started = time.perf_counter()
+        response = requests.get(url, params=params, timeout=30)
+        observe_fetch(source, time.perf_counter() - started, len(response.content))
+        response.raise_for_status()
+        page = response.json()
+        if not page:
+            return
+        fetched += len(page)
+        yield page
+        if len(page) < requested:
+            return
+
+
+def load_neighborhood_index(db: Session) -> NeighborhoodIndex:
+    """Spatial index over neighborhood polygons for assigning ingested points"""
+    rows = db.execute(
+        select(Neighborhood.id, func.ST_AsBinary(Neighborhood.geometry)).order_by(Neighborhood.id)
+    ).all()
+    neighborhood_ids = np.array([row[0] for row in rows], dtype=np.int64)
+    geometries = shapely.from_wkb([bytes(row[1]) for row in rows])
+    return NeighborhoodIndex(neighborhood_ids, geometries, np.full(len(rows), np.nan), "ingest")
+
+
+def assign_neighborhoods(frame: pd.DataFrame, index: NeighborhoodIndex) -> pd.DataFrame:
+    """Add a neighborhood_id column locating every record with coordinates"""
+    latitude = frame["latitude"].to_numpy(dtype=float)
+    longitude = frame["longitude"].to_numpy(dtype=float)
+    located = ~np.isnan(latitude) & ~np.isnan(longitude) & (latitude != 0) & (longitude != 0)
+
+    owners = np.full(len(frame), None, dtype=object)
+    if located.any() and len(index.neighborhood_ids):
+        positions = index.locate(latitude[located], longitude[located])
+        owners[np.flatnonzero(located)] = [
+            int(index.neighborhood_ids[p]) if p >= 0 else None for p in positions
+        ]
+    frame["neighborhood_id"] = owners
+    return frame
+
+
+def located_rows(normalize, index: NeighborhoodIndex):
+    """Transform stage: normalize a page of records and assign neighborhoods"""
+    def transform(page: list) -> list:
+        return frame_rows(assign_neighborhoods(normalize(page), index))
+    return transform
+
+
+def new_rows_writer(db: Session, model, key: str, on_insert=None):
+    """Write stage: insert rows whose natural key is not stored yet, one commit per batch
+
+    Rows another process stored in the meantime are skipped through ON
+    CONFLICT on the (key, date) unique constraint. A batch that still fails
+    is rolled back and retried row by row, each row in its own savepoint,
+    so one bad record is skipped and logged rather than aborting the run.
+    `on_insert(db, rows)` runs on the inserted rows before the commit, so
+    rollups it maintains stay consistent with the table.
+    """
+    column = getattr(model, key)
+    statement = (
+        insert(model)
+        .on_conflict_do_nothing(constraint=f"uq_{model.__tablename__}_{key}_date")
+        .returning(column)
+    )
+
+    def insert_rows(rows: list) -> list:
+        """Insert `rows` and return the ones that were stored"""
+        stored = {}
+        for value in db.execute(statement, rows).scalars():
+            stored[value] = stored.get(value, 0) + 1
+        inserted = []
+        for row in rows:
+            if stored.get(row[key]):
+                stored[row[key]] -= 1
+                inserted.append(row)
+        return inserted
+
+    def insert_one_by_one(rows: list) -> list:
+        inserted = []
+        for row in rows:
+            try:
+                with db.begin_nested():
+                    inserted += insert_rows([row])
+            except SQLAlchemyError as e:
+                logger.error(f"Skipping {model.__tablename__} {key}={row[key]}: {e}")
+        return inserted
+
+    def write(rows: list) -> int:
+        existing = set(db.execute(
+            select(column).where(column.in_([row[key] for row in rows]))
+        ).scalars())
+        new = [row for row in rows if row[key] not in existing]
+        if not new:
+            return 0
+        try:
+            inserted = insert_rows(new)
+            if on_insert and inserted:
+                on_insert(db, inserted)
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.warning(f"Inserting {len(new)} {model.__tablename__} rows failed ({e}); retrying row by row")
+            inserted = insert_one_by_one(new)
+            if on_insert and inserted:
+                on_insert(db, inserted)
+            db.commit()
+        return len(inserted)
+    return write
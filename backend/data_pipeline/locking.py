@@ -0,0 +1,47 @@
+from contextlib import contextmanager
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary application-wide key for pg_try_advisory_lock ("HFRF")
+REFRESH_LOCK_KEY = 0x48465246
+
+
+class RefreshAlreadyRunning(Exception):
+    """Raised when another process holds the refresh lock"""
+
+    def __init__(self, run_id=None, started_at=None):
+        self.run_id = run_id
+        self.started_at = started_at
+        message = "A data refresh is already running"
+        if run_id is not None:
+            message += f" (run #{run_id} started at {started_at})"
+        super().__init__(message)
+
+
+@contextmanager
+def refresh_lock(engine: Engine):
+    """Hold the PostgreSQL advisory lock that serializes refresh runs
+
+    Session-level advisory locks belong to a connection, so the lock is taken
+    on a dedicated connection kept open for the whole run rather than on a
+    pooled ORM session. If the process dies, PostgreSQL releases the lock when
+    the connection drops. Raises RefreshAlreadyRunning if the lock is taken.
+    """
+    connection = engine.connect()
+    try:
+        acquired = connection.execute(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": REFRESH_LOCK_KEY}
+        ).scalar()
+        connection.commit()
+        if not acquired:
+            raise RefreshAlreadyRunning()
+        try:
+            yield
+        finally:
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": REFRESH_LOCK_KEY})
+            connection.commit()
+    finally:
+        connection.close()
@@ -0,0 +1,170 @@
+from datetime import datetime
+from sqlalchemy import and_, delete, func, literal, literal_column, select, update, Float
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+from app.models import NeighborhoodMonthlyStats, CrimeIncident, BuildingPermit, NewsArticle, Neighborhood
+from .retention import month_start
+from .processors.streaming import stream_partitions
+from .processors.sentiment_processor import matching_neighborhoods, article_compound
+import logging
+
+logger = logging.getLogger(__name__)
+
+SEVERITIES = ("violent", "property", "other")
+PROJECT_TYPES = ("residential", "commercial", "minor")
+
+# Columns of neighborhood_monthly_stats each collector source maintains
+SOURCE_COLUMNS = {
+    "crime": tuple(f"crime_{severity}" for severity in SEVERITIES),
+    "infrastructure": (
+        *(f"permits_{project_type}" for project_type in PROJECT_TYPES),
+        *(f"permit_value_{project_type}" for project_type in PROJECT_TYPES),
+    ),
+    "sentiment": ("article_count", "sentiment_sum"),
+}
+STAT_COLUMNS = tuple(column for columns in SOURCE_COLUMNS.values() for column in columns)
+
+
+def _accumulate(statement):
+    """Turn an insert of increments into an upsert adding them to existing months"""
+    return statement.on_conflict_do_update(
+        constraint="uq_neighborhood_monthly_stats_month",
+        set_={
+            **{
+                column: getattr(NeighborhoodMonthlyStats, column) + statement.excluded[column]
+                for column in STAT_COLUMNS
+            },
+            "updated_at": statement.excluded.updated_at,
+        }
+    )
+
+
+def _add(increments: dict, neighborhood_id: int, when: datetime, column: str, amount: float):
+    key = (neighborhood_id, month_start(when))
+    totals = increments.setdefault(key, dict.fromkeys(STAT_COLUMNS, 0))
+    totals[column] += amount
+
+
+def _apply(db: Session, increments: dict):
+    if not increments:
+        return
+    updated_at = datetime.utcnow()
+    rows = [
+        {"neighborhood_id": neighborhood_id, "month": month, **totals, "updated_at": updated_at}
+        for (neighborhood_id, month), totals in increments.items()
+    ]
+    statement = insert(NeighborhoodMonthlyStats).values(rows)
+    db.execute(_accumulate(statement))
+
+
+def record_incidents(db: Session, rows: list):
+    """Add newly inserted incidents to their months; runs in the caller's transaction"""
+    increments = {}
+    for row in rows:
+        if row["neighborhood_id"] is not None:
+            _add(increments, row["neighborhood_id"], row["date"], f"crime_{row['severity'] or 'other'}", 1)
+    _apply(db, increments)
+
+
+def record_permits(db: Session, rows: list):
+    """Add newly inserted permits (count and value) to their months"""
+    increments = {}
+    for row in rows:
+        if row["neighborhood_id"] is None:
+            continue
+        project_type = row["project_type"] or "minor"
+        _add(increments, row["neighborhood_id"], row["date"], f"permits_{project_type}", 1)
+        _add(increments, row["neighborhood_id"], row["date"], f"permit_value_{project_type}", row["value"] or 0)
+    _apply(db, increments)
+
+
+def record_articles(db: Session, articles: list, neighborhoods: list):
+    """Add scored articles to the months of every neighborhood they mention"""
+    increments = {}
+    for article in articles:
+        if article.published_at is None or article.sentiment_score is None:
+            continue
+        for neighborhood_id in matching_neighborhoods(article, neighborhoods):
+            _add(increments, neighborhood_id, article.published_at, "article_count", 1)
+            _add(increments, neighborhood_id, article.published_at, "sentiment_sum", article.sentiment_score)
+    _apply(db, increments)
+
+
+def _monthly_select(model, counts: dict):
+    """One row per neighborhood and month of `model`, with the given stat expressions"""
+    month = func.date_trunc(literal_column("'month'"), model.date)
+    return select(
+        model.neighborhood_id,
+        month,
+        *(counts.get(column, literal(0)) for column in STAT_COLUMNS),
+        literal(datetime.utcnow()),
+    ).where(model.neighborhood_id.is_not(None)).group_by(model.neighborhood_id, month)
+
+
+def _rebuild_from_table(db: Session, source: str):
+    if source == "crime":
+        counts = {
+            f"crime_{severity}": func.count().filter(CrimeIncident.severity == severity)
+            for severity in SEVERITIES
+        }
+        rows = _monthly_select(CrimeIncident, counts)
+    else:
+        counts = {}
+        for project_type in PROJECT_TYPES:
+            matches = BuildingPermit.project_type == project_type
+            counts[f"permits_{project_type}"] = func.count().filter(matches)
+            counts[f"permit_value_{project_type}"] = func.coalesce(
+                func.sum(BuildingPermit.value, type_=Float).filter(matches), 0
+            )
+        rows = _monthly_select(BuildingPermit, counts)
+    columns = ["neighborhood_id", "month", *STAT_COLUMNS, "updated_at"]
+    db.execute(_accumulate(insert(NeighborhoodMonthlyStats).from_select(columns, rows)))
+
+
+def _rebuild_articles(db: Session):
+    """Match and, where missing, score every stored article, then add them up"""
+    neighborhoods = db.execute(select(Neighborhood.id, Neighborhood.name)).all()
+    statement = select(
+        NewsArticle.id, NewsArticle.title, NewsArticle.content,
+        NewsArticle.published_at, NewsArticle.sentiment_score
+    )
+    increments, new_scores = {}, []
+    for rows in stream_partitions(db, statement):
+        for article in rows:
+            if article.published_at is None:
+                continue
+            matches = matching_neighborhoods(article, neighborhoods)
+            if not matches:
+                continue
+            compound = article.sentiment_score
+            if compound is None:
+                compound = article_compound(article)
+                new_scores.append({"id": article.id, "sentiment_score": compound})
+            for neighborhood_id in matches:
+                _add(increments, neighborhood_id, article.published_at, "article_count", 1)
+                _add(increments, neighborhood_id, article.published_at, "sentiment_sum", compound)
+    if new_scores:
+        db.execute(update(NewsArticle), new_scores)
+    _apply(db, increments)
+
+
+def rebuild_monthly_stats(db: Session, sources=tuple(SOURCE_COLUMNS)) -> int:
+    """Recompute the monthly stats of the given sources from the stored rows
+
+    Each source's columns are zeroed and re-added from its table, leaving
+    the other sources' columns alone; months left without any activity are
+    dropped. Runs in one transaction. Returns the number of stats rows.
+    """
+    for source in sources:
+        db.execute(update(NeighborhoodMonthlyStats).values(dict.fromkeys(SOURCE_COLUMNS[source], 0)))
+        if source == "sentiment":
+            _rebuild_articles(db)
+        else:
+            _rebuild_from_table(db, source)
+        logger.info(f"Rebuilt monthly {source} stats")
+
+    db.execute(delete(NeighborhoodMonthlyStats).where(
+        and_(*(getattr(NeighborhoodMonthlyStats, column) == 0 for column in STAT_COLUMNS))
+    ))
+    db.commit()
+    return db.execute(select(func.count()).select_from(NeighborhoodMonthlyStats)).scalar()
@@ -0,0 +1,271 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from functools import lru_cache
+from sqlalchemy import select, update, values, column, case, func, String
+from sqlalchemy.orm import Session
+from app.models import CrimeIncident, BuildingPermit, StageCache
+from .monthly_stats import rebuild_monthly_stats
+import logging
+
+logger = logging.getLogger(__name__)
+
+VIOLENT_KEYWORDS = ('assault', 'homicide', 'murder', 'robbery', 'rape', 'weapon', 'shooting', 'stabbing')
+PROPERTY_KEYWORDS = ('burglary', 'theft', 'larceny', 'vandalism', 'arson', 'auto')
+
+COMMERCIAL_KEYWORDS = ('commercial', 'business', 'retail', 'office', 'industrial')
+RESIDENTIAL_KEYWORDS = ('residential', 'dwelling', 'house', 'apartment', 'multi-family')
+
+# Permits without a keyword match above this value are counted as commercial
+HIGH_VALUE_PERMIT = 100000
+
+INCIDENT_COLUMNS = [
+    "incident_id", "date", "location", "offense_type", "severity", "latitude", "longitude", "raw_data"
+]
+PERMIT_COLUMNS = [
+    "permit_id", "permit_type", "location", "date", "status", "value", "project_type",
+    "latitude", "longitude", "raw_data"
+]
+
+
+@lru_cache(maxsize=None)
+def get_severity(offense_type: str) -> str:
+    """Categorize offense by severity"""
+    offense_lower = (offense_type or "").lower()
+    if any(keyword in offense_lower for keyword in VIOLENT_KEYWORDS):
+        return "violent"
+    elif any(keyword in offense_lower for keyword in PROPERTY_KEYWORDS):
+        return "property"
+    else:
+        return "other"
+
+
+@lru_cache(maxsize=None)
+def permit_keyword_type(permit_type: str):
+    """Project type implied by the permit type's wording, or None"""
+    permit_lower = (permit_type or "").lower()
+    if any(keyword in permit_lower for keyword in COMMERCIAL_KEYWORDS):
+        return "commercial"
+    elif any(keyword in permit_lower for keyword in RESIDENTIAL_KEYWORDS):
+        return "residential"
+    return None
+
+
+def get_project_type(permit_type: str, value: float = None) -> str:
+    """Categorize permit by project type"""
+    keyword_type = permit_keyword_type(permit_type)
+    if keyword_type:
+        return keyword_type
+    elif value and value > HIGH_VALUE_PERMIT:
+        return "commercial"  # High value likely commercial
+    else:
+        return "minor"
+
+
+def _classify(labels: pd.Series, classify) -> pd.Series:
+    """Apply a classifier once per distinct label and broadcast the results"""
+    codes, uniques = pd.factorize(labels, use_na_sentinel=False)
+    classes = np.array([classify(label if isinstance(label, str) else None) for label in uniques], dtype=object)
+    return pd.Series(classes[codes], index=labels.index, dtype=object)
+
+
+def _column(frame: pd.DataFrame, name: str) -> pd.Series:
+    if name in frame:
+        return frame[name]
+    return pd.Series(None, index=frame.index, dtype=object)
+
+
+def _coalesce(frame: pd.DataFrame, *names) -> pd.Series:
+    """First non-empty value among the columns, like `a or b or c` per record"""
+    result = pd.Series(None, index=frame.index, dtype=object)
+    for name in reversed(names):
+        values = _column(frame, name)
+        result = values.where(values.notna() & (values != ""), result)
+    return result
+
+
+def _records_frame(records: list) -> pd.DataFrame:
+    """Raw records as an object-typed frame with nested `location` dicts flattened
+
+    Socrata serves coordinates either as top-level latitude/longitude, as a
+    location dict with latitude/longitude, or as a GeoJSON point; the
+    nested forms become location.latitude, location.longitude and
+    location.coordinates columns, and `location` keeps only string
+    addresses.
+    """
+    frame = pd.DataFrame(records, dtype=object)
+    frame["raw_data"] = records
+    location = _column(frame, "location")
+    nested = np.fromiter((isinstance(value, dict) for value in location), dtype=bool, count=len(frame))
+    if nested.any():
+        flattened = pd.DataFrame(list(location[nested]), index=frame.index[nested], dtype=object)
+        for name in ("latitude", "longitude", "coordinates"):
+            if name in flattened:
+                frame[f"location.{name}"] = flattened[name]
+        frame["location"] = location.where(~nested, None)
+    return frame
+
+
+def _coordinates(frame: pd.DataFrame):
+    """Latitude and longitude as floats (NaN when missing or unparseable)"""
+    latitude = pd.to_numeric(_column(frame, "latitude"), errors="coerce")
+    longitude = pd.to_numeric(_column(frame, "longitude"), errors="coerce")
+    top_level = latitude.notna() & longitude.notna()
+
+    nested_latitude = pd.to_numeric(_column(frame, "location.latitude"), errors="coerce")
+    nested_longitude = pd.to_numeric(_column(frame, "location.longitude"), errors="coerce")
+    point = _column(frame, "location.coordinates")
+    point = point.where(point.map(lambda value: isinstance(value, (list, tuple)) and len(value) == 2), None)
+    nested_latitude = nested_latitude.fillna(pd.to_numeric(point.str[1], errors="coerce"))
+    nested_longitude = nested_longitude.fillna(pd.to_numeric(point.str[0], errors="coerce"))
+
+    return (
+        latitude.where(top_level, nested_latitude).astype(float),
+        longitude.where(top_level, nested_longitude).astype(float),
+    )
+
+
+def _dates(frame: pd.DataFrame, *names) -> pd.Series:
+    """Parse ISO 8601 dates as naive UTC; missing or unparseable dates become now"""
+    parsed = pd.to_datetime(_coalesce(frame, *names), errors="coerce", utc=True, format="ISO8601")
+    return parsed.dt.tz_convert(None).fillna(pd.Timestamp(datetime.now()))
+
+
+def _identified(frame: pd.DataFrame, key: str, *names) -> pd.DataFrame:
+    """Drop records without an id and repeats of an id within the page"""
+    ids = _coalesce(frame, *names)
+    present = ids.notna()
+    frame = frame[present].copy()
+    frame[key] = ids[present].astype(str)
+    return frame.drop_duplicates(subset=key).copy()
+
+
+def normalize_incidents(records: list) -> pd.DataFrame:
+    """Turn a page of raw crime API records into typed CrimeIncident columns
+
+    Records without an incident number are dropped, as are repeats of one
+    within the page. Severity is classified once per distinct offense type.
+    """
+    frame = _records_frame(records)
+    if frame.empty:
+        return pd.DataFrame(columns=INCIDENT_COLUMNS)
+    frame = _identified(frame, "incident_id", "incident_number", "id")
+
+    frame["date"] = _dates(frame, "incident_datetime", "date")
+    frame["location"] = _coalesce(frame, "location", "address")
+    frame["offense_type"] = _coalesce(frame, "offense_type", "offense")
+    frame["severity"] = _classify(frame["offense_type"], get_severity)
+    frame["latitude"], frame["longitude"] = _coordinates(frame)
+    return frame[INCIDENT_COLUMNS].reset_index(drop=True)
+
+
+def normalize_permits(records: list) -> pd.DataFrame:
+    """Turn a page of raw permit API records into typed BuildingPermit columns
+
+    Costs like "$12,500" are parsed to floats (NaN when unparseable). The
+    keyword part of the project type is classified once per distinct permit
+    type; permits without a keyword match fall back on their value.
+    """
+    frame = _records_frame(records)
+    if frame.empty:
+        return pd.DataFrame(columns=PERMIT_COLUMNS)
+    frame = _identified(frame, "permit_id", "permit_number", "id")
+
+    frame["date"] = _dates(frame, "issue_date", "date")
+    frame["permit_type"] = _coalesce(frame, "permit_type", "type")
+    frame["location"] = _coalesce(frame, "location", "address")
+    frame["status"] = _coalesce(frame, "status", "permit_status")
+    cost = _coalesce(frame, "estimated_cost", "value", "cost").astype("string")
+    frame["value"] = pd.to_numeric(cost.str.replace(r"[$,]", "", regex=True), errors="coerce").astype(float)
+
+    keyword_type = _classify(frame["permit_type"], permit_keyword_type)
+    fallback = np.where(frame["value"].to_numpy() > HIGH_VALUE_PERMIT, "commercial", "minor")
+    frame["project_type"] = keyword_type.where(keyword_type.notna(), pd.Series(fallback, index=frame.index))
+    frame["latitude"], frame["longitude"] = _coordinates(frame)
+    return frame[PERMIT_COLUMNS].reset_index(drop=True)
+
+
+def frame_rows(frame: pd.DataFrame) -> list:
+    """Rows of a normalized frame as dicts, with None for missing values"""
+    return frame.astype(object).where(frame.notna(), None).to_dict("records")
+
+
+def _clear_stage_cache(db: Session, stage: str):
+    db.query(StageCache).filter(StageCache.stage.in_([stage, "profitability"])).delete(
+        synchronize_session=False
+    )
+
+
+def reclassify_incidents(db: Session, dry_run: bool = False) -> int:
+    """Recompute severity for stored incidents from the current keyword lists
+
+    Classifies each distinct offense type once and rewrites only the rows
+    whose severity changes, in a single UPDATE. Returns the number of rows
+    changed (or that would change, with `dry_run`). Call it under the
+    refresh lock (data_pipeline/locking.py).
+    """
+    offense_types = db.execute(select(CrimeIncident.offense_type).distinct()).scalars().all()
+    if not offense_types:
+        return 0
+    mapping = values(
+        column("offense_type", String), column("severity", String), name="severity_map"
+    ).data([(offense_type, get_severity(offense_type)) for offense_type in offense_types])
+
+    changed = db.execute(
+        update(CrimeIncident)
+        .where(
+            CrimeIncident.offense_type.is_not_distinct_from(mapping.c.offense_type),
+            CrimeIncident.severity.is_distinct_from(mapping.c.severity)
+        )
+        .values(severity=mapping.c.severity)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    return _finish_reclassify(db, "crime", changed, dry_run)
+
+
+def reclassify_permits(db: Session, dry_run: bool = False) -> int:
+    """Recompute project type for stored permits from the current keyword lists
+
+    Classifies each distinct permit type once; permits without a keyword
+    match fall back on their value as at ingest. Returns the number of rows
+    changed (or that would change, with `dry_run`). Call it under the
+    refresh lock (data_pipeline/locking.py).
+    """
+    permit_types = db.execute(select(BuildingPermit.permit_type).distinct()).scalars().all()
+    if not permit_types:
+        return 0
+    mapping = values(
+        column("permit_type", String), column("keyword_type", String), name="project_type_map"
+    ).data([(permit_type, permit_keyword_type(permit_type)) for permit_type in permit_types])
+    project_type = func.coalesce(
+        mapping.c.keyword_type,
+        case((BuildingPermit.value > HIGH_VALUE_PERMIT, "commercial"), else_="minor")
+    )
+
+    changed = db.execute(
+        update(BuildingPermit)
+        .where(
+            BuildingPermit.permit_type.is_not_distinct_from(mapping.c.permit_type),
+            BuildingPermit.project_type.is_distinct_from(project_type)
+        )
+        .values(project_type=project_type)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    return _finish_reclassify(db, "infrastructure", changed, dry_run)
+
+
+def _finish_reclassify(db: Session, stage: str, changed: int, dry_run: bool) -> int:
+    if dry_run:
+        db.rollback()
+        logger.info(f"{stage}: {changed} rows would be reclassified")
+        return changed
+    if changed:
+        # Scores derived from the old classes must not be served from cache
+        _clear_stage_cache(db, stage)
+    db.commit()
+    logger.info(f"{stage}: reclassified {changed} rows")
+    if changed:
+        # Monthly counts are split by class too. The caller's refresh lock
+        # keeps collectors from adding to them while they are rebuilt
+        rebuild_monthly_stats(db, [stage])
+    return changed
@@ -0,0 +1,80 @@
+from datetime import date
+from sqlalchemy import text
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Tables range-partitioned by month on their `date` column
+PARTITIONED_TABLES = ("crime_incidents", "building_permits")
+
+# Months past the current one that always have a partition ready
+MONTHS_AHEAD = 3
+
+
+def month_start(value) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month:%Y}m{month:%m}"
+
+
+def existing_partitions(conn, table: str) -> set:
+    """Names of the partitions currently attached to a table"""
+    return set(conn.execute(text("""
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = CAST(:table AS regclass)
+    """), {"table": table}).scalars())
+
+
+def create_month_partition(conn, table: str, month: date) -> bool:
+    """Create and attach the partition for one month
+
+    Rows for that month sitting in the DEFAULT partition are moved into the
+    new partition first, otherwise PostgreSQL refuses to attach it. Returns
+    False if the partition already exists.
+    """
+    name = partition_name(table, month)
+    if name in existing_partitions(conn, table):
+        return False
+
+    lower, upper = month.isoformat(), add_months(month, 1).isoformat()
+    conn.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    moved = conn.execute(text(f"""
+        WITH moved AS (
+            DELETE FROM {table}_default WHERE date >= :lower AND date < :upper RETURNING *
+        )
+        INSERT INTO {name} SELECT * FROM moved
+    """), {"lower": lower, "upper": upper}).rowcount
+    conn.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM ('{lower}') TO ('{upper}')"))
+    logger.info(f"Created partition {name}" + (f", moved {moved} rows from {table}_default" if moved else ""))
+    return True
+
+
+def ensure_partitions(engine, months_ahead: int = MONTHS_AHEAD, today: date = None) -> dict:
+    """Create every missing monthly partition up to `months_ahead` months from now
+
+    Coverage starts at the oldest month with rows in the DEFAULT partition, so
+    history ingested before its partitions existed is moved out of it.
+    Returns the names of the partitions created, per table.
+    """
+    today = today or date.today()
+    last = add_months(month_start(today), months_ahead)
+    created = {}
+    for table in PARTITIONED_TABLES:
+        with engine.begin() as conn:
+            oldest = conn.execute(text(f"SELECT min(date) FROM {table}_default")).scalar()
+            month = month_start(oldest) if oldest else month_start(today)
+            created[table] = []
+            while month <= last:
+                if create_month_partition(conn, table, month):
+                    created[table].append(partition_name(table, month))
+                month = add_months(month, 1)
+    return created
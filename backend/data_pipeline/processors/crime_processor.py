@@ -1,77 +1,60 @@
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from app.models import CrimeIncident, Neighborhood
+from .streaming import stream_partitions, add_grouped, days_ago
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Exponential decay per year of age: crimes older than ~2 years have minimal weight
+TIME_DECAY_FACTOR = 0.1
 
-def calculate_crime_score(neighborhood_id: int, db: Session) -> float:
+SEVERITY_WEIGHTS = {
+    'violent': 3.0,
+    'property': 1.5,
+    'other': 1.0
+}
+
+
+def weighted_crime_counts(db: Session, now: datetime = None) -> dict:
+    """Time-decayed, severity-weighted crime count per neighborhood
+
+    A single streaming pass over the narrow columns scoring needs, so the
+    raw upstream payloads never leave the database.
+    """
+    now = now or datetime.now()
+    weighted = {}
+    statement = select(
+        CrimeIncident.neighborhood_id, CrimeIncident.date, CrimeIncident.severity
+    ).where(CrimeIncident.neighborhood_id.isnot(None))
+
+    for rows in stream_partitions(db, statement):
+        neighborhood_ids, dates, severities = zip(*rows)
+        # Time decay: more recent crimes weighted higher
+        time_weights = np.exp(-TIME_DECAY_FACTOR * days_ago(now, dates) / 365.0)
+        severity_weights = np.array([SEVERITY_WEIGHTS.get(severity, 1.0) for severity in severities])
+        add_grouped(weighted, neighborhood_ids, time_weights * severity_weights)
+    return weighted
+
+
+def calculate_crime_score(neighborhood_id: int, db: Session, weighted: dict = None) -> float:
     """Calculate crime score for a neighborhood (0-1, higher = better)"""
-    # Get all crimes for this neighborhood
-    crimes = db.query(CrimeIncident).filter(
-        CrimeIncident.neighborhood_id == neighborhood_id
-    ).all()
+    if weighted is None:
+        weighted = weighted_crime_counts(db)
     
-    if not crimes:
+    if neighborhood_id not in weighted:
         # No crime data = perfect score
         return 1.0
     
-    # Time decay: more recent crimes weighted higher
-    now = datetime.now()
-    time_decay_factor = 0.1  # Crimes older than ~2 years have minimal weight
-    
-    # Severity weights
-    severity_weights = {
-        'violent': 3.0,
-        'property': 1.5,
-        'other': 1.0
-    }
-    
-    weighted_crime_count = 0.0
-    
-    for crime in crimes:
-        # Time decay: exponential decay
-        days_ago = (now - crime.date).days
-        time_weight = np.exp(-time_decay_factor * days_ago / 365.0)
-        
-        # Severity weight
-        severity_weight = severity_weights.get(crime.severity, 1.0)
-        
-        # Combined weight
-        weight = time_weight * severity_weight
-        weighted_crime_count += weight
-    
-    # Normalize: compare to max across all neighborhoods
-    max_crimes = db.query(
-        func.sum(func.cast(1, CrimeIncident.id))
-    ).scalar() or 1
-    
-    # Get max weighted crime count across all neighborhoods
-    all_neighborhoods = db.query(Neighborhood).all()
-    max_weighted = 0.0
-    
-    for nh in all_neighborhoods:
-        nh_crimes = db.query(CrimeIncident).filter(
-            CrimeIncident.neighborhood_id == nh.id
-        ).all()
-        
-        nh_weighted = 0.0
-        for crime in nh_crimes:
-            days_ago = (now - crime.date).days
-            time_weight = np.exp(-time_decay_factor * days_ago / 365.0)
-            severity_weight = severity_weights.get(crime.severity, 1.0)
-            nh_weighted += time_weight * severity_weight
-        
-        max_weighted = max(max_weighted, nh_weighted)
-    
+    # Normalize: compare to the max across all neighborhoods
+    max_weighted = max(weighted.values())
     if max_weighted == 0:
         return 1.0
     
     # Inverse normalization: lower crime = higher score
-    normalized_score = 1.0 - (weighted_crime_count / max_weighted)
+    normalized_score = 1.0 - (weighted[neighborhood_id] / max_weighted)
     
     # Clamp to [0, 1]
     return max(0.0, min(1.0, normalized_score))
@@ -81,11 +64,12 @@ def process_all_crime_scores(db: Session) -> dict:
     """Process crime scores for all neighborhoods"""
     logger.info("Processing crime scores for all neighborhoods")
     
-    neighborhoods = db.query(Neighborhood).all()
+    neighborhoods = db.query(Neighborhood.id, Neighborhood.name).all()
+    weighted = weighted_crime_counts(db)
     scores = {}
     
     for neighborhood in neighborhoods:
-        score = calculate_crime_score(neighborhood.id, db)
+        score = calculate_crime_score(neighborhood.id, db, weighted)
         scores[neighborhood.id] = score
         logger.debug(f"Neighborhood {neighborhood.name}: crime_score = {score:.3f}")
     
@@ -1,4 +1,5 @@
 import numpy as np
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.models import DemographicsProfile, Neighborhood
 import logging
@@ -6,18 +7,31 @@ import logging
 logger = logging.getLogger(__name__)
 
 
-def calculate_demographic_score(neighborhood_id: int, db: Session) -> float:
+def load_profiles(db: Session) -> dict:
+    """Typed columns of every profile, keyed by neighborhood id, without raw payloads"""
+    has_data = DemographicsProfile.raw_data.isnot(None) & (DemographicsProfile.raw_data != {})
+    rows = db.execute(select(
+        DemographicsProfile.neighborhood_id,
+        DemographicsProfile.income_median,
+        DemographicsProfile.age_median,
+        DemographicsProfile.household_size_avg,
+        has_data.label("has_data")
+    )).all()
+    return {row.neighborhood_id: row for row in rows}
+
+
+def calculate_demographic_score(neighborhood_id: int, db: Session, profiles: dict = None) -> float:
     """Calculate demographic score for a neighborhood (0-1, higher = better)"""
-    profile = db.query(DemographicsProfile).filter(
-        DemographicsProfile.neighborhood_id == neighborhood_id
-    ).first()
+    if profiles is None:
+        profiles = load_profiles(db)
+    profile = profiles.get(neighborhood_id)
     
-    if not profile or not profile.raw_data:
+    if not profile or not profile.has_data:
         # No data = neutral score
         return 0.5
     
-    # Get all profiles for normalization
-    all_profiles = db.query(DemographicsProfile).all()
+    # Normalize against all profiles
+    all_profiles = profiles.values()
     
     # Extract metrics
     incomes = [p.income_median for p in all_profiles if p.income_median]
@@ -58,11 +72,12 @@ def process_all_demographic_scores(db: Session) -> dict:
     """Process demographic scores for all neighborhoods"""
     logger.info("Processing demographic scores for all neighborhoods")
     
-    neighborhoods = db.query(Neighborhood).all()
+    neighborhoods = db.query(Neighborhood.id, Neighborhood.name).all()
+    profiles = load_profiles(db)
     scores = {}
     
     for neighborhood in neighborhoods:
-        score = calculate_demographic_score(neighborhood.id, db)
+        score = calculate_demographic_score(neighborhood.id, db, profiles)
         scores[neighborhood.id] = score
         logger.debug(f"Neighborhood {neighborhood.name}: demographic_score = {score:.3f}")
     
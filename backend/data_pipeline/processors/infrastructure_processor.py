@@ -1,76 +1,68 @@
 import numpy as np
+from datetime import datetime
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from app.models import BuildingPermit, Neighborhood
-from datetime import datetime, timedelta
+from .streaming import stream_partitions, add_grouped, days_ago
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Exponential decay per year of age
+TIME_DECAY_FACTOR = 0.1
 
-def calculate_infrastructure_score(neighborhood_id: int, db: Session) -> float:
+PROJECT_TYPE_WEIGHTS = {
+    'commercial': 3.0,
+    'residential': 2.0,
+    'minor': 1.0
+}
+
+# Permits without a value count as this much; values are scaled per $100k
+DEFAULT_PERMIT_VALUE = 50000
+VALUE_SCALE = 100000.0
+
+# Score for neighborhoods without any permits (no development activity)
+NO_PERMITS_SCORE = 0.3
+
+
+def weighted_permit_activity(db: Session, now: datetime = None) -> dict:
+    """Time-decayed, type- and value-weighted permit activity per neighborhood
+
+    A single streaming pass over the narrow columns scoring needs.
+    """
+    now = now or datetime.now()
+    weighted = {}
+    statement = select(
+        BuildingPermit.neighborhood_id, BuildingPermit.date,
+        BuildingPermit.project_type, BuildingPermit.value
+    ).where(BuildingPermit.neighborhood_id.isnot(None))
+
+    for rows in stream_partitions(db, statement):
+        neighborhood_ids, dates, project_types, values = zip(*rows)
+        # Time decay: recent permits weighted higher
+        time_weights = np.exp(-TIME_DECAY_FACTOR * days_ago(now, dates, missing=365) / 365.0)
+        type_weights = np.array([PROJECT_TYPE_WEIGHTS.get(project_type, 1.0) for project_type in project_types])
+        # Value weight (normalize by $100k)
+        value_weights = np.array([value or DEFAULT_PERMIT_VALUE for value in values]) / VALUE_SCALE
+        add_grouped(weighted, neighborhood_ids, time_weights * type_weights * (1.0 + value_weights))
+    return weighted
+
+
+def calculate_infrastructure_score(neighborhood_id: int, db: Session, weighted: dict = None) -> float:
     """Calculate infrastructure score for a neighborhood (0-1, higher = better)"""
-    # Get all permits for this neighborhood
-    permits = db.query(BuildingPermit).filter(
-        BuildingPermit.neighborhood_id == neighborhood_id
-    ).all()
+    if weighted is None:
+        weighted = weighted_permit_activity(db)
     
-    if not permits:
+    if neighborhood_id not in weighted:
         # No permits = lower score (no development activity)
-        return 0.3
-    
-    # Project type weights
-    type_weights = {
-        'commercial': 3.0,
-        'residential': 2.0,
-        'minor': 1.0
-    }
-    
-    # Time decay: recent permits weighted higher
-    now = datetime.now()
-    time_decay_factor = 0.1
-    
-    weighted_value = 0.0
-    
-    for permit in permits:
-        # Time decay
-        days_ago = (now - permit.date).days if permit.date else 365
-        time_weight = np.exp(-time_decay_factor * days_ago / 365.0)
-        
-        # Type weight
-        type_weight = type_weights.get(permit.project_type, 1.0)
-        
-        # Value weight (normalize by $100k)
-        value_weight = (permit.value or 50000) / 100000.0
-        
-        # Combined weight
-        weight = time_weight * type_weight * (1.0 + value_weight)
-        weighted_value += weight
-    
-    # Normalize: compare to max across all neighborhoods
-    all_neighborhoods = db.query(Neighborhood).all()
-    max_weighted = 0.0
-    
-    for nh in all_neighborhoods:
-        nh_permits = db.query(BuildingPermit).filter(
-            BuildingPermit.neighborhood_id == nh.id
-        ).all()
-        
-        nh_weighted = 0.0
-        for permit in nh_permits:
-            days_ago = (now - permit.date).days if permit.date else 365
-            time_weight = np.exp(-time_decay_factor * days_ago / 365.0)
-            type_weight = type_weights.get(permit.project_type, 1.0)
-            value_weight = (permit.value or 50000) / 100000.0
-            nh_weighted += time_weight * type_weight * (1.0 + value_weight)
-        
-        max_weighted = max(max_weighted, nh_weighted)
+        return NO_PERMITS_SCORE
     
+    # Normalize: compare to the max across all neighborhoods
+    max_weighted = max(weighted.values())
     if max_weighted == 0:
         return 0.5
     
-    # Normalize to [0, 1]
-    normalized_score = weighted_value / max_weighted
+    normalized_score = weighted[neighborhood_id] / max_weighted
     
     # Clamp to [0, 1]
     return max(0.0, min(1.0, normalized_score))
@@ -80,11 +72,12 @@ def process_all_infrastructure_scores(db: Session) -> dict:
     """Process infrastructure scores for all neighborhoods"""
     logger.info("Processing infrastructure scores for all neighborhoods")
     
-    neighborhoods = db.query(Neighborhood).all()
+    neighborhoods = db.query(Neighborhood.id, Neighborhood.name).all()
+    weighted = weighted_permit_activity(db)
     scores = {}
     
     for neighborhood in neighborhoods:
-        score = calculate_infrastructure_score(neighborhood.id, db)
+        score = calculate_infrastructure_score(neighborhood.id, db, weighted)
         scores[neighborhood.id] = score
         logger.debug(f"Neighborhood {neighborhood.name}: infrastructure_score = {score:.3f}")
     
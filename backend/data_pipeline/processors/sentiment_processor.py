@@ -1,13 +1,23 @@
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 from app.models import NewsArticle, Neighborhood
+from .streaming import stream_partitions
 from datetime import datetime, timedelta
+from functools import lru_cache
 import re
 import logging
 
 logger = logging.getLogger(__name__)
 
-analyzer = SentimentIntensityAnalyzer()
+# Only articles published within this many days count towards the score
+SENTIMENT_WINDOW_DAYS = 180
+
+
+@lru_cache(maxsize=None)
+def get_analyzer():
+    """VADER analyzer, built on first use (loading its lexicon takes a while)"""
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    return SentimentIntensityAnalyzer()
 
 
 def match_article_to_neighborhood(article: NewsArticle, neighborhood: Neighborhood) -> bool:
@@ -32,46 +42,69 @@ def match_article_to_neighborhood(article: NewsArticle, neighborhood: Neighborho
     return False
 
 
-def calculate_sentiment_score(neighborhood_id: int, db: Session) -> float:
-    """Calculate sentiment score for a neighborhood (0-1, higher = better)"""
-    neighborhood = db.query(Neighborhood).filter(Neighborhood.id == neighborhood_id).first()
-    if not neighborhood:
-        return 0.5
-    
-    # Get articles from last 6 months
-    six_months_ago = datetime.now() - timedelta(days=180)
-    articles = db.query(NewsArticle).filter(
-        NewsArticle.published_at >= six_months_ago
-    ).all()
+def matching_neighborhoods(article, neighborhoods: list) -> list:
+    """Ids of the neighborhoods an article mentions"""
+    return [
+        neighborhood.id for neighborhood in neighborhoods
+        if match_article_to_neighborhood(article, neighborhood)
+    ]
+
+
+def article_compound(article) -> float:
+    """VADER compound score of an article's title and content"""
+    text = f"{article.title or ''} {article.content or ''}"
+    return get_analyzer().polarity_scores(text)['compound']
+
+
+def matched_sentiments(db: Session, neighborhoods: list) -> dict:
+    """Sentiment of every recent article, grouped by the neighborhoods it mentions
+
+    Streams the articles from the last SENTIMENT_WINDOW_DAYS once, scoring
+    each with VADER only if it has no stored score yet, and stores the new
+    scores in bulk afterwards. Returns neighborhood id -> list of compounds.
+    """
+    six_months_ago = datetime.now() - timedelta(days=SENTIMENT_WINDOW_DAYS)
+    statement = select(
+        NewsArticle.id, NewsArticle.title, NewsArticle.content, NewsArticle.sentiment_score
+    ).where(NewsArticle.published_at >= six_months_ago)
+
+    sentiments = {neighborhood.id: [] for neighborhood in neighborhoods}
+    new_scores = []
+    for rows in stream_partitions(db, statement):
+        for article in rows:
+            matches = matching_neighborhoods(article, neighborhoods)
+            if not matches:
+                continue
+            
+            compound = article.sentiment_score
+            if compound is None:
+                compound = article_compound(article)
+                new_scores.append({"id": article.id, "sentiment_score": compound})
+            for neighborhood_id in matches:
+                sentiments[neighborhood_id].append(compound)
     
-    # Match articles to neighborhood
-    matched_articles = []
-    for article in articles:
-        if match_article_to_neighborhood(article, neighborhood):
-            matched_articles.append(article)
+    # Store sentiment scores not already calculated
+    if new_scores:
+        db.execute(update(NewsArticle), new_scores)
+    db.commit()
+    return sentiments
+
+
+def calculate_sentiment_score(neighborhood_id: int, db: Session, sentiments: dict = None) -> float:
+    """Calculate sentiment score for a neighborhood (0-1, higher = better)"""
+    if sentiments is None:
+        neighborhoods = db.query(Neighborhood.id, Neighborhood.name).filter(
+            Neighborhood.id == neighborhood_id
+        ).all()
+        sentiments = matched_sentiments(db, neighborhoods)
     
-    if not matched_articles:
+    matched = sentiments.get(neighborhood_id)
+    if not matched:
         # No articles = neutral score
         return 0.5
     
-    # Calculate sentiment for each article
-    sentiments = []
-    for article in matched_articles:
-        text = f"{article.title or ''} {article.content or ''}"
-        scores = analyzer.polarity_scores(text)
-        compound = scores['compound']
-        
-        # Store sentiment score if not already calculated
-        if article.sentiment_score is None:
-            article.sentiment_score = compound
-            db.add(article)
-        
-        sentiments.append(compound)
-    
-    db.commit()
-    
     # Average sentiment
-    avg_sentiment = sum(sentiments) / len(sentiments) if sentiments else 0.0
+    avg_sentiment = sum(matched) / len(matched)
     
     # Normalize from [-1, 1] to [0, 1]
     normalized_score = (avg_sentiment + 1.0) / 2.0
@@ -83,11 +116,12 @@ def process_all_sentiment_scores(db: Session) -> dict:
     """Process sentiment scores for all neighborhoods"""
     logger.info("Processing sentiment scores for all neighborhoods")
     
-    neighborhoods = db.query(Neighborhood).all()
+    neighborhoods = db.query(Neighborhood.id, Neighborhood.name).all()
+    sentiments = matched_sentiments(db, neighborhoods)
     scores = {}
     
     for neighborhood in neighborhoods:
-        score = calculate_sentiment_score(neighborhood.id, db)
+        score = calculate_sentiment_score(neighborhood.id, db, sentiments)
         scores[neighborhood.id] = score
         logger.debug(f"Neighborhood {neighborhood.name}: sentiment_score = {score:.3f}")
     
@@ -0,0 +1,28 @@
+import numpy as np
+from sqlalchemy.orm import Session
+
+# Rows fetched per round trip when streaming narrow columns
+STREAM_BATCH_SIZE = 10000
+
+
+def stream_partitions(db: Session, statement):
+    """Yield lists of rows from a server-side cursor, STREAM_BATCH_SIZE at a time"""
+    result = db.execute(statement.execution_options(yield_per=STREAM_BATCH_SIZE))
+    for partition in result.partitions():
+        yield partition
+
+
+def add_grouped(totals: dict, keys, values: np.ndarray):
+    """Add each value to totals[key], summing values that share a key"""
+    unique_keys, inverse = np.unique(np.asarray(keys), return_inverse=True)
+    sums = np.bincount(inverse, weights=values, minlength=len(unique_keys))
+    for key, value in zip(unique_keys.tolist(), sums.tolist()):
+        totals[key] = totals.get(key, 0.0) + value
+
+
+def days_ago(now, dates, missing: int = 365) -> np.ndarray:
+    """Whole days from each date to now, like (now - date).days; `missing` for None dates"""
+    present = np.array([date is not None for date in dates], dtype=bool)
+    values = np.array([date if date is not None else now for date in dates], dtype="datetime64[us]")
+    result = (np.datetime64(now, "us") - values) // np.timedelta64(1, "D")
+    return np.where(present, result, missing).astype(np.int64)
@@ -0,0 +1,175 @@
+import io
+import os
+import re
+import time
+import pstats
+import cProfile
+import resource
+import threading
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from sqlalchemy import event
+from .refresh import RefreshListener
+import logging
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = Path(os.getenv(
+    "REFRESH_PROFILE_DIR",
+    Path(__file__).parent.parent / "logs" / "profiles"
+))
+
+# Functions and queries listed per section of the report
+TOP_N = 25
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class StageProfile:
+    def __init__(self, name: str):
+        self.name = name
+        self.status = "running"
+        self.seconds = None
+        self.peak_memory = 0
+        self.peak_rss = 0
+        self.stats = None
+        self.queries = defaultdict(lambda: [0, 0.0, 0.0])  # statement -> [count, total, max]
+
+
+class RefreshProfiler(RefreshListener):
+    """Profiles each stage of a refresh run and writes a report on exit
+
+    Every stage runs under cProfile, SQL statements issued from the pipeline
+    thread are timed through engine events and grouped by statement text (a
+    statement run once per neighborhood shows up with a high count), and
+    tracemalloc records the peak memory allocated while the stage ran. The
+    process high-water RSS after each stage is recorded too, as it also counts
+    numpy and driver buffers that tracemalloc does not see.
+
+        with RefreshProfiler(engine) as profiler:
+            run_refresh_pipeline(db, listeners=[profiler])
+        print(profiler.report_path)
+    """
+
+    def __init__(self, engine, output_dir: Path = PROFILE_DIR):
+        self.engine = engine
+        self.output_dir = Path(output_dir)
+        self.run_id = None
+        self.stages = []
+        self.report_path = None
+        self._current = None
+        self._profiler = None
+        self._memory_base = 0
+        self._stage_started = None
+        self._thread_id = None
+        self._started_tracemalloc = False
+        self._started_at = None
+
+    def __enter__(self):
+        self._thread_id = threading.get_ident()
+        self._started_at = datetime.now()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        event.listen(self.engine, "before_cursor_execute", self._before_execute)
+        event.listen(self.engine, "after_cursor_execute", self._after_execute)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._profiler is not None:
+            self._finish_stage("interrupted")
+        event.remove(self.engine, "before_cursor_execute", self._before_execute)
+        event.remove(self.engine, "after_cursor_execute", self._after_execute)
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+        if self.stages:
+            self.report_path = self.write_report()
+        return False
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if threading.get_ident() == self._thread_id:
+            conn.info.setdefault("profile_query_start", []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if threading.get_ident() != self._thread_id or self._current is None:
+            return
+        starts = conn.info.get("profile_query_start")
+        if not starts:
+            return
+        seconds = time.perf_counter() - starts.pop()
+        entry = self._current.queries[_WHITESPACE.sub(" ", statement).strip()]
+        entry[0] += 1
+        entry[1] += seconds
+        entry[2] = max(entry[2], seconds)
+
+    def stage_started(self, name):
+        self._current = StageProfile(name)
+        self.stages.append(self._current)
+        tracemalloc.reset_peak()
+        self._memory_base = tracemalloc.get_traced_memory()[0]
+        self._stage_started = time.perf_counter()
+        self._profiler = cProfile.Profile()
+        self._profiler.enable()
+
+    def _finish_stage(self, status: str):
+        self._profiler.disable()
+        stage = self._current
+        stage.status = status
+        stage.seconds = time.perf_counter() - self._stage_started
+        stage.peak_memory = tracemalloc.get_traced_memory()[1] - self._memory_base
+        stage.peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # KiB on Linux
+        stage.stats = pstats.Stats(self._profiler)
+        self._profiler = None
+        self._current = None
+
+    def pipeline_started(self, run_id, stage_names):
+        self.run_id = run_id
+
+    def stage_finished(self, name, rows, seconds):
+        self._finish_stage("succeeded")
+
+    def stage_failed(self, name, error, seconds):
+        self._finish_stage("failed")
+
+    def write_report(self) -> Path:
+        """Write the text report for this run and return its path"""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        label = f"run{self.run_id}" if self.run_id else "run"
+        path = self.output_dir / f"refresh-{self._started_at:%Y%m%d-%H%M%S}-{label}.txt"
+        path.write_text(self.render())
+        logger.info(f"Refresh profile written to {path}")
+        return path
+
+    def render(self) -> str:
+        out = io.StringIO()
+        out.write(f"Refresh profile, run #{self.run_id}, started {self._started_at:%Y-%m-%d %H:%M:%S}\n\n")
+
+        out.write(f"{'stage':<16}{'status':<13}{'seconds':>10}{'peak MiB':>11}{'RSS MiB':>10}{'queries':>10}{'sql s':>10}\n")
+        for stage in self.stages:
+            count = sum(entry[0] for entry in stage.queries.values())
+            sql_seconds = sum(entry[1] for entry in stage.queries.values())
+            out.write(
+                f"{stage.name:<16}{stage.status:<13}{stage.seconds:>10.3f}"
+                f"{stage.peak_memory / 2**20:>11.1f}{stage.peak_rss / 2**20:>10.1f}{count:>10}{sql_seconds:>10.3f}\n"
+            )
+
+        queries = [
+            (stage.name, statement, *entry)
+            for stage in self.stages
+            for statement, entry in stage.queries.items()
+        ]
+        out.write(f"\n== Slowest queries (total time, top {TOP_N}) ==\n")
+        out.write(f"{'stage':<16}{'count':>8}{'total s':>10}{'mean ms':>10}{'max ms':>10}  statement\n")
+        for name, statement, count, total, longest in sorted(queries, key=lambda q: q[3], reverse=True)[:TOP_N]:
+            out.write(
+                f"{name:<16}{count:>8}{total:>10.3f}{total / count * 1000:>10.2f}"
+                f"{longest * 1000:>10.2f}  {statement[:200]}\n"
+            )
+
+        for stage in self.stages:
+            out.write(f"\n== Hot functions: {stage.name} (cumulative, top {TOP_N}) ==\n")
+            stage.stats.stream = out
+            stage.stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(TOP_N)
+        return out.getvalue()
@@ -0,0 +1,155 @@
+import numpy as np
+from datetime import datetime
+from sqlalchemy import select, union_all, literal_column
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+from app.models import ScoreHistory, ScoreHistoryRollup, ScoreProjection
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Projection horizons in years
+HORIZONS = (1, 3, 5)
+
+# Minimum number of history points before a trend line is fitted
+MIN_HISTORY_POINTS = 3
+
+# Change between the last two history points that counts as a trend
+TREND_THRESHOLD = 0.5
+
+
+def load_history_matrix(db: Session):
+    """Load score history as (neighborhoods x time) matrices
+
+    Reads the compacted series: raw history rows plus the weekly and monthly
+    rollups of older history (see retention.py), each rollup placed at the
+    mean time of its samples. Returns the neighborhood ids, a days matrix
+    (days since each neighborhood's first history point), a matching score
+    matrix and a weights matrix holding the number of refreshes behind each
+    point. Rows are padded with NaN where a neighborhood has fewer points
+    than the longest series.
+    """
+    raw = select(
+        ScoreHistory.neighborhood_id,
+        ScoreHistory.calculated_at,
+        ScoreHistory.profitability_score,
+        literal_column("1").label("sample_count")
+    )
+    rolled_up = select(
+        ScoreHistoryRollup.neighborhood_id,
+        ScoreHistoryRollup.calculated_at,
+        ScoreHistoryRollup.profitability_score,
+        ScoreHistoryRollup.sample_count
+    )
+    series = union_all(raw, rolled_up).subquery()
+    rows = db.execute(
+        select(series).order_by(series.c.neighborhood_id, series.c.calculated_at.asc())
+    ).all()
+
+    if not rows:
+        empty = np.empty((0, 0))
+        return np.empty(0, dtype=int), empty, empty, empty
+
+    neighborhood_ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+    timestamps = np.array([r[1] for r in rows], dtype="datetime64[s]").astype(np.float64)
+    values = np.fromiter((r[2] for r in rows), dtype=np.float64, count=len(rows))
+    samples = np.fromiter((r[3] for r in rows), dtype=np.float64, count=len(rows))
+
+    # Rows are sorted by neighborhood, so each group is a contiguous run
+    unique_ids, group, counts = np.unique(neighborhood_ids, return_inverse=True, return_counts=True)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    column = np.arange(len(rows)) - starts[group]
+
+    days = np.full((len(unique_ids), counts.max()), np.nan)
+    scores = np.full_like(days, np.nan)
+    weights = np.full_like(days, np.nan)
+    days[group, column] = (timestamps - timestamps[starts][group]) / 86400.0
+    scores[group, column] = values
+    weights[group, column] = samples
+
+    return unique_ids, days, scores, weights
+
+
+def fit_projections(days: np.ndarray, scores: np.ndarray, weights: np.ndarray = None) -> dict:
+    """Fit one least-squares trend line per row and project every horizon
+
+    Points are weighted by `weights` (default 1), so a rollup counts as
+    many refreshes as it summarizes. Projections are measured from each
+    neighborhood's latest history point and clamped to [0, 100]. Rows with
+    fewer than MIN_HISTORY_POINTS points are projected flat at their current
+    score.
+    """
+    mask = ~np.isnan(scores)
+    w = np.where(mask, 1.0 if weights is None else weights, 0.0)
+    n = mask.sum(axis=1)
+    rows = np.arange(len(n))
+
+    current = scores[rows, n - 1]
+    previous = np.where(n >= 2, scores[rows, np.maximum(n - 2, 0)], current)
+
+    # Closed-form weighted least squares, vectorized across rows
+    total = w.sum(axis=1)
+    x_mean = np.nansum(w * days, axis=1) / total
+    y_mean = np.nansum(w * scores, axis=1) / total
+    dx = np.where(mask, days - x_mean[:, None], 0.0)
+    dy = np.where(mask, scores - y_mean[:, None], 0.0)
+    sxx = (w * dx * dx).sum(axis=1)
+    sxy = (w * dx * dy).sum(axis=1)
+    slope = np.divide(sxy, sxx, out=np.zeros_like(sxy), where=sxx > 0)
+    intercept = y_mean - slope * x_mean
+    last_day = days[rows, n - 1]
+
+    fitted = n >= MIN_HISTORY_POINTS
+    projections = {}
+    for years in HORIZONS:
+        projected = intercept + slope * (last_day + 365 * years)
+        projections[years] = np.where(fitted, np.clip(projected, 0, 100), current)
+
+    recent_change = current - previous
+    trend = np.where(
+        fitted & (recent_change > TREND_THRESHOLD), "up",
+        np.where(fitted & (recent_change < -TREND_THRESHOLD), "down", "stable")
+    )
+
+    return {"current": current, "projections": projections, "trend": trend}
+
+
+def calculate_score_projections(db: Session) -> int:
+    """Fit and store 1/3/5-year projections for all neighborhoods"""
+    logger.info("Calculating score projections")
+
+    neighborhood_ids, days, scores, weights = load_history_matrix(db)
+    if len(neighborhood_ids) == 0:
+        logger.info("No score history found, skipping projections")
+        return 0
+
+    fit = fit_projections(days, scores, weights)
+    calculated_at = datetime.now()
+
+    rows = [
+        {
+            "neighborhood_id": int(neighborhood_id),
+            "current_score": float(fit["current"][i]),
+            "projection_1yr": float(fit["projections"][1][i]),
+            "projection_3yr": float(fit["projections"][3][i]),
+            "projection_5yr": float(fit["projections"][5][i]),
+            "trend": str(fit["trend"][i]),
+            "calculated_at": calculated_at,
+        }
+        for i, neighborhood_id in enumerate(neighborhood_ids)
+    ]
+
+    statement = insert(ScoreProjection).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=[ScoreProjection.neighborhood_id],
+        set_={
+            column: statement.excluded[column]
+            for column in ("current_score", "projection_1yr", "projection_3yr",
+                           "projection_5yr", "trend", "calculated_at")
+        }
+    )
+    db.execute(statement)
+    db.commit()
+
+    logger.info(f"Calculated score projections for {len(rows)} neighborhoods")
+    return len(rows)
@@ -1,12 +1,21 @@
+import time
 import logging
+from datetime import datetime
 from sqlalchemy.orm import Session
+from app.models import RefreshRun, StageCache
+from app.metrics import REFRESH_STAGE_SECONDS, REFRESH_SECONDS, REFRESH_LAST_SUCCESS
 from .collectors import (
     crime_collector,
     infrastructure_collector,
     demographics_collector,
     sentiment_collector
 )
-from .calculator import calculate_profitability_scores
+from .calculator import calculate_profitability_scores, inputs_fingerprint
+from .fingerprints import store_stage_fingerprint
+from .projections import calculate_score_projections
+from .retention import compact_score_history
+from .geojson_builder import build_neighborhood_layers
+from .locking import refresh_lock, RefreshAlreadyRunning
 
 logging.basicConfig(
     level=logging.INFO,
@@ -14,40 +23,192 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# (name, description, callable(db) -> rows processed)
+REFRESH_STAGES = [
+    ("crime", "Collecting crime data",
+     lambda db: crime_collector.collect_crime_data(db, limit=10000)),
+    ("infrastructure", "Collecting infrastructure data",
+     lambda db: infrastructure_collector.collect_infrastructure_data(db, limit=10000)),
+    ("demographics", "Collecting demographics data",
+     demographics_collector.collect_demographics_data),
+    ("sentiment", "Collecting sentiment data",
+     lambda db: sentiment_collector.collect_sentiment_data(db, days_back=180)),
+    ("scores", "Calculating profitability scores",
+     calculate_profitability_scores),
+    ("history", "Compacting score history",
+     compact_score_history),
+    ("projections", "Fitting score projections",
+     calculate_score_projections),
+    ("geojson", "Building neighborhood GeoJSON layers",
+     build_neighborhood_layers),
+]
 
-def run_refresh_pipeline(db: Session):
-    """Orchestrate the complete data refresh pipeline"""
+# Stages that fetch upstream data; every other stage derives from their output
+COLLECTOR_STAGES = ("crime", "infrastructure", "demographics", "sentiment")
+
+# StageCache entry holding the inputs fingerprint the derived stages last
+# completed for
+DERIVED_STAGE_CACHE = "derived"
+
+
+class RefreshListener:
+    """Receives progress callbacks from run_refresh_pipeline
+
+    Subclasses override the hooks they need. Any object with the same
+    methods can be passed as a listener.
+    """
+
+    def pipeline_started(self, run_id, stage_names):
+        pass
+
+    def stage_started(self, name):
+        pass
+
+    def stage_finished(self, name, rows, seconds):
+        pass
+
+    def stage_failed(self, name, error, seconds):
+        pass
+
+    def stage_skipped(self, name, reason):
+        pass
+
+
+class MetricsListener(RefreshListener):
+    """Records stage durations for the /metrics endpoint"""
+
+    def stage_finished(self, name, rows, seconds):
+        REFRESH_STAGE_SECONDS.labels(stage=name, status="succeeded").observe(seconds)
+
+    def stage_failed(self, name, error, seconds):
+        REFRESH_STAGE_SECONDS.labels(stage=name, status="failed").observe(seconds)
+
+
+def start_refresh_run(db: Session, trigger: str) -> int:
+    """Record a new refresh run, closing out runs left behind by crashed processes"""
+    with Session(bind=db.get_bind()) as session:
+        # We hold the lock, so anything still marked running was interrupted
+        session.query(RefreshRun).filter(RefreshRun.status == "running").update({
+            "status": "failed",
+            "finished_at": datetime.now(),
+            "error": "Interrupted before completion"
+        })
+        run = RefreshRun(trigger=trigger, status="running", started_at=datetime.now())
+        session.add(run)
+        session.commit()
+        return run.id
+
+
+def finish_refresh_run(db: Session, run_id: int, status: str, stats: dict, error: str = None):
+    """Record the outcome of a refresh run"""
+    with Session(bind=db.get_bind()) as session:
+        session.query(RefreshRun).filter(RefreshRun.id == run_id).update({
+            "status": status,
+            "finished_at": datetime.now(),
+            "stats": stats,
+            "error": error
+        })
+        session.commit()
+
+
+def get_running_refresh(db: Session):
+    """Return the refresh run currently in progress, if any"""
+    return db.query(RefreshRun).filter(
+        RefreshRun.status == "running"
+    ).order_by(RefreshRun.started_at.desc()).first()
+
+
+def run_refresh_pipeline(db: Session, listeners=(), trigger: str = "manual", sources=None) -> dict:
+    """Orchestrate the complete data refresh pipeline
+
+    By default every collector runs and scores are always recomputed. When
+    `sources` names a subset of COLLECTOR_STAGES, only those collectors run
+    and the derived stages are skipped if they already completed for the
+    stored inputs. That is decided from stored state, not from this run's
+    row counts: collectors commit batch by batch, so rows added by a run
+    whose derived stages then failed are picked up by the next one.
+
+    Runs are serialized across processes (cron, API, scripts) through a
+    PostgreSQL advisory lock; a concurrent call raises RefreshAlreadyRunning
+    carrying the in-flight run's id. Returns per-stage rows and durations.
+    """
+    try:
+        with refresh_lock(db.get_bind()):
+            return _run_stages(db, listeners, trigger, sources)
+    except RefreshAlreadyRunning:
+        running = get_running_refresh(db)
+        logger.warning("Another refresh is already running, not starting a new one")
+        if running:
+            raise RefreshAlreadyRunning(running.id, running.started_at) from None
+        raise
+
+
+def _run_stages(db: Session, listeners, trigger: str, sources=None) -> dict:
     logger.info("=" * 60)
     logger.info("Starting Housefly data refresh pipeline")
     logger.info("=" * 60)
-    
+
+    listeners = (MetricsListener(), *listeners)
+    pipeline_started = time.perf_counter()
+    stages = [
+        stage for stage in REFRESH_STAGES
+        if sources is None or stage[0] not in COLLECTOR_STAGES or stage[0] in sources
+    ]
+    run_id = start_refresh_run(db, trigger)
+    stats = {}
+    derived_inputs = None
+    skip_derived = False
+
+    for listener in listeners:
+        listener.pipeline_started(run_id, [name for name, _, _ in stages])
+
     try:
-        # Step 1: Collect crime data
-        logger.info("\n[1/4] Collecting crime data...")
-        crime_collector.collect_crime_data(db, limit=10000)
-        
-        # Step 2: Collect infrastructure data
-        logger.info("\n[2/4] Collecting infrastructure data...")
-        infrastructure_collector.collect_infrastructure_data(db, limit=10000)
-        
-        # Step 3: Collect demographics data
-        logger.info("\n[3/4] Collecting demographics data...")
-        demographics_collector.collect_demographics_data(db)
-        
-        # Step 4: Collect sentiment data
-        logger.info("\n[4/4] Collecting sentiment data...")
-        sentiment_collector.collect_sentiment_data(db, days_back=180)
-        
-        # Step 5: Calculate scores
-        logger.info("\n[5/5] Calculating profitability scores...")
-        calculate_profitability_scores(db)
-        
+        for step, (name, description, stage) in enumerate(stages, start=1):
+            if name not in COLLECTOR_STAGES and derived_inputs is None:
+                derived_inputs = inputs_fingerprint(db)
+                completed = db.get(StageCache, DERIVED_STAGE_CACHE)
+                skip_derived = (
+                    sources is not None and completed is not None
+                    and completed.fingerprint == derived_inputs
+                )
+            if name not in COLLECTOR_STAGES and skip_derived:
+                logger.info(f"\n[{step}/{len(stages)}] Skipping {name}: already up to date with stored data")
+                for listener in listeners:
+                    listener.stage_skipped(name, "up to date with stored data")
+                continue
+
+            logger.info(f"\n[{step}/{len(stages)}] {description}...")
+            for listener in listeners:
+                listener.stage_started(name)
+
+            started = time.perf_counter()
+            try:
+                rows = stage(db)
+            except Exception as e:
+                for listener in listeners:
+                    listener.stage_failed(name, e, time.perf_counter() - started)
+                raise
+
+            rows = rows if isinstance(rows, int) else None
+            seconds = time.perf_counter() - started
+            stats[name] = {"rows": rows, "seconds": round(seconds, 3)}
+            for listener in listeners:
+                listener.stage_finished(name, rows, seconds)
+
+        if derived_inputs is not None and not skip_derived:
+            # Recorded only once every derived stage succeeded
+            store_stage_fingerprint(db, DERIVED_STAGE_CACHE, derived_inputs)
+        finish_refresh_run(db, run_id, "succeeded", stats)
+        REFRESH_SECONDS.labels(status="succeeded").observe(time.perf_counter() - pipeline_started)
+        REFRESH_LAST_SUCCESS.set_to_current_time()
         logger.info("=" * 60)
         logger.info("Data refresh pipeline completed successfully!")
         logger.info("=" * 60)
-        
+        return stats
+
     except Exception as e:
         logger.error(f"Error in refresh pipeline: {e}", exc_info=True)
         db.rollback()
+        finish_refresh_run(db, run_id, "failed", stats, str(e))
+        REFRESH_SECONDS.labels(status="failed").observe(time.perf_counter() - pipeline_started)
         raise
-
@@ -0,0 +1,136 @@
+from datetime import datetime, timedelta
+from sqlalchemy import func, literal, literal_column, select, delete, cast, Float
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+from app.models import ScoreHistory, ScoreHistoryRollup
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Score history newer than this is kept at full resolution
+RAW_RETENTION_DAYS = 90
+
+# Weekly rollups newer than this are kept; older ones are merged into months
+WEEKLY_RETENTION_DAYS = 730
+
+SCORE_COLUMNS = (
+    "crime_score",
+    "infrastructure_score",
+    "demographic_score",
+    "sentiment_score",
+    "profitability_score",
+)
+
+
+def week_start(value: datetime) -> datetime:
+    """Monday 00:00 of the week containing value, as date_trunc('week') gives"""
+    day = datetime.combine(value.date(), datetime.min.time())
+    return day - timedelta(days=day.weekday())
+
+
+def month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+
+def _weighted_mean(column, weight):
+    return func.sum(column * weight, type_=Float) / func.sum(weight, type_=Float)
+
+
+def _rollup_select(source, weight, minimum, maximum, resolution: str, period_column, cutoff: datetime):
+    """Group rows of `source` whose period column is before cutoff into one row per neighborhood and period"""
+    period_start = func.date_trunc(literal_column(f"'{resolution}'"), period_column)
+    epoch = func.extract("epoch", source.calculated_at)
+    mean_time = func.timezone("UTC", func.to_timestamp(_weighted_mean(epoch, weight)))
+    return select(
+        source.neighborhood_id,
+        literal(resolution),
+        period_start,
+        func.sum(weight),
+        mean_time,
+        *(_weighted_mean(getattr(source, column), weight) for column in SCORE_COLUMNS),
+        func.min(minimum),
+        func.max(maximum),
+    ).where(
+        period_column < cutoff
+    ).group_by(source.neighborhood_id, period_start)
+
+
+def _upsert_rollups(db: Session, rows) -> None:
+    """Insert rollup rows, merging into any existing row for the same period
+
+    A period can already have a rollup when history is backfilled after it
+    was compacted; the merge keeps means and the mean time weighted by
+    sample count.
+    """
+    columns = [
+        "neighborhood_id", "resolution", "period_start", "sample_count", "calculated_at",
+        *SCORE_COLUMNS, "profitability_min", "profitability_max",
+    ]
+    statement = insert(ScoreHistoryRollup).from_select(columns, rows)
+    existing, added = ScoreHistoryRollup.sample_count, statement.excluded.sample_count
+    total = existing + added
+    share = cast(added, Float) / cast(total, Float)
+    statement = statement.on_conflict_do_update(
+        constraint="uq_score_history_rollups_period",
+        set_={
+            "sample_count": total,
+            "calculated_at": ScoreHistoryRollup.calculated_at + (
+                statement.excluded.calculated_at - ScoreHistoryRollup.calculated_at
+            ) * share,
+            **{
+                column: getattr(ScoreHistoryRollup, column) +
+                (statement.excluded[column] - getattr(ScoreHistoryRollup, column)) * share
+                for column in SCORE_COLUMNS
+            },
+            "profitability_min": func.least(ScoreHistoryRollup.profitability_min,
+                                            statement.excluded.profitability_min),
+            "profitability_max": func.greatest(ScoreHistoryRollup.profitability_max,
+                                               statement.excluded.profitability_max),
+        }
+    )
+    db.execute(statement)
+
+
+def compact_score_history(db: Session, raw_days: int = RAW_RETENTION_DAYS,
+                          weekly_days: int = WEEKLY_RETENTION_DAYS, now: datetime = None) -> int:
+    """Roll old score history into weekly, then monthly, aggregates
+
+    Raw rows from complete weeks older than `raw_days` become weekly rollups
+    (mean of each score, min and max profitability); weekly rollups from
+    complete months older than `weekly_days` are merged into monthly ones.
+    Rolled-up rows are deleted in the same transaction, so history stays
+    bounded at roughly raw_days of refreshes plus one row per week and month.
+    Returns the number of rows removed.
+    """
+    if weekly_days < raw_days:
+        raise ValueError("Weekly retention must be at least as long as raw retention")
+    now = now or datetime.now()
+    raw_cutoff = week_start(now - timedelta(days=raw_days))
+    weekly_cutoff = month_start(now - timedelta(days=weekly_days))
+
+    _upsert_rollups(db, _rollup_select(
+        ScoreHistory, literal_column("1"), ScoreHistory.profitability_score, ScoreHistory.profitability_score,
+        "week", ScoreHistory.calculated_at, raw_cutoff
+    ))
+    raw_removed = db.execute(
+        delete(ScoreHistory).where(ScoreHistory.calculated_at < raw_cutoff)
+    ).rowcount
+
+    weekly = select(ScoreHistoryRollup).where(ScoreHistoryRollup.resolution == "week").subquery()
+    _upsert_rollups(db, _rollup_select(
+        weekly.c, weekly.c.sample_count, weekly.c.profitability_min, weekly.c.profitability_max,
+        "month", weekly.c.period_start, weekly_cutoff
+    ))
+    weekly_removed = db.execute(
+        delete(ScoreHistoryRollup).where(
+            ScoreHistoryRollup.resolution == "week",
+            ScoreHistoryRollup.period_start < weekly_cutoff
+        )
+    ).rowcount
+    db.commit()
+
+    logger.info(
+        f"Compacted score history: {raw_removed} rows before {raw_cutoff:%Y-%m-%d} into weeks, "
+        f"{weekly_removed} weeks before {weekly_cutoff:%Y-%m-%d} into months"
+    )
+    return raw_removed + weekly_removed
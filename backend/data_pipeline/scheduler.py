@@ -0,0 +1,80 @@
+import time
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+from app.config import load_schedule_config, ScheduleConfig
+from app.models import RefreshSchedule
+from app.metrics import push_metrics
+from .refresh import run_refresh_pipeline, COLLECTOR_STAGES
+from .locking import RefreshAlreadyRunning
+
+logger = logging.getLogger(__name__)
+
+# Delay before retrying sources whose run failed, capped by their cadence
+RETRY_DELAY = timedelta(hours=1)
+
+
+def load_schedules(db: Session, now: datetime) -> dict:
+    """Load persisted next-run times, making new sources due immediately"""
+    schedules = {row.source: row for row in db.query(RefreshSchedule).all()}
+    for source in COLLECTOR_STAGES:
+        if source not in schedules:
+            schedules[source] = RefreshSchedule(source=source, next_run_at=now)
+            db.add(schedules[source])
+    db.commit()
+    return schedules
+
+
+def run_due_sources(db: Session, config: ScheduleConfig = None, now: datetime = None) -> dict:
+    """Run every collector whose cadence has elapsed, then rescore if the stored inputs changed
+
+    Returns the pipeline stats, or an empty dict when nothing was due or
+    another refresh held the lock.
+    """
+    config = config or load_schedule_config()
+    now = now or datetime.now()
+
+    schedules = load_schedules(db, now)
+    due = [source for source in COLLECTOR_STAGES if schedules[source].next_run_at <= now]
+    if not due:
+        logger.info("No data sources due")
+        return {}
+
+    logger.info(f"Sources due: {', '.join(due)}")
+    try:
+        stats = run_refresh_pipeline(db, trigger="scheduler", sources=due)
+    except RefreshAlreadyRunning as e:
+        logger.warning(f"{e}, will retry on the next tick")
+        return {}
+    except Exception as e:
+        logger.error(f"Scheduled refresh failed: {e}")
+        for source in due:
+            cadence = timedelta(hours=config.cadence_hours(source))
+            schedules[source].next_run_at = now + min(cadence, RETRY_DELAY)
+        db.commit()
+        return {}
+
+    for source in due:
+        schedule = schedules[source]
+        schedule.last_run_at = now
+        schedule.last_rows = stats.get(source, {}).get("rows")
+        schedule.next_run_at = now + timedelta(hours=config.cadence_hours(source))
+        logger.info(f"Next {source} run at {schedule.next_run_at}")
+    db.commit()
+    return stats
+
+
+def run_scheduler(session_factory, once: bool = False):
+    """Run the scheduler loop, checking for due sources every poll interval"""
+    while True:
+        config = load_schedule_config()
+        db = session_factory()
+        try:
+            run_due_sources(db, config)
+        finally:
+            db.close()
+            push_metrics("housefly_scheduler")
+
+        if once:
+            return
+        time.sleep(config.poll_interval_seconds)
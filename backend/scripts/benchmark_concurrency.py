@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Script to measure API throughput under concurrent clients.
+Usage: python scripts/benchmark_concurrency.py [--url URL] [--concurrency 100] [--requests 5000]
+                                               [--save results.json] [--baseline results.json]
+
+Run it once against a server started from the previous commit with --save,
+then against the current server with --baseline to print the before/after
+requests/sec comparison.
+"""
+import sys
+import json
+import time
+import asyncio
+import argparse
+import logging
+from pathlib import Path
+
+import httpx
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATHS = [
+    "/api/neighborhoods",
+    "/api/scores",
+    "/api/scores/1",
+    "/api/scores/breakdown/1",
+]
+
+
+async def run_benchmark(url: str, paths: list, concurrency: int, total_requests: int) -> dict:
+    """Fire total_requests GETs over the given paths from `concurrency` parallel clients"""
+    latencies = []
+    errors = 0
+    counter = iter(range(total_requests))
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60.0) as client:
+
+        async def worker():
+            nonlocal errors
+            for i in counter:
+                path = paths[i % len(paths)]
+                start = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    if response.status_code >= 500:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "url": url,
+        "concurrency": concurrency,
+        "requests": total_requests,
+        "errors": errors,
+        "elapsed_seconds": elapsed,
+        "requests_per_second": total_requests / elapsed if elapsed else 0.0,
+        "mean_latency_ms": 1000 * sum(latencies) / len(latencies) if latencies else 0.0,
+        "p95_latency_ms": 1000 * latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark API throughput under concurrent clients")
+    parser.add_argument("--url", default="http://localhost:8000", help="Base URL of a running Housefly API")
+    parser.add_argument("--concurrency", type=int, default=100, help="Number of parallel clients")
+    parser.add_argument("--requests", type=int, default=5000, help="Total number of requests to send")
+    parser.add_argument("--path", action="append", dest="paths", help="Path to request (repeatable)")
+    parser.add_argument("--save", help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare against results previously written with --save")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmark(
+        args.url, args.paths or DEFAULT_PATHS, args.concurrency, args.requests
+    ))
+
+    logger.info(f"{results['requests']} requests, {results['concurrency']} clients, {results['errors']} errors")
+    logger.info(f"Throughput: {results['requests_per_second']:.1f} requests/sec")
+    logger.info(f"Latency: mean {results['mean_latency_ms']:.1f} ms, p95 {results['p95_latency_ms']:.1f} ms")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        before = baseline["requests_per_second"]
+        after = results["requests_per_second"]
+        logger.info(f"Before: {before:.1f} requests/sec, after: {after:.1f} requests/sec "
+                    f"({after / before if before else float('inf'):.2f}x)")
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(results, indent=2))
+
+    if results["errors"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Script to roll old score history into weekly and monthly aggregates.
+Usage: python scripts/compact_history.py [--raw-days 90] [--weekly-days 730]
+
+Keeps score history from the last --raw-days at full resolution, rolls older
+rows into weekly rollups and weekly rollups older than --weekly-days into
+monthly ones. The refresh pipeline runs the same compaction before fitting
+projections; this script is for changing the windows or compacting a large
+backfill by hand. Safe to run repeatedly.
+"""
+import sys
+import argparse
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal, create_schema_if_enabled
+from data_pipeline.retention import compact_score_history, RAW_RETENTION_DAYS, WEEKLY_RETENTION_DAYS
+from data_pipeline.projections import calculate_score_projections
+import logging
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Roll old score history into weekly and monthly aggregates")
+    parser.add_argument("--raw-days", type=int, default=RAW_RETENTION_DAYS,
+                        help="Days of history kept at full resolution")
+    parser.add_argument("--weekly-days", type=int, default=WEEKLY_RETENTION_DAYS,
+                        help="Days of history kept at weekly resolution")
+    args = parser.parse_args()
+
+    # Tables come from `alembic upgrade head`
+    create_schema_if_enabled()
+
+    db = SessionLocal()
+    try:
+        removed = compact_score_history(db, args.raw_days, args.weekly_days)
+        logger.info(f"Compaction complete: {removed} rows rolled up")
+        calculate_score_projections(db)
+    except Exception as e:
+        logger.error(f"Error compacting score history: {e}", exc_info=True)
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Script to create upcoming monthly partitions for incidents and permits.
+Usage: python scripts/create_partitions.py [--months-ahead 3]
+
+Creates every missing monthly partition of crime_incidents and
+building_permits up to --months-ahead months from now. Rows that landed in a
+table's DEFAULT partition (dates with no partition yet, e.g. old history) are
+moved into newly created partitions for their month. Safe to run repeatedly.
+"""
+import sys
+import argparse
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import engine, create_schema_if_enabled
+from data_pipeline.partitions import ensure_partitions, MONTHS_AHEAD
+import logging
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create upcoming monthly partitions")
+    parser.add_argument("--months-ahead", type=int, default=MONTHS_AHEAD,
+                        help="Months past the current one to create partitions for")
+    args = parser.parse_args()
+
+    # Tables come from `alembic upgrade head`
+    create_schema_if_enabled()
+
+    try:
+        created = ensure_partitions(engine, args.months_ahead)
+        for table, names in created.items():
+            logger.info(f"{table}: {len(names)} partitions created")
+    except Exception as e:
+        logger.error(f"Error creating partitions: {e}", exc_info=True)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,8 +11,9 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from sqlalchemy.orm import Session
-from app.database import SessionLocal, engine, Base
+from app.database import SessionLocal, create_schema_if_enabled
 from data_pipeline.utils.geojson_loader import load_neighborhoods_from_geojson
+from data_pipeline.geojson_builder import build_neighborhood_layers
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -29,12 +30,13 @@ def main():
         logger.error(f"GeoJSON file not found: {geojson_path}")
         sys.exit(1)
     
-    # Create tables if they don't exist
-    Base.metadata.create_all(bind=engine)
+    # Tables come from `alembic upgrade head`
+    create_schema_if_enabled()
     
     db = SessionLocal()
     try:
         load_neighborhoods_from_geojson(geojson_path, db)
+        build_neighborhood_layers(db)
         logger.info("Neighborhoods loaded successfully!")
     except Exception as e:
         logger.error(f"Error loading neighborhoods: {e}")
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Script to rebuild the per-neighborhood monthly stats from stored rows.
+Usage: python scripts/rebuild_monthly_stats.py [--only crime|infrastructure|sentiment]
+
+The collectors keep neighborhood_monthly_stats up to date as they insert
+rows; run this after upgrading to fill it for existing data, or whenever
+rows were loaded or changed outside the collectors. Articles without a
+stored sentiment score are scored along the way. Runs under the refresh
+lock so no collector adds to the table meanwhile.
+"""
+import sys
+import argparse
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal, engine, create_schema_if_enabled
+from data_pipeline.monthly_stats import rebuild_monthly_stats, SOURCE_COLUMNS
+from data_pipeline.locking import refresh_lock, RefreshAlreadyRunning
+import logging
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild per-neighborhood monthly stats")
+    parser.add_argument("--only", choices=sorted(SOURCE_COLUMNS), help="Rebuild a single source")
+    args = parser.parse_args()
+
+    # Tables come from `alembic upgrade head`
+    create_schema_if_enabled()
+
+    db = SessionLocal()
+    try:
+        with refresh_lock(engine):
+            rows = rebuild_monthly_stats(db, [args.only] if args.only else tuple(SOURCE_COLUMNS))
+        logger.info(f"Monthly stats rebuilt: {rows} neighborhood months")
+    except RefreshAlreadyRunning as e:
+        logger.error(f"{e}; try again when it has finished")
+        sys.exit(1)
+    except Exception as e:
+        logger.error(f"Error rebuilding monthly stats: {e}", exc_info=True)
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Script to reclassify stored incidents and permits after keyword changes.
+Usage: python scripts/reclassify.py [--only crime|infrastructure] [--dry-run]
+
+Recomputes crime severity and permit project type for every stored row from
+the keyword lists in data_pipeline/normalizers.py, classifying each distinct
+offense or permit type once and updating only rows whose class changed. The
+cached crime/infrastructure and profitability stage outputs are dropped when
+anything changed, so the next refresh rescores, and the source's monthly
+stats are rebuilt. Runs under the refresh lock so no collector inserts rows
+or adds to the monthly stats meanwhile.
+"""
+import sys
+import argparse
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal, engine, create_schema_if_enabled
+from data_pipeline.normalizers import reclassify_incidents, reclassify_permits
+from data_pipeline.locking import refresh_lock, RefreshAlreadyRunning
+import logging
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+RECLASSIFIERS = {
+    "crime": reclassify_incidents,
+    "infrastructure": reclassify_permits,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reclassify stored incidents and permits")
+    parser.add_argument("--only", choices=sorted(RECLASSIFIERS), help="Reclassify a single source")
+    parser.add_argument("--dry-run", action="store_true", help="Report how many rows would change")
+    args = parser.parse_args()
+
+    # Tables come from `alembic upgrade head`
+    create_schema_if_enabled()
+
+    db = SessionLocal()
+    try:
+        with refresh_lock(engine):
+            for source, reclassify in RECLASSIFIERS.items():
+                if args.only and source != args.only:
+                    continue
+                reclassify(db, dry_run=args.dry_run)
+    except RefreshAlreadyRunning as e:
+        logger.error(f"{e}; try again when it has finished")
+        sys.exit(1)
+    except Exception as e:
+        logger.error(f"Error reclassifying: {e}", exc_info=True)
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Script to backfill score history as of past dates.
+Usage: python scripts/run_backfill.py --start 2024-01-01 [--end 2024-12-31] [--step-days 7] [--replace]
+
+Recomputes crime, infrastructure and sentiment subscores as of every
+--step-days between --start and --end (default today), using only records
+dated before each date, and stores them as score history so projections have
+trends on a fresh install. Refuses to touch a range that already has history
+unless --replace is given.
+"""
+import sys
+import argparse
+from datetime import date
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal, create_schema_if_enabled
+from data_pipeline.backfill import backfill_score_history, HistoryExists
+import logging
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill score history as of past dates")
+    parser.add_argument("--start", type=date.fromisoformat, required=True, help="First as-of date (YYYY-MM-DD)")
+    parser.add_argument("--end", type=date.fromisoformat, default=date.today(), help="Last as-of date (YYYY-MM-DD)")
+    parser.add_argument("--step-days", type=int, default=7, help="Days between as-of dates")
+    parser.add_argument("--replace", action="store_true", help="Replace existing history in the range")
+    args = parser.parse_args()
+
+    # Tables come from `alembic upgrade head`
+    create_schema_if_enabled()
+
+    db = SessionLocal()
+    try:
+        rows = backfill_score_history(db, args.start, args.end, args.step_days, args.replace)
+        logger.info(f"Backfill complete: {rows} history rows")
+    except HistoryExists as e:
+        logger.error(f"{e}; rerun with --replace to overwrite it")
+        sys.exit(1)
+    except Exception as e:
+        logger.error(f"Error in backfill: {e}", exc_info=True)
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,25 @@
 #!/usr/bin/env python3
 """
 Script to run the data refresh pipeline manually.
-Usage: python scripts/run_refresh.py
+Usage: python scripts/run_refresh.py [--profile]
+
+With --profile every stage runs under cProfile, SQL statements are timed and
+peak memory is tracked; a report is written to logs/profiles/.
 """
 import sys
+import argparse
+from contextlib import nullcontext
 from pathlib import Path
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from sqlalchemy.orm import Session
-from app.database import SessionLocal, engine, Base
+from app.database import SessionLocal, engine, create_schema_if_enabled
 from data_pipeline.refresh import run_refresh_pipeline
+from data_pipeline.locking import RefreshAlreadyRunning
+from data_pipeline.profiling import RefreshProfiler, PROFILE_DIR
+from app.metrics import push_metrics
 import logging
 
 logging.basicConfig(
@@ -22,18 +30,32 @@ logger = logging.getLogger(__name__)
 
 
 def main():
-    # Create tables if they don't exist
-    Base.metadata.create_all(bind=engine)
+    parser = argparse.ArgumentParser(description="Run the data refresh pipeline")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile each stage and write a report")
+    parser.add_argument("--profile-dir", default=PROFILE_DIR, help="Directory for profile reports")
+    args = parser.parse_args()
+
+    # Tables come from `alembic upgrade head`
+    create_schema_if_enabled()
     
     db = SessionLocal()
+    profiler = RefreshProfiler(engine, args.profile_dir) if args.profile else None
     try:
-        run_refresh_pipeline(db)
+        with profiler or nullcontext():
+            run_refresh_pipeline(db, listeners=[profiler] if profiler else [], trigger="cron")
         logger.info("Refresh pipeline completed successfully!")
+    except RefreshAlreadyRunning as e:
+        # Not an error for cron: the in-flight run covers this slot
+        logger.warning(f"{e}, skipping")
     except Exception as e:
         logger.error(f"Error in refresh pipeline: {e}", exc_info=True)
         sys.exit(1)
     finally:
         db.close()
+        push_metrics("housefly_refresh")
+        if profiler and profiler.report_path:
+            logger.info(f"Profile report: {profiler.report_path}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Script to run the per-source refresh scheduler.
+Usage: python scripts/run_scheduler.py [--once]
+
+Each collector runs on its own cadence from config/schedule.yaml. Scores,
+projections and layers are recomputed only when the fingerprint of the
+stored scoring inputs differs from the one they last completed for, so a
+run whose scoring failed is retried even if it collects nothing new. With
+--once the scheduler checks for due sources a single time and exits (for
+cron); otherwise it keeps polling.
+"""
+import sys
+import argparse
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal, create_schema_if_enabled
+from data_pipeline.scheduler import run_scheduler
+import logging
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the per-source refresh scheduler")
+    parser.add_argument("--once", action="store_true", help="Check for due sources once and exit")
+    args = parser.parse_args()
+
+    # Tables come from `alembic upgrade head`
+    create_schema_if_enabled()
+
+    try:
+        run_scheduler(SessionLocal, once=args.once)
+    except KeyboardInterrupt:
+        logger.info("Scheduler stopped")
+    except Exception as e:
+        logger.error(f"Error in scheduler: {e}", exc_info=True)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,15 @@
 import { useEffect, useState } from 'react'
 import { MapContainer, TileLayer, GeoJSON, useMap } from 'react-leaflet'
 import L from 'leaflet'
-import { neighborhoodsApi, scoresApi, Neighborhood, Score } from '../services/api'
+import {
+  neighborhoodsApi,
+  scoresApi,
+  scoreEvents,
+  Neighborhood,
+  Score,
+  ScoreBreakdown,
+  ScoreProjection,
+} from '../services/api'
 import NeighborhoodPopup from './NeighborhoodPopup'
 import './Map.css'
 
@@ -15,6 +23,14 @@ L.Icon.Default.mergeOptions({
 
 interface MapProps {}
 
+function byNeighborhood<T extends { neighborhood_id: number }>(items: T[]): Record<number, T> {
+  const map: Record<number, T> = {}
+  items.forEach(item => {
+    map[item.neighborhood_id] = item
+  })
+  return map
+}
+
 function MapContent({ neighborhoods, scores }: { neighborhoods: Neighborhood[], scores: Score[] }) {
   const map = useMap()
   
@@ -35,44 +51,32 @@ function MapContent({ neighborhoods, scores }: { neighborhoods: Neighborhood[],
 export default function Map() {
   const [neighborhoods, setNeighborhoods] = useState<Neighborhood[]>([])
   const [scores, setScores] = useState<Record<number, Score>>({})
+  // Popup data for every neighborhood, fetched in one batch request each
+  const [breakdowns, setBreakdowns] = useState<Record<number, ScoreBreakdown>>({})
+  const [projections, setProjections] = useState<Record<number, ScoreProjection>>({})
   const [selectedNeighborhood, setSelectedNeighborhood] = useState<Neighborhood | null>(null)
   const [loading, setLoading] = useState(true)
   const [geojsonData, setGeojsonData] = useState<any>(null)
+  const [scoreVersion, setScoreVersion] = useState<string>('')
 
   useEffect(() => {
     async function loadData() {
       try {
-        const [neighborhoodsData, scoresData] = await Promise.all([
+        const [neighborhoodsData, scoresData, geojson, breakdownsData, projectionsData] = await Promise.all([
           neighborhoodsApi.getAll(),
-          scoresApi.getAll()
+          scoresApi.getAll(),
+          neighborhoodsApi.getGeoJSON('medium'),
+          scoresApi.getBreakdowns(),
+          scoresApi.getProjections()
         ])
         
         setNeighborhoods(neighborhoodsData)
+        setScores(byNeighborhood(scoresData))
+        setBreakdowns(byNeighborhood(breakdownsData))
+        setProjections(byNeighborhood(projectionsData))
         
-        const scoresMap: Record<number, Score> = {}
-        scoresData.forEach(score => {
-          scoresMap[score.neighborhood_id] = score
-        })
-        setScores(scoresMap)
-        
-        // Load GeoJSON data
-        // In production, this would come from the API
-        // For now, we'll create a placeholder structure
-        setGeojsonData({
-          type: 'FeatureCollection',
-          features: neighborhoodsData.map(nh => ({
-            type: 'Feature',
-            properties: {
-              id: nh.id,
-              name: nh.name,
-              score: scoresMap[nh.id]?.profitability_score || 0
-            },
-            geometry: {
-              type: 'Polygon',
-              coordinates: [] // Will be populated from API
-            }
-          }))
-        })
+        // Geometries and current scores, precomputed and compressed server-side
+        setGeojsonData(geojson)
         
         setLoading(false)
       } catch (error) {
@@ -84,6 +88,27 @@ export default function Map() {
     loadData()
   }, [])
 
+  useEffect(() => {
+    // Pick up refreshes as they happen instead of polling
+    return scoreEvents.subscribe(async (event) => {
+      try {
+        // Only the changed neighborhoods' popup data, when the event names them
+        const ids = event.neighborhood_ids ?? undefined
+        const [scoresData, breakdownsData, projectionsData] = await Promise.all([
+          scoresApi.getAll(),
+          scoresApi.getBreakdowns(ids),
+          scoresApi.getProjections(ids)
+        ])
+        setScores(byNeighborhood(scoresData))
+        setBreakdowns(current => ({ ...(ids ? current : {}), ...byNeighborhood(breakdownsData) }))
+        setProjections(current => ({ ...(ids ? current : {}), ...byNeighborhood(projectionsData) }))
+        setScoreVersion(event.version)
+      } catch (error) {
+        console.error('Error reloading scores:', error)
+      }
+    })
+  }, [])
+
   const getColorForScore = (score: number): string => {
     // Color scale from red (0) to green (100)
     if (score >= 80) return '#00C853' // Green
@@ -127,7 +152,8 @@ export default function Map() {
   }
 
   const style = (feature: any) => {
-    const score = feature.properties.score || 0
+    // Live scores win over the ones baked into the GeoJSON layer at refresh time
+    const score = scores[feature.properties.id]?.profitability_score ?? feature.properties.profitability_score ?? 0
     return {
       fillColor: getColorForScore(score),
       weight: 2,
@@ -162,6 +188,7 @@ export default function Map() {
         
         {geojsonData && (
           <GeoJSON
+            key={scoreVersion}
             data={geojsonData}
             style={style}
             onEachFeature={onEachFeature}
@@ -172,6 +199,8 @@ export default function Map() {
       {selectedNeighborhood && (
         <NeighborhoodPopup
           neighborhood={selectedNeighborhood}
+          breakdown={breakdowns[selectedNeighborhood.id] ?? null}
+          projection={projections[selectedNeighborhood.id] ?? null}
           onClose={() => setSelectedNeighborhood(null)}
         />
       )}
@@ -1,6 +1,5 @@
-import { useEffect, useState } from 'react'
+import { useState } from 'react'
 import { ScoreBreakdown, ScoreProjection } from '../services/api'
-import { scoresApi } from '../services/api'
 import TimeSlider from './TimeSlider'
 import ScoreBreakdownChart from './ScoreBreakdown'
 import './NeighborhoodPopup.css'
@@ -10,50 +9,21 @@ interface NeighborhoodPopupProps {
     id: number
     name: string
   }
+  // Loaded for all neighborhoods by the map; null when none is stored yet
+  breakdown: ScoreBreakdown | null
+  projection: ScoreProjection | null
   onClose: () => void
 }
 
-export default function NeighborhoodPopup({ neighborhood, onClose }: NeighborhoodPopupProps) {
-  const [breakdown, setBreakdown] = useState<ScoreBreakdown | null>(null)
-  const [projection, setProjection] = useState<ScoreProjection | null>(null)
+export default function NeighborhoodPopup({ neighborhood, breakdown, projection, onClose }: NeighborhoodPopupProps) {
   const [selectedYears, setSelectedYears] = useState<1 | 3 | 5>(1)
-  const [loading, setLoading] = useState(true)
-
-  useEffect(() => {
-    async function loadData() {
-      try {
-        const [breakdownData, projectionData] = await Promise.all([
-          scoresApi.getBreakdown(neighborhood.id),
-          scoresApi.getProjection(neighborhood.id, selectedYears)
-        ])
-        setBreakdown(breakdownData)
-        setProjection(projectionData)
-        setLoading(false)
-      } catch (error) {
-        console.error('Error loading neighborhood data:', error)
-        setLoading(false)
-      }
-    }
-    
-    loadData()
-  }, [neighborhood.id, selectedYears])
 
   const currentScore = projection?.current_score || breakdown?.profitability_score || 0
-  const projectedScore = selectedYears === 1 
+  const projectedScore = (selectedYears === 1 
     ? projection?.projection_1yr 
     : selectedYears === 3 
     ? projection?.projection_3yr 
-    : projection?.projection_5yr || currentScore
-
-  if (loading) {
-    return (
-      <div className="popup-overlay" onClick={onClose}>
-        <div className="popup-content" onClick={(e) => e.stopPropagation()}>
-          <div className="popup-loading">Loading...</div>
-        </div>
-      </div>
-    )
-  }
+    : projection?.projection_5yr) ?? currentScore
 
   return (
     <div className="popup-overlay" onClick={onClose}>
@@ -42,12 +42,27 @@ export interface ScoreProjection {
   neighborhood_id: number
   neighborhood_name: string
   current_score: number
-  projection_1yr: number
-  projection_3yr: number
-  projection_5yr: number
+  projection_1yr: number | null
+  projection_3yr: number | null
+  projection_5yr: number | null
   trend: 'up' | 'down' | 'stable'
 }
 
+export interface MonthlyStats {
+  month: string
+  crime_violent: number
+  crime_property: number
+  crime_other: number
+  permits_residential: number
+  permits_commercial: number
+  permits_minor: number
+  permit_value_residential: number
+  permit_value_commercial: number
+  permit_value_minor: number
+  article_count: number
+  average_sentiment: number | null
+}
+
 export const neighborhoodsApi = {
   getAll: async (): Promise<Neighborhood[]> => {
     const response = await api.get('/api/neighborhoods')
@@ -61,6 +76,18 @@ export const neighborhoodsApi = {
     const response = await api.get(`/api/neighborhoods/${id}/scores`)
     return response.data
   },
+  getTimeseries: async (id: number, start?: string, end?: string): Promise<MonthlyStats[]> => {
+    const response = await api.get(`/api/neighborhoods/${id}/timeseries`, {
+      params: { ...(start ? { start } : {}), ...(end ? { end } : {}) },
+    })
+    return response.data
+  },
+  getGeoJSON: async (level: 'full' | 'medium' | 'low' = 'medium'): Promise<GeoJSON.FeatureCollection> => {
+    const response = await api.get('/api/neighborhoods.geojson', {
+      params: { level },
+    })
+    return response.data
+  },
 }
 
 export const scoresApi = {
@@ -68,17 +95,39 @@ export const scoresApi = {
     const response = await api.get('/api/scores')
     return response.data
   },
-  getProjection: async (neighborhoodId: number, years: 1 | 3 | 5): Promise<ScoreProjection> => {
-    const response = await api.get(`/api/scores/${neighborhoodId}`, {
-      params: { years },
+  // Omit ids to fetch every neighborhood in one request
+  getBreakdowns: async (ids?: number[]): Promise<ScoreBreakdown[]> => {
+    const response = await api.get('/api/scores/breakdown', {
+      params: ids ? { ids: ids.join(',') } : {},
     })
     return response.data
   },
-  getBreakdown: async (neighborhoodId: number): Promise<ScoreBreakdown> => {
-    const response = await api.get(`/api/scores/breakdown/${neighborhoodId}`)
+  getProjections: async (ids?: number[], years?: Array<1 | 3 | 5>): Promise<ScoreProjection[]> => {
+    const response = await api.get('/api/projections', {
+      params: {
+        ...(ids ? { ids: ids.join(',') } : {}),
+        ...(years ? { years: years.join(',') } : {}),
+      },
+    })
     return response.data
   },
 }
 
+export interface ScoreEvent {
+  version: string
+  neighborhood_ids: number[] | null // null: reload every neighborhood
+}
+
+export const scoreEvents = {
+  // Server-sent events announcing each score refresh; returns an unsubscribe function
+  subscribe: (onEvent: (event: ScoreEvent) => void): (() => void) => {
+    const source = new EventSource(`${API_URL}/api/scores/stream`)
+    source.addEventListener('scores', (message) => {
+      onEvent(JSON.parse((message as MessageEvent).data))
+    })
+    return () => source.close()
+  },
+}
+
 export default api
 
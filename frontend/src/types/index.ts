@@ -31,9 +31,9 @@ export interface ScoreProjection {
   neighborhood_id: number
   neighborhood_name: string
   current_score: number
-  projection_1yr: number
-  projection_3yr: number
-  projection_5yr: number
+  projection_1yr: number | null
+  projection_3yr: number | null
+  projection_5yr: number | null
   trend: 'up' | 'down' | 'stable'
 }
 